@@ -0,0 +1,420 @@
+# --- Registro de backends de extracción de texto de PDFs (para cc_pdf.py) ---
+# Antes el orden estaba fijo ("pdfminer y si no pypdf"), aunque pypdf suele ser varias veces más rápido
+# con los PDFs nativos (no escaneados). Aquí:
+#   - cada backend es un nombre + un cargador (se importa sólo al usarlo); además de pdfminer y pypdf
+#     se admiten pypdfium2 y PyMuPDF si están instalados, y register_backend para añadir otros;
+#   - AutoExtractor elige backend por documento: prueba en orden de preferencia y pasa al siguiente si
+#     el texto sale vacío o ilegible (p.ej. "(cid:12)(cid:34)..." o caracteres de sustitución);
+#   - el orden de preferencia sale de la variable CC_PDF_BACKENDS (preferencia del usuario), de la
+#     calibración guardada para esa carpeta o, si no hay nada, del orden por defecto;
+#   - la calibración mide cada backend con una muestra de la carpeta y guarda el más rápido aceptable:
+#       python cc_backends.py calibrate "C:\ruta\pdfs" --sample 10
+#       python cc_backends.py list
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+CALIBRATION_PATH = Path.home() / ".cache" / "cc_pdf" / "backends.json"
+PREFERENCE_ENV = "CC_PDF_BACKENDS"  # p.ej. CC_PDF_BACKENDS=pypdf,pdfminer
+
+
+def _joined_pages(texts):
+    """Páginas tal que "".join(páginas) == "\\n".join(textos) (igual que el extractor completo)."""
+
+    first = True
+    for text in texts:
+        yield text if first else "\n" + text
+        first = False
+
+
+# ---- pdfminer.six ----
+
+def _load_pdfminer():
+    from pdfminer.high_level import extract_text as pdf_extract_text
+    return pdf_extract_text
+
+
+def _load_pdfminer_pages():
+    from io import StringIO
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    def _iter_pages_pdfminer(path_str: str):
+        # Lo mismo que hace pdfminer.high_level.extract_text, vaciando la salida tras cada página
+        rsrcmgr = PDFResourceManager(caching=True)
+        buf = StringIO()
+        device = TextConverter(rsrcmgr, buf, codec="utf-8", laparams=LAParams())
+        try:
+            interpreter = PDFPageInterpreter(rsrcmgr, device)
+            with open(path_str, "rb") as fp:
+                for page in PDFPage.get_pages(fp, caching=True):
+                    interpreter.process_page(page)
+                    yield buf.getvalue()
+                    buf.seek(0); buf.truncate(0)
+        finally:
+            device.close()
+    return _iter_pages_pdfminer
+
+
+# ---- pypdf ----
+
+def _pypdf_texts(path_str: str):
+    from pypdf import PdfReader
+    try:
+        reader = PdfReader(path_str)
+    except Exception:
+        return
+    for p in reader.pages:
+        try:
+            yield p.extract_text() or ""
+        except Exception:
+            continue
+
+
+def _load_pypdf():
+    import pypdf  # noqa: F401  (sólo para saber si está instalado)
+
+    def _extract_with_pypdf(path_str: str) -> str:
+        return "\n".join(_pypdf_texts(path_str))
+    return _extract_with_pypdf
+
+
+def _load_pypdf_pages():
+    import pypdf  # noqa: F401
+
+    def _iter_pages_pypdf(path_str: str):
+        return _joined_pages(_pypdf_texts(path_str))
+    return _iter_pages_pypdf
+
+
+# ---- pypdfium2 ----
+
+def _pdfium_texts(path_str: str):
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(path_str)
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _load_pypdfium2():
+    import pypdfium2  # noqa: F401
+    return lambda path_str: "\n".join(_pdfium_texts(path_str))
+
+
+def _load_pypdfium2_pages():
+    import pypdfium2  # noqa: F401
+    return lambda path_str: _joined_pages(_pdfium_texts(path_str))
+
+
+# ---- PyMuPDF ----
+
+def _import_fitz():
+    try:
+        import pymupdf as fitz
+    except ImportError:
+        import fitz  # versiones antiguas de PyMuPDF
+    return fitz
+
+
+def _pymupdf_texts(path_str: str):
+    fitz = _import_fitz()
+    with fitz.open(path_str) as doc:
+        for page in doc:
+            yield page.get_text()
+
+
+def _load_pymupdf():
+    _import_fitz()
+    return lambda path_str: "\n".join(_pymupdf_texts(path_str))
+
+
+def _load_pymupdf_pages():
+    _import_fitz()
+    return lambda path_str: _joined_pages(_pymupdf_texts(path_str))
+
+
+# nombre -> (cargador del extractor completo, cargador del extractor por páginas), en orden por defecto
+PDF_BACKENDS: Dict[str, Tuple[Callable, Callable]] = {
+    "pdfminer": (_load_pdfminer, _load_pdfminer_pages),
+    "pypdf": (_load_pypdf, _load_pypdf_pages),
+    "pypdfium2": (_load_pypdfium2, _load_pypdfium2_pages),
+    "pymupdf": (_load_pymupdf, _load_pymupdf_pages),
+}
+
+
+def register_backend(name: str, loader: Callable, page_loader: Optional[Callable] = None) -> None:
+    """Añade un extractor local: loader() -> fn(ruta) -> texto (page_loader: fn(ruta) -> páginas).
+
+    Para usarlo también en los procesos hijos, hay que registrarlo al importar un módulo propio.
+    """
+
+    if page_loader is None:
+        def page_loader():
+            fn = loader()
+            return lambda path_str: iter([fn(path_str)])
+    PDF_BACKENDS[name] = (loader, page_loader)
+
+
+def load_pdf_backend(name: str, pages: bool = False):
+    """Extractor de un backend concreto (o None si no está instalado)."""
+
+    loaders = PDF_BACKENDS.get(name)
+    if loaders is None:
+        return None
+    try:
+        return loaders[1 if pages else 0]()
+    except Exception:
+        return None
+
+
+def available_pdf_backends() -> List[str]:
+    return [name for name in PDF_BACKENDS if load_pdf_backend(name) is not None]
+
+
+# ----------------- Calidad del texto extraído -----------------
+
+QUALITY_SAMPLE = 20_000  # caracteres que se miran
+MIN_LETTER_RATIO = 0.25  # letras / caracteres visibles
+MAX_GARBAGE_RATIO = 0.05
+
+
+def text_quality(text: str) -> Optional[str]:
+    """None si el texto parece correcto; si no, el motivo ("vacío" o "ilegible")."""
+
+    sample = text[:QUALITY_SAMPLE]
+    visible = "".join(sample.split())
+    if not visible:
+        return "vacío"
+    letters = sum(1 for c in visible if c.isalpha())
+    garbage = sample.count("\ufffd") + 6 * sample.count("(cid:") + sum(1 for c in visible if ord(c) < 32)
+    if letters / len(visible) < MIN_LETTER_RATIO or garbage / len(visible) > MAX_GARBAGE_RATIO:
+        return "ilegible"
+    return None
+
+
+def text_score(text: str) -> int:
+    """Para quedarse con el "menos malo" cuando ningún backend da un texto aceptable."""
+
+    sample = text[:QUALITY_SAMPLE]
+    return sum(1 for c in sample if c.isalpha()) - 6 * sample.count("(cid:") - sample.count("\ufffd")
+
+
+# ----------------- Orden de preferencia -----------------
+
+def _load_calibrations() -> dict:
+    try:
+        return json.loads(CALIBRATION_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def preferred_backend_order(pdf_dir: Optional[Path] = None, installed: Optional[List[str]] = None) -> List[str]:
+    """Backends instalados en orden de preferencia: CC_PDF_BACKENDS > calibración de la carpeta > por defecto."""
+
+    installed = available_pdf_backends() if installed is None else installed
+    order: List[str] = []
+    env = os.environ.get(PREFERENCE_ENV, "")
+    if env:
+        order = [b.strip() for b in env.split(",") if b.strip()]
+    elif pdf_dir is not None:
+        entry = _load_calibrations().get(str(Path(pdf_dir).resolve()))
+        if entry:
+            order = list(entry.get("order", []))
+    order = [b for b in order if b in installed]
+    return order + [b for b in installed if b not in order]
+
+
+class AutoExtractor:
+    """pdf_text_fn que elige backend por documento: el primero (en orden) que da un texto aceptable.
+
+    Si ninguno lo da, devuelve el "menos malo". last_backend dice cuál se usó en el último documento.
+    Con pages=True devuelve páginas (sin control de calidad: no se puede deshacer lo ya contado) y sólo
+    cambia de backend si el primero falla antes de dar ninguna página.
+    Se puede enviar a otros procesos (viaja la configuración, no los extractores).
+    """
+
+    def __init__(self, backends: List[str], pages: bool = False, check_quality: bool = True):
+        if not backends:
+            raise ValueError("Hace falta al menos un backend de extracción")
+        self.backends = list(backends)
+        self.pages = pages
+        self.check_quality = check_quality
+        self.last_backend = ""
+        self._fns: Dict[str, object] = {}
+
+    @property
+    def name(self) -> str:
+        return self.backends[0] if len(self.backends) == 1 else "auto:" + ">".join(self.backends)
+
+    def __reduce__(self):
+        return (AutoExtractor, (self.backends, self.pages, self.check_quality))
+
+    def _fn(self, backend: str):
+        if backend not in self._fns:
+            self._fns[backend] = load_pdf_backend(backend, self.pages)
+        return self._fns[backend]
+
+    def __call__(self, path_str: str):
+        if self.pages:
+            return self._iter_pages(path_str)
+        best: Optional[Tuple[int, str, str]] = None
+        errors = []
+        for backend in self.backends:
+            fn = self._fn(backend)
+            if fn is None:
+                continue
+            try:
+                text = fn(path_str) or ""
+            except Exception as e:
+                errors.append(f"{backend}: {type(e).__name__}: {e}")
+                continue
+            if not self.check_quality or text_quality(text) is None:
+                self.last_backend = backend
+                return text
+            score = text_score(text)
+            if best is None or score > best[0]:
+                best = (score, backend, text)
+        if best is not None:
+            self.last_backend = best[1]
+            return best[2]
+        raise RuntimeError("; ".join(errors) or "ningún backend instalado")
+
+    def _iter_pages(self, path_str: str):
+        for backend in self.backends:
+            fn = self._fn(backend)
+            if fn is None:
+                continue
+            emitted = False
+            try:
+                for page in fn(path_str):
+                    if not emitted:
+                        self.last_backend = backend
+                    emitted = True
+                    yield page
+                return
+            except Exception:
+                if emitted:
+                    raise  # ya se contaron páginas de este backend
+        raise RuntimeError("ningún backend pudo leer el archivo")
+
+
+# ----------------- Calibración -----------------
+
+def _sample(pdf_paths: List[Path], sample: int) -> List[Path]:
+    """Muestra repartida por toda la lista (determinista)."""
+
+    paths = sorted(pdf_paths)
+    if len(paths) <= sample:
+        return paths
+    step = len(paths) / sample
+    return [paths[int(i * step)] for i in range(sample)]
+
+
+def calibrate(pdf_paths: List[Path], sample: int = 10, backends: Optional[List[str]] = None,
+              timeout: float = 60.0, log=print) -> dict:
+    """Mide cada backend sobre una muestra y ordena: primero los aceptables, del más rápido al más lento.
+
+    Aceptable = no falla ni da texto vacío/ilegible en más documentos que el mejor, y saca al menos el 90%
+    de las letras que el backend que más saca. Cada extracción va en un proceso aparte con tiempo máximo.
+    """
+
+    from cc_isolate import IsolatedExtractor
+
+    backends = backends or available_pdf_backends()
+    chosen = _sample(pdf_paths, sample)
+    results: Dict[str, dict] = {}
+    for backend in backends:
+        extractor = IsolatedExtractor([backend], timeout, check_quality=False)
+        seconds, good, letters = 0.0, 0, 0
+        try:
+            try:
+                extractor(str(chosen[0]))  # calentamiento: arranque del proceso e importación del backend
+            except Exception:
+                pass
+            for path in chosen:
+                t0 = time.perf_counter()
+                try:
+                    text = extractor(str(path))
+                except Exception:
+                    text = None
+                seconds += time.perf_counter() - t0
+                if text is not None and text_quality(text) is None:
+                    good += 1
+                    letters += max(0, text_score(text))
+        finally:
+            extractor.close()
+        mb = sum(p.stat().st_size for p in chosen) / 1e6
+        results[backend] = {"seconds": round(seconds, 3), "docs_ok": good, "letters": letters,
+                            "mb_per_s": round(mb / seconds, 3) if seconds else 0.0}
+        log(f"{backend:<10} {seconds:8.2f}s  {good}/{len(chosen)} docs correctos  {letters} letras")
+
+    best_ok = max((r["docs_ok"] for r in results.values()), default=0)
+    best_letters = max((r["letters"] for r in results.values()), default=0)
+    acceptable = [b for b, r in results.items()
+                  if r["docs_ok"] >= best_ok and r["letters"] >= 0.9 * best_letters]
+    by_speed = sorted(results, key=lambda b: results[b]["seconds"])
+    order = [b for b in by_speed if b in acceptable] + [b for b in by_speed if b not in acceptable]
+    return {"order": order, "sample": [str(p) for p in chosen], "results": results, "date": time.strftime("%Y-%m-%d %H:%M")}
+
+
+def save_calibration(pdf_dir: Path, calibration: dict) -> Path:
+    data = _load_calibrations()
+    data[str(Path(pdf_dir).resolve())] = calibration
+    CALIBRATION_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CALIBRATION_PATH.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    return CALIBRATION_PATH
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Backends de extracción de texto de PDFs.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="Backends instalados y orden de preferencia")
+    p_cal = sub.add_parser("calibrate", help="Mide los backends con una muestra de la carpeta")
+    p_cal.add_argument("pdf_dir", type=Path)
+    p_cal.add_argument("--sample", type=int, default=10, help="Número de PDFs de la muestra")
+    p_cal.add_argument("--recursive", action="store_true", help="Busca PDFs en subcarpetas")
+    p_cal.add_argument("--timeout", type=float, default=60.0, help="Segundos máximos por PDF y backend")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        installed = available_pdf_backends()
+        print("Registrados:", ", ".join(PDF_BACKENDS))
+        print("Instalados: ", ", ".join(installed) or "(ninguno)")
+        print("Preferencia:", ", ".join(preferred_backend_order(None, installed)) or "(ninguno)")
+        return 0
+
+    if not args.pdf_dir.is_dir():
+        print(f"No existe la carpeta de PDFs: {args.pdf_dir}", file=sys.stderr)
+        return 2
+    pdf_paths = sorted(args.pdf_dir.rglob("*.pdf") if args.recursive else args.pdf_dir.glob("*.pdf"))
+    if not pdf_paths:
+        print("No se encontraron PDFs.", file=sys.stderr)
+        return 2
+    if not available_pdf_backends():
+        print("No hay backends instalados. Instala con:\n  pip install pdfminer.six\n  o\n  pip install pypdf",
+              file=sys.stderr)
+        return 2
+    calibration = calibrate(pdf_paths, args.sample, timeout=args.timeout)
+    path = save_calibration(args.pdf_dir, calibration)
+    print(f"Orden elegido: {' > '.join(calibration['order'])}  (guardado en {path})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+# --- Benchmarks del conteo de palabras (cc_pdf.py) ---
+# Para saber si un cambio en compile_pattern / count_occurrences / normalize_text acelera o frena:
+#   1) genera un corpus sintético reproducible (semilla fija): PDFs y texto plano, en español, inglés,
+#      con acentos o mezclado, con el número de páginas y el tamaño que se pida;
+#   2) mide cada etapa por separado: extracción (por backend disponible), normalización, conteo
+#      palabra completa / subcadenas / con stemming, y escritura del CSV;
+#   3) con vocabularios de distinto tamaño (de 10 a 50.000 términos).
+# Informa de MB/s, docs/s y pico de memoria (tracemalloc). Funciona sin red (los PDFs se escriben a mano,
+# sin librerías externas).
+#
+# Uso:
+#   python cc_bench.py --docs 20 --pages 10 --lang mixed --vocab 10,1000,10000,50000
+#   python cc_bench.py --stages normalize,whole_word --json bench.json
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from cc_backends import available_pdf_backends, load_pdf_backend
+from cc_pdf import CountingEngine, normalize_text, pick_stemmer
+from cc_results import ResultWriter
+
+STAGES = ("extract", "normalize", "whole_word", "substring", "stemmed", "csv")
+
+# ----------------- Corpus sintético -----------------
+
+WORDS = {
+    "es": ("el la de que y en los se del las un por con no una su para es al lo como más pero sus le ya o "
+           "este porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos "
+           "durante todos uno les ni contra otros ese eso ante ellos e esto mí antes algunos qué unos yo "
+           "otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas "
+           "escuela aprendizaje profundo máquina inteligencia artificial red neuronal datos modelo "
+           "planificación gestión evaluación educación política económica investigación desarrollo "
+           "sistema análisis proceso información resultado estudio programa proyecto"),
+    "en": ("the of and to in a is that for it as was with be by on not he this are or his from at which "
+           "but have an they you were her she there been one all we their has would when if so no what "
+           "up out who them some could him into its then two more these about other than only "
+           "school machine learning deep artificial intelligence neural network data model planning "
+           "management evaluation education policy economic research development system analysis "
+           "process information result study program project country city company family policy"),
+    "accents": ("acción canción corazón información educación nación razón también después árbol lápiz "
+                "fácil difícil útil móvil así aquí allí según además quizás jamás café menú sofá "
+                "niño año señor mañana pequeño compañía España diseño sueño otoño cigüeña pingüino "
+                "vergüenza crème brûlée naïve façade über straße"),
+}
+WORDS["mixed"] = " ".join(WORDS.values())
+
+
+def _word_pool(lang: str) -> List[str]:
+    if lang not in WORDS:
+        raise ValueError(f"Idioma no soportado: {lang} (usa {', '.join(WORDS)})")
+    return WORDS[lang].split()
+
+
+def synthetic_pages(rng: random.Random, pool: List[str], pages: int, words_per_page: int) -> List[str]:
+    """Páginas de texto con frecuencias tipo Zipf (las primeras palabras del pool son las más comunes)."""
+
+    weights = [1.0 / (rank + 1) for rank in range(len(pool))]
+    result = []
+    for _ in range(pages):
+        words = rng.choices(pool, weights=weights, k=words_per_page)
+        lines, line = [], []
+        for i, w in enumerate(words):
+            if i and rng.random() < 0.06:
+                w = w.capitalize()
+            line.append(w + ("." if rng.random() < 0.05 else ""))
+            if len(line) >= 12:
+                lines.append(" ".join(line)); line = []
+        if line:
+            lines.append(" ".join(line))
+        result.append("\n".join(lines))
+    return result
+
+
+def _pdf_escape(line: str) -> bytes:
+    data = line.encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def write_simple_pdf(path: Path, pages: List[str]) -> None:
+    """PDF mínimo (Helvetica, WinAnsiEncoding) con una página por texto; sin dependencias externas."""
+
+    objects: List[bytes] = []  # objeto n -> índice n-1
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(b"")  # Pages: se rellena al final
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    page_ids = []
+    for text in pages:
+        content = [b"BT /F1 9 Tf 11 TL 40 800 Td"]
+        for line in text.split("\n"):
+            content.append(b"(" + _pdf_escape(line) + b") Tj T*")
+        content.append(b"ET")
+        stream = b"\n".join(content)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def generate_corpus(out_dir: Path, docs: int, pages: int, words_per_page: int,
+                    lang: str = "mixed", seed: int = 1234, write_pdfs: bool = True) -> List[Path]:
+    """Escribe docs PDFs (doc_0000.pdf...) y su texto (doc_0000.txt...). Devuelve las rutas .txt."""
+
+    rng = random.Random(seed)
+    pool = _word_pool(lang)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    txt_paths = []
+    for i in range(docs):
+        doc_pages = synthetic_pages(rng, pool, pages, words_per_page)
+        txt = out_dir / f"doc_{i:04d}.txt"
+        txt.write_text("\n".join(doc_pages), encoding="utf-8")
+        txt_paths.append(txt)
+        if write_pdfs:
+            write_simple_pdf(out_dir / f"doc_{i:04d}.pdf", doc_pages)
+    return txt_paths
+
+
+def synthetic_vocabulary(size: int, lang: str = "mixed", seed: int = 99) -> List[str]:
+    """Listado de 'size' términos: palabras del corpus (aciertos), algunas frases y el resto inventadas."""
+
+    rng = random.Random(seed)
+    pool = _word_pool(lang)
+    vocab = list(dict.fromkeys(pool))[:max(1, size // 2)]
+    for _ in range(max(0, size // 20)):
+        vocab.append(f"{rng.choice(pool)} {rng.choice(pool)}")
+    syllables = "ba be bi bo bu ca ce ci co cu da de di do du fa fe fi la le li lo lu ma me mi mo mu " \
+                "na ne ni no nu pa pe pi po pu ra re ri ro ru sa se si so su ta te ti to tu ción dad".split()
+    seen = set(vocab)
+    while len(vocab) < size:
+        w = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 5)))
+        if w not in seen:
+            seen.add(w); vocab.append(w)
+    return vocab[:size]
+
+
+# ----------------- Medición -----------------
+
+def measure(fn: Callable[[], object], nbytes: int, ndocs: int, memory: bool = True) -> Dict[str, float]:
+    """Tiempo de fn() (sin tracemalloc, que frena) y, aparte, su pico de memoria."""
+
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    result = {
+        "seconds": round(seconds, 4),
+        "mb_per_s": round(nbytes / 1e6 / seconds, 2) if seconds else 0.0,
+        "docs_per_s": round(ndocs / seconds, 2) if seconds else 0.0,
+    }
+    if memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mb"] = round(peak / 1e6, 2)
+    return result
+
+
+def available_extractors() -> Dict[str, Callable[[str], str]]:
+    """Todos los backends de extracción instalados (no sólo el primero, como pick_pdf_backend)."""
+
+    return {name: load_pdf_backend(name) for name in available_pdf_backends()}
+
+
+def run_benchmarks(corpus_dir: Path, txt_paths: List[Path], vocab_sizes: List[int], stages: List[str],
+                   lang: str, memory: bool = True, log=print) -> List[Dict[str, object]]:
+    texts = [p.read_text(encoding="utf-8") for p in txt_paths]
+    nbytes = sum(len(t.encode("utf-8")) for t in texts)
+    ndocs = len(texts)
+    norm_texts = [normalize_text(t) for t in texts]
+    rows: List[Dict[str, object]] = []
+
+    def record(stage: str, detail: str, res: Dict[str, float]) -> None:
+        row = {"stage": stage, "detail": detail, **res}
+        rows.append(row)
+        log(f"{stage:<11} {detail:<22} {res['seconds']:>9.3f}s {res['mb_per_s']:>9.2f} MB/s "
+            f"{res['docs_per_s']:>9.2f} docs/s" + (f" {res['peak_mb']:>9.2f} MB pico" if "peak_mb" in res else ""))
+
+    if "extract" in stages:
+        pdf_paths = [p.with_suffix(".pdf") for p in txt_paths if p.with_suffix(".pdf").exists()]
+        extractors = available_extractors()
+        if not pdf_paths or not extractors:
+            log("extract     (sin PDFs o sin backends instalados: se omite)")
+        pdf_bytes = sum(p.stat().st_size for p in pdf_paths)
+        for name, fn in extractors.items():
+            if pdf_paths:
+                record("extract", name, measure(lambda: [fn(str(p)) for p in pdf_paths], pdf_bytes,
+                                                len(pdf_paths), memory))
+
+    if "normalize" in stages:
+        for remove_accents in (True, False):
+            record("normalize", f"remove_accents={remove_accents}",
+                   measure(lambda: [normalize_text(t, remove_accents) for t in texts], nbytes, ndocs, memory))
+
+    for size in vocab_sizes:
+        vocab = synthetic_vocabulary(size, lang)
+        modes = []
+        if "whole_word" in stages:
+            modes.append(("whole_word", True, False))
+        if "substring" in stages:
+            modes.append(("substring", False, False))
+        if "stemmed" in stages:
+            if pick_stemmer(vocab) is None:
+                log("stemmed     (nltk no instalado: se omite)")
+            else:
+                modes.append(("stemmed", True, True))
+        for stage, whole_word, with_stem in modes:
+            engine = CountingEngine(vocab, remove_accents=True, whole_word=whole_word)
+            if not with_stem:
+                engine.stemmer, engine.tokens_with_stem = None, []
+            record(stage, f"vocab={size}",
+                   measure(lambda: [engine.count_normalized(t) for t in norm_texts], nbytes, ndocs, memory))
+
+        if "csv" in stages:
+            engine = CountingEngine(vocab, remove_accents=True, whole_word=True)
+            counts = [engine.count_normalized(t) for t in norm_texts]
+            names = [p.with_suffix(".pdf").name for p in txt_paths]
+            for fmt in ("wide", "long"):
+                def write() -> None:
+                    with tempfile.TemporaryDirectory() as tmp:
+                        writer = ResultWriter(Path(tmp) / "out.csv", fmt, vocab, engine.original_to_norm,
+                                              engine.norm_tokens)
+                        for name, c in zip(names, counts):
+                            writer.add(name, c)
+                        writer.finish(names)
+                record("csv", f"{fmt} vocab={size}", measure(write, nbytes, ndocs, memory))
+
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa del conteo de palabras en PDFs.")
+    parser.add_argument("--corpus-dir", type=Path, default=None,
+                        help="Dónde generar el corpus (por defecto, una carpeta temporal)")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--lang", choices=sorted(WORDS), default="mixed")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--vocab", default="10,1000,10000,50000",
+                        help="Tamaños de vocabulario separados por comas")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Etapas: {','.join(STAGES)}")
+    parser.add_argument("--no-pdf", action="store_true", help="Sólo texto plano (sin PDFs ni extracción)")
+    parser.add_argument("--no-memory", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("--json", type=Path, default=None, help="Guarda los resultados en JSON")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Etapas desconocidas: {', '.join(unknown)}")
+    vocab_sizes = [int(v) for v in args.vocab.split(",") if v.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus_dir or Path(tmp)
+        t0 = time.perf_counter()
+        txt_paths = generate_corpus(corpus_dir, args.docs, args.pages, args.words_per_page,
+                                    args.lang, args.seed, write_pdfs=not args.no_pdf)
+        print(f"Corpus: {args.docs} docs x {args.pages} páginas ({args.lang}) en {corpus_dir} "
+              f"[{time.perf_counter() - t0:.1f}s]")
+        rows = run_benchmarks(corpus_dir, txt_paths, vocab_sizes, stages, args.lang, not args.no_memory)
+
+    if args.json:
+        meta = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        args.json.write_text(json.dumps({"args": meta, "results": rows}, indent=2, ensure_ascii=False),
+                             encoding="utf-8")
+        print(f"Resultados guardados en {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# --- Caché en disco del texto extraído de los PDFs (para cc_pdf.py) ---
+# Extraer texto con pdfminer es lo más lento de todo. Si sólo cambia el listado de palabras no hace falta
+# volver a leer los PDFs: guardamos el texto (comprimido con zlib) en un SQLite, con clave
+#   backend + tipo de texto (crudo / normalizado con o sin acentos) + identidad del archivo
+# La identidad es ruta + tamaño + mtime, o bien un hash del contenido (así las copias comparten entrada).
+# El texto crudo (raw) lo guarda la capa de extracción común (cc_extract) y sirve a cc_pdf y a extractpdf.
+# El tamaño total está limitado: cuando se pasa del límite se borran las entradas menos usadas (LRU).
+# El total se lleva en una fila aparte (texts_size), actualizada en la misma transacción que cada escritura,
+# para no sumar la tabla entera en cada put; la sirven todos los procesos que comparten el archivo.
+
+import hashlib
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "cc_pdf" / "text_cache.sqlite"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB (comprimido)
+PARTIAL_HASH_BYTES = 64 * 1024          # bytes del principio y del final para la huella rápida
+
+
+def file_fingerprint(pdf_path: Path, use_hash: bool = False) -> str:
+    """Identidad de un archivo: 'ruta|tamaño|mtime' o 'sha256:...' del contenido."""
+
+    st = pdf_path.stat()
+    if not use_hash:
+        return f"{pdf_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    h = hashlib.sha256()
+    with pdf_path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return f"sha256:{h.hexdigest()}|{st.st_size}"
+
+
+def partial_hash(pdf_path: Path, size: int) -> str:
+    """Huella rápida: tamaño + primeros y últimos PARTIAL_HASH_BYTES del archivo."""
+
+    h = hashlib.sha256(str(size).encode())
+    with pdf_path.open("rb") as f:
+        h.update(f.read(PARTIAL_HASH_BYTES))
+        if size > 2 * PARTIAL_HASH_BYTES:
+            f.seek(-PARTIAL_HASH_BYTES, 2)
+            h.update(f.read(PARTIAL_HASH_BYTES))
+    return h.hexdigest()
+
+
+def group_identical(paths: List[Path]) -> Dict[Path, List[Path]]:
+    """Agrupa archivos con el mismo contenido: {representante: [rutas idénticas, incluida la suya]}.
+
+    Sólo se leen los archivos que comparten tamaño con otro; de esos, primero la huella rápida
+    (partial_hash) y el hash completo sólo si también coincide. El representante es la primera ruta de
+    cada grupo (en el orden de paths). Los archivos que no se pueden leer quedan solos.
+    """
+
+    groups: Dict[Path, List[Path]] = {p: [p] for p in paths}
+    by_size: Dict[int, List[Path]] = {}
+    for p in paths:
+        try:
+            by_size.setdefault(p.stat().st_size, []).append(p)
+        except OSError:
+            pass
+
+    for size, same_size in by_size.items():
+        if len(same_size) < 2:
+            continue
+        by_partial: Dict[str, List[Path]] = {}
+        for p in same_size:
+            try:
+                by_partial.setdefault(partial_hash(p, size), []).append(p)
+            except OSError:
+                pass
+        for candidates in by_partial.values():
+            if len(candidates) < 2:
+                continue
+            if size <= 2 * PARTIAL_HASH_BYTES:
+                by_full = {"": candidates}  # la huella rápida ya cubre el archivo entero
+            else:
+                by_full: Dict[str, List[Path]] = {}
+                for p in candidates:
+                    try:
+                        by_full.setdefault(file_fingerprint(p, use_hash=True), []).append(p)
+                    except OSError:
+                        pass
+            for same in by_full.values():
+                first = same[0]
+                for p in same[1:]:
+                    groups[first].append(p)
+                    del groups[p]
+    return groups
+
+
+class TextCache:
+    """Caché LRU comprimida de textos extraídos, guardada en un archivo SQLite."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 use_hash: bool = False, normalized: bool = True):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.use_hash = use_hash
+        # normalized=True guarda el texto ya pasado por normalize_text (se ahorra también ese paso)
+        self.normalized = normalized
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # timeout alto: con varios procesos en paralelo todos escriben en el mismo archivo
+        self._conn = sqlite3.connect(str(self.path), timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS texts ("
+            " key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS texts_last_used ON texts(last_used)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS texts_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+        )
+        # Cachés de antes (o recién creadas): el total se calcula una vez, al abrir
+        self._conn.execute("INSERT OR IGNORE INTO texts_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM texts")
+        self._conn.commit()
+
+    def config(self) -> tuple:
+        """Parámetros para abrir la misma caché en otro proceso."""
+
+        return (str(self.path), self.max_bytes, self.use_hash, self.normalized)
+
+    def make_key(self, pdf_path: Path, backend_name: str, remove_accents: bool, raw: bool = False) -> str:
+        kind = f"norm:{int(remove_accents)}" if self.normalized and not raw else "raw"
+        return f"{backend_name}|{kind}|{file_fingerprint(pdf_path, self.use_hash)}"
+
+    def get(self, pdf_path: Path, backend_name: str, remove_accents: bool, raw: bool = False,
+            record: bool = True) -> Optional[str]:
+        """Texto guardado o None. raw=True busca el texto crudo aunque la caché sea de normalizados;
+        record=False no cuenta el acierto/fallo (lo anota quien llama, con record())."""
+
+        try:
+            key = self.make_key(pdf_path, backend_name, remove_accents, raw)
+        except OSError:
+            if record:
+                self.misses += 1
+            return None
+        row = self._conn.execute("SELECT data FROM texts WHERE key = ?", (key,)).fetchone()
+        if record:
+            self.record(row is not None)
+        if row is None:
+            return None
+        self._conn.execute("UPDATE texts SET last_used = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, pdf_path: Path, backend_name: str, remove_accents: bool, text: str, raw: bool = False) -> None:
+        try:
+            key = self.make_key(pdf_path, backend_name, remove_accents, raw)
+        except OSError:
+            return
+        data = zlib.compress(text.encode("utf-8"), 6)
+        if len(data) > self.max_bytes:
+            return  # no cabe ni vacía: no la guardamos
+        # BEGIN IMMEDIATE: el tamaño anterior y el total no pueden cambiar entre la lectura y la escritura
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            old = self._conn.execute("SELECT size FROM texts WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO texts (key, data, size, last_used) VALUES (?, ?, ?, ?)",
+                               (key, data, len(data), time.time()))
+            self._add_size(len(data) - (old[0] if old else 0))
+            self._evict()
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def _add_size(self, delta: int) -> None:
+        self._conn.execute("UPDATE texts_size SET total = total + ? WHERE id = 0", (delta,))
+
+    def _total(self) -> int:
+        return self._conn.execute("SELECT total FROM texts_size WHERE id = 0").fetchone()[0]
+
+    def _evict(self) -> None:
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        # Borra desde la menos usada hasta volver a estar por debajo del límite
+        freed = 0
+        for key, size in self._conn.execute("SELECT key, size FROM texts ORDER BY last_used").fetchall():
+            if total - freed <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM texts WHERE key = ?", (key,))
+            freed += size
+            self.evictions += 1
+        self._add_size(-freed)
+
+    def record(self, hit: bool) -> None:
+        """Suma un acierto/fallo ocurrido en otro proceso (modo paralelo)."""
+
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._conn.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": entries, "bytes": self._total()}
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM texts")
+        self._conn.execute("UPDATE texts_size SET total = 0 WHERE id = 0")
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,467 @@
+# --- Servicio de conteo en caliente (para cc_pdf.py) ---
+# Cada vez que se lanza cc_pdf se pagan las importaciones (pdfminer, nltk), leer el listado, pick_stemmer y
+# preparar el motor de búsqueda antes de contar una sola página. Para un sistema que manda los documentos
+# según llegan eso es casi todo el tiempo. Este servicio lo prepara UNA vez y se queda esperando:
+#   - API HTTP local (127.0.0.1) o por socket Unix:
+#       POST /count   {"path": "/ruta/doc.pdf"}  o el PDF en el cuerpo (Content-Type: application/pdf)
+#                     -> {"document", "counts": {palabra: conteo}, "total", "backend", "elapsed_ms", ...}
+#                     (?all=1 incluye también las palabras con 0; las rutas tienen que estar dentro de --root,
+#                     que por defecto es la carpeta de --watch)
+#       POST /reload  vuelve a leer el listado ahora
+#       GET  /health  estado (palabras cargadas, versión del listado, documentos contados)
+#   - y/o vigila una carpeta (--watch): cada PDF nuevo o modificado se cuenta al terminar de copiarse y sale
+#     como evento JSON por stdout (y como filas documento,palabra,conteo en --output si se pide).
+#     Los PDFs ya contados se apuntan en un SQLite (--state; por defecto junto a --output), así que al
+#     reiniciar el servicio no se vuelven a contar ni se duplican filas en --output.
+# El listado se recarga solo si cambia el archivo (se mira en cada petición y en cada vuelta del vigilante);
+# si el nuevo listado falla se sigue con el anterior.
+#   python cc_daemon.py -w palabras.xlsx --port 8765 --watch entrada --output conteos_largo.csv
+
+import argparse
+import csv
+import json
+import os
+import signal
+import socketserver
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from cc_cache import TextCache
+from cc_isolate import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT, ExtractionFailed, IsolatedExtractor
+from cc_pdf import (EXIT_INPUT, EXIT_NO_BACKEND, EXIT_OK, TOTAL_KEY, CountingEngine, _emit, doc_key, find_pdfs,
+                    load_normalized_text, make_extractor, read_words)
+
+DEFAULT_PORT = 8765
+WATCH_INTERVAL = 2.0       # segundos entre vueltas del vigilante de carpeta
+MAX_UPLOAD_BYTES = 512 * 1024 * 1024
+WATCH_STATE_PATH = Path.home() / ".cache" / "cc_pdf" / "daemon_watch.sqlite"
+
+
+class WarmCounter:
+    """Listado, motor (patrones, stemmer) y extractor cargados una vez y reutilizados en cada documento.
+
+    La extracción y la caché (sqlite) viven en un único hilo propio: las peticiones HTTP y el vigilante
+    le mandan trabajo y esperan el resultado. Recargar el listado cambia el motor de golpe (el documento
+    que se esté contando termina con el anterior).
+    """
+
+    def __init__(self, words_path: Path, substrings: bool, keep_accents: bool, extractor,
+                 backend_name: str, use_cache: bool = True):
+        self.words_path = words_path
+        self.whole_word = not substrings
+        self.remove_accents = not keep_accents
+        self.extractor = extractor
+        self.backend_name = backend_name
+        self.use_cache = use_cache
+        self.documents = 0
+        self._cache: Optional[TextCache] = None
+        self._reload_lock = threading.Lock()
+        self._mtime = None
+        self.engine: Optional[CountingEngine] = None
+        self.words: List[str] = []
+        self.loaded_at = 0.0
+        self.reload()
+        self._executor = ThreadPoolExecutor(max_workers=1, initializer=self._open_cache)
+
+    def _open_cache(self) -> None:
+        if self.use_cache:
+            try:
+                self._cache = TextCache()  # en el hilo que la usa (sqlite no se comparte entre hilos)
+            except Exception as e:
+                print("AVISO: no se pudo abrir la caché de texto:", e, file=sys.stderr)
+
+    # ---- listado ----
+
+    def reload(self) -> None:
+        """Lee el listado y prepara el motor nuevo; si falla se queda el anterior (y se propaga el error)."""
+
+        with self._reload_lock:
+            self._load()
+
+    def _load(self) -> None:
+        mtime = self.words_path.stat().st_mtime_ns
+        words = read_words(self.words_path)
+        if not words:
+            raise ValueError("Asegura que las palabras estén en la 1ª columna.")
+        engine = CountingEngine(words, remove_accents=self.remove_accents, whole_word=self.whole_word)
+        self.engine, self.words, self._mtime = engine, words, mtime
+        self.loaded_at = time.time()
+
+    def reload_if_changed(self) -> bool:
+        # Lo llaman a la vez los hilos de la API y el vigilante: sólo uno mira la fecha y recarga
+        with self._reload_lock:
+            try:
+                mtime = self.words_path.stat().st_mtime_ns
+            except OSError:
+                return False  # se está reemplazando el archivo: se mira en la siguiente
+            if mtime == self._mtime:
+                return False
+            try:
+                self._load()
+            except Exception as e:
+                self._mtime = mtime  # no se reintenta hasta que el archivo vuelva a cambiar
+                _emit("reload_error", words=str(self.words_path), message=str(e))
+                return False
+        _emit("reloaded", words=str(self.words_path), terms=len(self.words))
+        return True
+
+    # ---- conteo ----
+
+    def _count(self, pdf_path: Path, use_cache: bool) -> dict:
+        engine = self.engine
+        t0 = time.perf_counter()
+        cache = self._cache if use_cache else None
+        self.extractor.last_backend = ""  # vacío si el texto sale de la caché
+        try:
+            norm_text = load_normalized_text(pdf_path, self.extractor, engine.remove_accents, cache,
+                                             self.backend_name)
+        finally:
+            incidents = self.extractor.take_incidents() if isinstance(self.extractor, IsolatedExtractor) else []
+        counts = engine.count_normalized(norm_text)
+        self.documents += 1
+        return {"engine": engine, "counts": counts, "incidents": incidents,
+                "backend": getattr(self.extractor, "last_backend", "") or self.backend_name,
+                "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2)}
+
+    def count(self, pdf_path: Path, use_cache: bool = True, include_zeros: bool = False) -> dict:
+        """Conteos por palabra del listado (las del archivo original, no las normalizadas).
+
+        Si no se puede extraer el texto lanza ExtractionFailed (no se devuelven conteos a cero).
+        """
+
+        self.reload_if_changed()
+        res = self._executor.submit(self._count, pdf_path, use_cache).result()
+        engine, counts = res["engine"], res["counts"]
+        per_word: Dict[str, int] = {}
+        for w in engine.original_words:
+            n = counts.get(engine.original_to_norm[w], 0)
+            if n or include_zeros:
+                per_word[w] = n
+        return {"document": str(pdf_path), "counts": per_word, "total": counts.get(TOTAL_KEY, 0),
+                "backend": res["backend"], "elapsed_ms": res["elapsed_ms"], "incidents": res["incidents"],
+                "words_loaded_at": self.loaded_at}
+
+    def health(self) -> dict:
+        return {"status": "ok", "words": str(self.words_path), "terms": len(self.words),
+                "words_loaded_at": self.loaded_at, "documents": self.documents, "backend": self.backend_name}
+
+    def close(self) -> None:
+        def _close_cache():
+            if self._cache is not None:
+                self._cache.close()
+        self._executor.submit(_close_cache).result()
+        self._executor.shutdown()
+        if isinstance(self.extractor, IsolatedExtractor):
+            self.extractor.close()
+
+
+# ----------------- API HTTP -----------------
+
+class CountHandler(BaseHTTPRequestHandler):
+    counter: WarmCounter = None  # se fija en make_handler
+    root: Optional[Path] = None
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # sin el log de cada petición por stderr
+        pass
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._reply(200, self.counter.health())
+        else:
+            self._reply(404, {"error": "no encontrado"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path == "/reload":
+            try:
+                self.counter.reload()
+            except Exception as e:
+                self._reply(422, {"error": f"no se pudo recargar el listado: {e}"})
+                return
+            self._reply(200, self.counter.health())
+            return
+        if url.path != "/count":
+            self._reply(404, {"error": "no encontrado"})
+            return
+
+        include_zeros = parse_qs(url.query).get("all", ["0"])[0] not in ("0", "", "false")
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_UPLOAD_BYTES:
+            self._reply(413, {"error": f"más de {MAX_UPLOAD_BYTES // (1024 * 1024)} MB"})
+            return
+        body = self.rfile.read(length) if length else b""
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+
+        try:
+            if content_type == "application/pdf":
+                # PDF subido: a un temporal (sin caché: la ruta no dice nada del contenido)
+                fd, tmp = tempfile.mkstemp(suffix=".pdf")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(body)
+                    result = self.counter.count(Path(tmp), use_cache=False, include_zeros=include_zeros)
+                finally:
+                    os.unlink(tmp)
+                result["document"] = self.headers.get("X-Filename", "upload.pdf")
+            else:
+                try:
+                    pdf_path = Path(json.loads(body or b"{}")["path"]).resolve()
+                except (ValueError, KeyError, TypeError):
+                    self._reply(400, {"error": 'cuerpo esperado: {"path": "..."} o el PDF (application/pdf)'})
+                    return
+                if self.root is None:
+                    self._reply(403, {"error": "rutas no aceptadas: arranca el servicio con --root (o --watch) "
+                                               "o manda el PDF en el cuerpo"})
+                    return
+                if self.root not in pdf_path.parents:
+                    self._reply(403, {"error": f"sólo se aceptan rutas dentro de {self.root}"})
+                    return
+                if not pdf_path.is_file():
+                    self._reply(404, {"error": f"no existe: {pdf_path}"})
+                    return
+                result = self.counter.count(pdf_path, include_zeros=include_zeros)
+        except ExtractionFailed as e:
+            self._reply(422, {"error": f"no se pudo extraer el texto: {e}"})
+            return
+        except Exception as e:
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._reply(200, result)
+
+
+def make_handler(counter: WarmCounter, root: Optional[Path] = None):
+    return type("BoundCountHandler", (CountHandler,), {"counter": counter, "root": root})
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("unix", 0)  # BaseHTTPRequestHandler espera (host, puerto)
+
+
+# ----------------- Vigilante de carpeta -----------------
+
+class LongAppender:
+    """Añade filas documento,palabra,conteo a un CSV largo (con cabecera si es nuevo)."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        new = not path.exists() or path.stat().st_size == 0
+        self._f = path.open("a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._f)
+        if new:
+            self._writer.writerow(["documento", "palabra", "conteo"])
+
+    def write(self, result: dict) -> None:
+        doc = result["document"]
+        self._writer.writerows((doc, w, n) for w, n in result["counts"].items())
+        self._writer.writerow([doc, TOTAL_KEY, result["total"]])
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def watch_state_path(output: Optional[Path]) -> Path:
+    """Junto al CSV de salida (conteos.csv -> conteos_vigilados.sqlite) o, sin salida, en ~/.cache/cc_pdf."""
+
+    if output is None:
+        return WATCH_STATE_PATH
+    return output.with_name(output.stem + "_vigilados.sqlite")
+
+
+class WatchState:
+    """PDFs ya contados por el vigilante: (carpeta, documento) -> tamaño y fecha cuando se contó."""
+
+    def __init__(self, path: Path, folder: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.folder = str(folder.resolve())
+        self._conn = sqlite3.connect(str(self.path), timeout=60)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed ("
+            "  folder TEXT NOT NULL, document TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            "  PRIMARY KEY (folder, document))")
+        self._conn.commit()
+
+    def load(self) -> Dict[str, tuple]:
+        rows = self._conn.execute("SELECT document, size, mtime_ns FROM processed WHERE folder = ?", (self.folder,))
+        return {doc: (size, mtime_ns) for doc, size, mtime_ns in rows}
+
+    def mark(self, document: str, sig: tuple) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO processed (folder, document, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                           (self.folder, document, *sig))
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def watch_folder(counter: WarmCounter, folder: Path, recursive: bool, stop: threading.Event,
+                 interval: float = WATCH_INTERVAL, appender: Optional[LongAppender] = None,
+                 state_path: Optional[Path] = None) -> None:
+    """Cuenta cada PDF nuevo o modificado de la carpeta; espera a que su tamaño no cambie entre dos
+    vueltas (que se haya terminado de copiar). Con state_path lo ya contado se recuerda entre reinicios."""
+
+    # sqlite se abre en este hilo (no se comparte entre hilos)
+    state = WatchState(state_path, folder) if state_path is not None else None
+    done: Dict[str, tuple] = state.load() if state is not None else {}
+    seen: Dict[str, tuple] = {}
+    try:
+        while not stop.is_set():
+            counter.reload_if_changed()
+            for pdf_path in find_pdfs(folder, recursive):
+                try:
+                    st = pdf_path.stat()
+                except OSError:
+                    continue
+                key = doc_key(pdf_path, folder)
+                sig = (st.st_size, st.st_mtime_ns)
+                if done.get(key) == sig:
+                    continue
+                if seen.get(key) != sig:
+                    seen[key] = sig  # primera vez con este tamaño: se cuenta en la siguiente vuelta
+                    continue
+                try:
+                    result = counter.count(pdf_path)
+                except Exception as e:
+                    _emit("error", file=str(pdf_path), message=f"{type(e).__name__}: {e}")
+                else:
+                    _emit("counted", **result)
+                    if appender is not None:
+                        appender.write(result)
+                    if state is not None:
+                        state.mark(key, sig)  # los que fallan se reintentan al reiniciar
+                done[key] = sig
+                if stop.is_set():
+                    break
+            stop.wait(interval)
+    finally:
+        if state is not None:
+            state.close()
+
+
+# ----------------- Línea de comandos -----------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Servicio de conteo en caliente (API local y/o carpeta vigilada).")
+    parser.add_argument("-w", "--words", type=Path, required=True, help="Archivo de palabras (se recarga si cambia)")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección de la API HTTP")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Puerto de la API HTTP")
+    parser.add_argument("--socket", type=Path, default=None, help="Socket Unix en vez de puerto TCP")
+    parser.add_argument("--no-http", action="store_true", help="Sin API (sólo carpeta vigilada)")
+    parser.add_argument("--root", type=Path, default=None,
+                        help="Sólo acepta rutas dentro de esta carpeta (por defecto la de --watch; sin ninguna "
+                             "de las dos sólo se aceptan PDFs en el cuerpo)")
+    parser.add_argument("--watch", type=Path, default=None, help="Carpeta a vigilar")
+    parser.add_argument("--recursive", action="store_true", help="Vigila también las subcarpetas")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="Segundos entre vueltas")
+    parser.add_argument("--output", type=Path, default=None, help="CSV largo al que se añaden los conteos vigilados")
+    parser.add_argument("--state", type=Path, default=None,
+                        help="SQLite con los PDFs ya contados (por defecto junto a --output o en ~/.cache/cc_pdf)")
+    parser.add_argument("--substrings", action="store_true", help="Cuenta subcadenas (no sólo palabra/frase completa)")
+    parser.add_argument("--keep-accents", action="store_true", help="No normaliza acentos")
+    parser.add_argument("--no-cache", action="store_true", help="No usa la caché de texto extraído")
+    parser.add_argument("--backend", default=None, help="Backend de extracción preferido")
+    parser.add_argument("--no-isolate", action="store_true", help="Extrae en el mismo proceso (sin tiempo máximo)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Segundos máximos por PDF")
+    parser.add_argument("--max-memory", type=int, default=DEFAULT_MAX_MEMORY_MB, help="MB máximos al extraer")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.no_http and args.watch is None:
+        parser.error("con --no-http hace falta --watch")
+    if args.watch is not None and not args.watch.is_dir():
+        _emit("error", title="Error", message=f"No existe la carpeta a vigilar: {args.watch}")
+        return EXIT_INPUT
+
+    extractor = make_extractor(args.watch, args.backend)
+    if extractor is None:
+        _emit("error", title="No se han detectado librerías para lectura PDF",
+              message="Instala al menos una: pip install pdfminer.six  o  pip install pypdf")
+        return EXIT_NO_BACKEND
+    backend_name = extractor.name
+    if not args.no_isolate:
+        extractor = IsolatedExtractor(extractor.backends, args.timeout, args.max_memory)
+
+    try:
+        counter = WarmCounter(args.words, args.substrings, args.keep_accents, extractor, backend_name,
+                              use_cache=not args.no_cache)
+    except Exception as e:
+        _emit("error", title="Error leyendo palabras", message=str(e))
+        return EXIT_INPUT
+
+    stop = threading.Event()
+
+    def _on_signal(signum, frame):
+        stop.set()
+
+    for sig in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+        if sig is not None:
+            signal.signal(sig, _on_signal)
+
+    server = None
+    threads: List[threading.Thread] = []
+    appender = LongAppender(args.output) if args.output is not None else None
+    try:
+        if not args.no_http:
+            root = args.root or args.watch
+            handler = make_handler(counter, root.resolve() if root is not None else None)
+            if args.socket is not None:
+                if args.socket.exists():
+                    args.socket.unlink()
+                server = UnixHTTPServer(str(args.socket), handler)
+                address = str(args.socket)
+            else:
+                server = ThreadingHTTPServer((args.host, args.port), handler)
+                address = f"http://{args.host}:{server.server_address[1]}"
+            threads.append(threading.Thread(target=server.serve_forever, daemon=True))
+        if args.watch is not None:
+            threads.append(threading.Thread(target=watch_folder, daemon=True,
+                                            args=(counter, args.watch, args.recursive, stop, args.interval,
+                                                  appender, args.state or watch_state_path(args.output))))
+        for t in threads:
+            t.start()
+        _emit("ready", address=address if server is not None else None,
+              watch=str(args.watch) if args.watch else None, **counter.health())
+        while not stop.wait(0.5):
+            pass
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            if args.socket is not None and args.socket.exists():
+                args.socket.unlink()
+        stop.set()
+        for t in threads:
+            t.join(5)
+        counter.close()
+        if appender is not None:
+            appender.close()
+    _emit("stopped", documents=counter.documents)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
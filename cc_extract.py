@@ -0,0 +1,102 @@
+# --- Capa única de extracción de texto de PDFs (para cc_pdf.py y extractpdf.py) ---
+# Los dos programas leían las mismas carpetas cada uno a su manera (extractpdf con PyPDF2, cc_pdf con
+# pdfminer/pypdf), así que cada PDF se parseaba dos veces o más. Ahora los dos extraen igual:
+#   - con los backends de cc_backends en el mismo orden de preferencia (CC_PDF_BACKENDS / calibración),
+#   - aislados en un proceso aparte (cc_isolate) si se quiere,
+#   - y pasando por la caché de cc_cache: el texto crudo que guarda extractpdf lo reutiliza cc_pdf
+#     (load_normalized_text lo busca antes de extraer) con el mismo nombre de extractor.
+# En modo combinado (extractpdf con listado de palabras) cada PDF se extrae una sola vez en el trabajo y ese
+# texto va tanto al conteo de palabras (CountingEngine) como a TF / TF-IDF / n-grams / coocurrencias.
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cc_backends import AutoExtractor, preferred_backend_order
+from cc_cache import TextCache
+from cc_isolate import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT, IsolatedExtractor
+from cc_profile import DocProfile, add_size, stage
+
+
+def make_extractor(pdf_dir: Optional[Path] = None, preferred: Optional[str] = None,
+                   streaming: bool = False) -> Optional[AutoExtractor]:
+    """Extractor con elección por documento en el orden de preferencia (None si no hay backends).
+
+    preferred pone ese backend el primero; el resto sigue CC_PDF_BACKENDS o la calibración de la carpeta
+    (python cc_backends.py calibrate ...).
+    """
+
+    order = preferred_backend_order(pdf_dir)
+    if preferred in order:
+        order = [preferred] + [b for b in order if b != preferred]
+    if not order:
+        return None
+    return AutoExtractor(order, pages=streaming)
+
+
+def extract_text(pdf_path: Path, pdf_text_fn, cache: Optional[TextCache] = None, backend_name: str = "",
+                 prof: Optional[DocProfile] = None) -> str:
+    """Texto crudo de un PDF: de la caché (entrada de texto crudo) o extraído con pdf_text_fn y guardado.
+
+    Los errores de extracción se propagan (cada programa decide si omite el archivo o lo cuenta vacío).
+    """
+
+    if cache is not None:
+        with stage(prof, "cache"):
+            cached = cache.get(pdf_path, backend_name, False, raw=True)
+        if cached is not None:
+            if prof is not None:
+                prof.cache_hit = True
+            add_size(prof, "cache", len(cached))
+            return cached
+
+    with stage(prof, "extract"):
+        text = pdf_text_fn(str(pdf_path)) or ""
+    add_size(prof, "extract", len(text))
+    if cache is not None:
+        with stage(prof, "cache"):
+            cache.put(pdf_path, backend_name, False, text, raw=True)
+    return text
+
+
+class PdfTextSource:
+    """Texto crudo de los PDFs de una carpeta, extraído una vez con la configuración común.
+
+    name es el mismo que usa cc_pdf para ese orden de backends (así comparten entradas de caché).
+    Con isolate=True cada PDF se lee en un proceso aparte con tiempo máximo y techo de memoria.
+    """
+
+    def __init__(self, pdf_dir: Optional[Path] = None, preferred: Optional[str] = None,
+                 use_cache: bool = True, isolate: bool = True, timeout: float = DEFAULT_TIMEOUT,
+                 max_memory_mb: int = DEFAULT_MAX_MEMORY_MB):
+        auto = make_extractor(pdf_dir, preferred)
+        if auto is None:
+            raise RuntimeError("No se han detectado librerías para lectura PDF. Instala al menos una:\n"
+                               "  pip install pdfminer.six  o  pip install pypdf")
+        self.name = auto.name
+        self.extractor = IsolatedExtractor(auto.backends, timeout, max_memory_mb) if isolate else auto
+        self.cache: Optional[TextCache] = None
+        if use_cache:
+            try:
+                self.cache = TextCache(normalized=False)
+            except Exception as e:  # sin caché se puede seguir igual (sólo más lento)
+                print("AVISO: no se pudo abrir la caché de texto:", e, file=sys.stderr)
+
+    def text(self, pdf_path: Path) -> str:
+        self.extractor.last_backend = ""  # se queda vacío si el texto sale de la caché
+        return extract_text(pdf_path, self.extractor, self.cache, self.name)
+
+    @property
+    def last_backend(self) -> str:
+        return self.extractor.last_backend
+
+    def take_incidents(self) -> List[Dict[str, str]]:
+        if isinstance(self.extractor, IsolatedExtractor):
+            return self.extractor.take_incidents()
+        return []
+
+    def close(self) -> None:
+        if isinstance(self.extractor, IsolatedExtractor):
+            self.extractor.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,400 @@
+# --- Interfaz gráfica (Tk) del contador de palabras en PDFs ---
+# Antes estaba dentro de cc_pdf.py; ahora cc_pdf.py no importa tkinter y se puede usar sin pantalla
+# (python cc_pdf.py -w ... -d ... -o ...). Para abrir la ventana: python cc_gui.py (o cc_pdf.py sin argumentos).
+
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# --- Librerías para GUI (Graphic User Interface) ---
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from cc_backends import available_pdf_backends
+from cc_isolate import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT
+from cc_pdf import CountError, count_batch, find_pdfs, make_extractor
+from cc_profile import cprofile_requested
+
+
+# Texto del desplegable -> formato de cc_results
+OUTPUT_FORMAT_LABELS = {
+    "CSV ancho (palabra x PDF)": "wide",
+    "CSV largo (documento, palabra, conteo)": "long",
+    "Parquet (documento, palabra, conteo)": "parquet",
+    "Feather (documento, palabra, conteo)": "feather",
+}
+
+# Desplegable de backend: automático (orden calibrado/por defecto) o uno concreto primero
+AUTO_BACKEND_LABEL = "Automático (calibración / por defecto)"
+
+# Cada cuánto lee la ventana el progreso del hilo de trabajo (redibujo a ritmo fijo)
+PROGRESS_POLL_MS = 150
+
+class App(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Contar palabras en PDFs (by RSG - Sept 2025)")
+        self.geometry("720x660")
+        self.minsize(680, 620)
+
+        # Variables
+        self.var_words = tk.StringVar()
+        self.var_pdfdir = tk.StringVar()
+        self.var_output = tk.StringVar(value=str(Path.cwd() / "resultado_conteos.csv"))
+        self.var_substrings = tk.BooleanVar(value=False)
+        self.var_keep_accents = tk.BooleanVar(value=False)  # False => normaliza
+        self.var_recursive = tk.BooleanVar(value=False)
+        self.var_workers = tk.IntVar(value=1)  # 1 => secuencial; >1 => pool de procesos
+        self.var_use_cache = tk.BooleanVar(value=True)  # caché en disco del texto extraído
+        self.var_incremental = tk.BooleanVar(value=False)  # reutiliza conteos de ejecuciones anteriores
+        self.var_streaming = tk.BooleanVar(value=False)  # página a página (PDFs enormes, sin caché)
+        self.var_format = tk.StringVar(value=next(iter(OUTPUT_FORMAT_LABELS)))
+        self.var_profile = tk.BooleanVar(value=False)  # informe de tiempos por etapa junto a la salida
+        self.var_isolate = tk.BooleanVar(value=True)  # extracción en proceso aparte con tiempo máximo
+        self.var_timeout = tk.IntVar(value=int(DEFAULT_TIMEOUT))  # segundos por PDF
+        self.var_max_memory = tk.IntVar(value=DEFAULT_MAX_MEMORY_MB)  # MB del proceso de extracción
+        self.var_backend = tk.StringVar(value=AUTO_BACKEND_LABEL)  # o el nombre de un backend concreto
+
+        # Progreso
+        self.var_progress_text = tk.StringVar(value="Listo.")
+        self.var_progress_count = tk.StringVar(value="")
+        self.progress_value = tk.IntVar(value=0)
+        self.progress_max = 100
+
+        # Hilo de trabajo y comunicación con la ventana
+        self._job: Optional[threading.Thread] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._cancel = threading.Event()
+        self._progress = (0, 0, "")
+        self._started = time.monotonic()
+        self._exit_requested = False
+
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_exit)
+
+    def create_widgets(self):
+        pad = {'padx': 10, 'pady': 6}
+        frame = ttk.Frame(self); frame.pack(fill="both", expand=True, **pad)
+
+        # Archivo palabras
+        ttk.Label(frame, text="Archivo de palabras (Excel/CSV):").grid(row=0, column=0, sticky="w")
+        ttk.Entry(frame, textvariable=self.var_words).grid(row=1, column=0, columnspan=2, sticky="we", **pad)
+        ttk.Button(frame, text="Examinar...", command=self.select_words_file).grid(row=1, column=2, sticky="we", **pad)
+
+        # Carpeta PDFs
+        ttk.Label(frame, text="Carpeta con PDFs:").grid(row=2, column=0, sticky="w")
+        ttk.Entry(frame, textvariable=self.var_pdfdir).grid(row=3, column=0, columnspan=2, sticky="we", **pad)
+        ttk.Button(frame, text="Examinar...", command=self.select_pdf_dir).grid(row=3, column=2, sticky="we", **pad)
+
+        # Archivo salida
+        ttk.Label(frame, text="Archivo de salida (CSV):").grid(row=4, column=0, sticky="w")
+        ttk.Entry(frame, textvariable=self.var_output).grid(row=5, column=0, columnspan=2, sticky="we", **pad)
+        ttk.Button(frame, text="Cambiar...", command=self.select_output_file).grid(row=5, column=2, sticky="we", **pad)
+
+        # Opciones
+        options = ttk.LabelFrame(frame, text="Opciones")
+        options.grid(row=6, column=0, columnspan=3, sticky="we", **pad)
+        ttk.Checkbutton(options, text="Contar subcadenas (no sólo palabra/frase completa)", variable=self.var_substrings).grid(row=0, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(options, text="Mantener acentos (no normalizar)", variable=self.var_keep_accents).grid(row=1, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(options, text="Buscar recursivamente en subcarpetas", variable=self.var_recursive).grid(row=2, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(options, text="Usar caché de texto extraído (no relee PDFs sin cambios)", variable=self.var_use_cache).grid(row=3, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(options, text="Modo incremental (sólo PDFs nuevos/modificados y términos nuevos)", variable=self.var_incremental).grid(row=4, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(options, text="Leer página a página (PDFs muy grandes; no usa la caché)", variable=self.var_streaming).grid(row=5, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(options, text="Guardar informe de tiempos por etapa (JSON/CSV junto a la salida)", variable=self.var_profile).grid(row=6, column=0, sticky="w", padx=10, pady=4)
+        workers_row = ttk.Frame(options); workers_row.grid(row=7, column=0, sticky="w", padx=10, pady=4)
+        ttk.Label(workers_row, text="Procesos en paralelo:").pack(side="left")
+        ttk.Spinbox(workers_row, from_=1, to=max(os.cpu_count() or 1, 1), width=4,
+                    textvariable=self.var_workers).pack(side="left", padx=6)
+        ttk.Label(workers_row, text="Formato de salida:").pack(side="left", padx=(18, 0))
+        ttk.Combobox(workers_row, textvariable=self.var_format, values=list(OUTPUT_FORMAT_LABELS),
+                     state="readonly", width=36).pack(side="left", padx=6)
+        isolate_row = ttk.Frame(options); isolate_row.grid(row=8, column=0, sticky="w", padx=10, pady=4)
+        ttk.Checkbutton(isolate_row, text="Aislar extracción: máx. segundos por PDF", variable=self.var_isolate).pack(side="left")
+        ttk.Spinbox(isolate_row, from_=5, to=3600, width=6, textvariable=self.var_timeout).pack(side="left", padx=6)
+        ttk.Label(isolate_row, text="Memoria máx. (MB):").pack(side="left", padx=(18, 0))
+        ttk.Spinbox(isolate_row, from_=256, to=65536, increment=256, width=7,
+                    textvariable=self.var_max_memory).pack(side="left", padx=6)
+        backend_row = ttk.Frame(options); backend_row.grid(row=9, column=0, sticky="w", padx=10, pady=4)
+        ttk.Label(backend_row, text="Backend de extracción preferido:").pack(side="left")
+        ttk.Combobox(backend_row, textvariable=self.var_backend, values=[AUTO_BACKEND_LABEL] + available_pdf_backends(),
+                     state="readonly", width=28).pack(side="left", padx=6)
+
+        # Progreso
+        prog = ttk.LabelFrame(frame, text="Progreso")
+        prog.grid(row=7, column=0, columnspan=3, sticky="we", **pad)
+        self.progress = ttk.Progressbar(prog, orient="horizontal", mode="determinate",
+                                        maximum=self.progress_max, variable=self.progress_value)
+        self.progress.grid(row=0, column=0, columnspan=3, sticky="we", padx=10, pady=6)
+        ttk.Label(prog, textvariable=self.var_progress_text).grid(row=1, column=0, sticky="w", padx=10)
+        ttk.Label(prog, textvariable=self.var_progress_count).grid(row=1, column=2, sticky="e", padx=10)
+
+        # Botones
+        self.btn_start = ttk.Button(frame, text="START", command=self.on_run)
+        self.btn_start.grid(row=8, column=0, sticky="we", **pad)
+        self.btn_cancel = ttk.Button(frame, text="CANCELAR", command=self.on_cancel, state="disabled")
+        self.btn_cancel.grid(row=8, column=1, sticky="we", **pad)
+        ttk.Button(frame, text="EXIT", command=self.on_exit).grid(row=8, column=2, sticky="we", **pad)
+
+        frame.columnconfigure(0, weight=1)
+        prog.columnconfigure(0, weight=1)
+
+
+## Código de los botones en GUI para selección de archivo/directorio
+
+    def select_words_file(self):
+        path = filedialog.askopenfilename(title="Selecciona Excel o CSV con palabras",
+                                          filetypes=[("Excel", "*.xlsx *.xls"), ("CSV/TXT", "*.csv *.txt"), ("Todos", "*.*")])
+        if path: self.var_words.set(path)
+
+    def select_pdf_dir(self):
+        path = filedialog.askdirectory(title="Selecciona carpeta con PDFs")
+        if path: self.var_pdfdir.set(path)
+
+    def select_output_file(self):
+        initial = self.var_output.get() or str(Path.cwd() / "resultado_conteos.csv")
+        path = filedialog.asksaveasfilename(title="Guardar CSV de salida",
+                                            defaultextension=".csv",
+                                            initialfile=Path(initial).name,
+                                            initialdir=str(Path(initial).parent),
+                                            filetypes=[("CSV", "*.csv")])
+        if path:
+            if not str(path).lower().endswith(".csv"):
+                path = f"{path}.csv"
+            self.var_output.set(path)
+
+    # Progreso de la barra (añado tb el nombre del archivo que está comprobando, PDFs/s y tiempo restante)
+    def update_progress(self, current: int, total: int, filename: str):
+        if total <= 0:
+            self.progress_value.set(0)
+            self.var_progress_text.set("Sin PDFs.")
+            self.var_progress_count.set("")
+            return
+        val = int(current * self.progress_max / total)
+        self.progress_value.set(val)
+        if not self._cancel.is_set():
+            self.var_progress_text.set(f"Procesando: {filename}" if filename else "Procesando...")
+        elapsed = time.monotonic() - self._started
+        rate = current / elapsed if current and elapsed > 0 else 0.0
+        count = f"{current} / {total} PDFs"
+        if rate:
+            eta = int((total - current) / rate)
+            count += f"  ·  {rate:.1f} PDFs/s  ·  quedan {eta // 3600}:{eta % 3600 // 60:02d}:{eta % 60:02d}"
+        self.var_progress_count.set(count)
+
+# ------------------------ FUNCION PRINCIPAL (la que lanza el botón de START-----------------------------------
+    def on_run(self):
+        words = self.var_words.get().strip()
+        pdfdir = self.var_pdfdir.get().strip()
+        outcsv = self.var_output.get().strip() or str(Path.cwd() / "resultado_conteos.csv")
+
+    #Gestión de errores al darle a RUN (si nos flata algún dato)
+    #       (Faltan cosas por introducir)
+        if not words:
+            messagebox.showwarning("Falta listado de palabras", "Selecciona el archivo (Excel/CSV).")
+            return
+        if not pdfdir:
+            messagebox.showwarning("Falta carpeta de PDFs", "Selecciona la carpeta con los PDFs.")
+            return
+    #       (No hay instaladas librerías...)
+        streaming = self.var_streaming.get()
+        # Orden de preferencia: el backend elegido en el desplegable y después el resto, según
+        # CC_PDF_BACKENDS o la calibración de esa carpeta (python cc_backends.py calibrate ...).
+        # Elige backend por documento (si uno da texto vacío/ilegible, prueba con el siguiente)
+        backend_fn = make_extractor(Path(pdfdir), self.var_backend.get(), streaming)
+        if backend_fn is None:
+            messagebox.showerror(
+                "No se han detectado librerías para lectura PDF",
+                "Necesitas instalar al menos una usando:\n  pip install pdfminer.six\n  o\n  pip install pypdf"
+            )
+            return
+        backend_name = backend_fn.name
+        try:
+            workers = max(1, int(self.var_workers.get()))
+        except (tk.TclError, ValueError):
+            workers = 1
+        try:
+            timeout = max(1.0, float(self.var_timeout.get()))
+        except (tk.TclError, ValueError):
+            timeout = DEFAULT_TIMEOUT
+        try:
+            max_memory_mb = max(0, int(self.var_max_memory.get()))
+        except (tk.TclError, ValueError):
+            max_memory_mb = DEFAULT_MAX_MEMORY_MB
+    # LANZO EL CONTEO DE PALABRAS (en un hilo aparte)
+        if self._job is not None:
+            return
+        try:
+            self.run_count(words_path=Path(words),
+                           pdf_dir=Path(pdfdir),
+                           out_csv=Path(outcsv),
+                           backend_name=backend_name,
+                           pdf_text_fn=backend_fn,
+                           substrings=self.var_substrings.get(),
+                           keep_accents=self.var_keep_accents.get(),
+                           recursive=self.var_recursive.get(),
+                           workers=workers,
+                           use_cache=self.var_use_cache.get(),
+                           incremental=self.var_incremental.get(),
+                           streaming=streaming,
+                           output_format=OUTPUT_FORMAT_LABELS.get(self.var_format.get(), "wide"),
+                           profile_report=self.var_profile.get(),
+                           cprofile=cprofile_requested(),
+                           isolate=self.var_isolate.get(),
+                           timeout=timeout,
+                           max_memory_mb=max_memory_mb)
+        except Exception as e:
+            # Además del messagebox, imprime el error si abriste desde terminal
+            print("ERROR:", e, file=sys.stderr)
+            messagebox.showerror("Error detectado", str(e))
+
+
+
+# ------------------------ LOGICA PRINCIPAL DE CONTEO-----------------------------------
+# El conteo (count_batch) va en un hilo aparte para que la ventana no se congele. El hilo deja el
+# progreso en una cola y la ventana la lee cada PROGRESS_POLL_MS con after(): así se redibuja a ritmo
+# fijo y no una vez por PDF.
+    def run_count(self, words_path: Path, pdf_dir: Path, out_csv: Path,
+                  backend_name: str, pdf_text_fn,
+                  substrings: bool, keep_accents: bool, recursive: bool,
+                  workers: int = 1, use_cache: bool = False, incremental: bool = False,
+                  streaming: bool = False, output_format: str = "wide",
+                  profile_report: bool = False, cprofile: bool = False,
+                  isolate: bool = False, timeout: float = DEFAULT_TIMEOUT,
+                  max_memory_mb: int = DEFAULT_MAX_MEMORY_MB) -> None:
+
+    #       (No existe el archivo con la lista / carpeta de PDFs): se avisa antes de lanzar el hilo
+        if not words_path.exists():
+            messagebox.showerror("Error", f"No existe el archivo de palabras:\n{words_path}")
+            return
+        if not pdf_dir.exists() or not pdf_dir.is_dir():
+            messagebox.showerror("Error", f"No existe la carpeta de PDFs o no es carpeta:\n{pdf_dir}")
+            return
+
+        pdf_paths = find_pdfs(pdf_dir, recursive)
+        if not pdf_paths:
+            if not messagebox.askyesno("Aviso",
+                "No se encontraron PDFs en la carpeta indicada.\n"
+                "¿Quieres generar el CSV igualmente sólo con la columna 'palabra'?"):
+                return
+
+        kwargs = dict(words_path=words_path, pdf_dir=pdf_dir, out_csv=out_csv, backend_name=backend_name,
+                      pdf_text_fn=pdf_text_fn, substrings=substrings, keep_accents=keep_accents,
+                      recursive=recursive, workers=workers, use_cache=use_cache, incremental=incremental,
+                      streaming=streaming, output_format=output_format, profile_report=profile_report,
+                      cprofile=cprofile, isolate=isolate, timeout=timeout, max_memory_mb=max_memory_mb,
+                      pdf_paths=pdf_paths)
+
+        self._cancel.clear()
+        self._progress = (0, len(pdf_paths), "")
+        self._started = time.monotonic()
+        self._set_running(True)
+        self._job = threading.Thread(target=self._job_main, args=(kwargs,), daemon=True)
+        self._job.start()
+        self.after(PROGRESS_POLL_MS, self._poll_job)
+
+    def _job_main(self, kwargs: dict) -> None:
+        """Hilo de trabajo: no toca la ventana, sólo deja mensajes en la cola."""
+
+        def progress(done: int, total: int, name: str) -> None:
+            self._queue.put(("progress", (done, total, name)))
+
+        try:
+            summary = count_batch(progress=progress, cancel=self._cancel, **kwargs)
+            self._queue.put(("done", summary))
+        except CountError as e:
+            self._queue.put(("error", (e.title, str(e))))
+        except Exception as e:
+            # Además del messagebox, imprime el error si abriste desde terminal
+            print("ERROR:", e, file=sys.stderr)
+            self._queue.put(("error", ("Error detectado", str(e))))
+
+    def _poll_job(self) -> None:
+        result = None
+        while True:
+            try:
+                kind, data = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self._progress = data  # sólo interesa el último
+            else:
+                result = (kind, data)
+        self.update_progress(*self._progress)
+
+        if result is None:
+            self.after(PROGRESS_POLL_MS, self._poll_job)
+            return
+
+        self._job = None
+        self._set_running(False)
+        kind, data = result
+        if kind == "error":
+            messagebox.showerror(*data)
+        else:
+            self._show_summary(data)
+        if self._exit_requested:
+            self.destroy()
+
+    def _set_running(self, running: bool) -> None:
+        self.btn_start.config(state="disabled" if running else "normal")
+        self.btn_cancel.config(state="normal" if running else "disabled")
+        self.config(cursor="watch" if running else "")
+        if not running:
+            done, total, _ = self._progress
+            self.var_progress_text.set("Listo.")
+            self.var_progress_count.set(f"{done} / {total} PDFs" if total else "")
+
+    def on_cancel(self) -> None:
+        if self._job is not None:
+            self._cancel.set()
+            self.var_progress_text.set("Cancelando... (se guardan los resultados parciales)")
+
+    def on_exit(self) -> None:
+        if self._job is None:
+            self.destroy()
+            return
+        # Hay un conteo en marcha: se cancela y la ventana se cierra cuando se haya escrito lo parcial
+        self._exit_requested = True
+        self.on_cancel()
+
+    def _show_summary(self, summary: dict) -> None:
+        out_path = summary["out_path"]
+        cache_info = ""
+        if summary["cache"] is not None:
+            cache_info = f"\nCaché de texto: {summary['cache']['hits']} aciertos / {summary['cache']['misses']} fallos"
+        incidents_info = ""
+        incidents = summary["incidents"]
+        if incidents is not None:
+            incidents_info = (f"\nPDFs con incidencias: {incidents['fallback']} con otro backend, "
+                              f"{incidents['truncated']} cortados, {incidents['skipped']} omitidos, "
+                              f"{incidents['stale']} sin actualizar"
+                              f"\n  -> {incidents['path'].name}")
+        profile_info = ""
+        if summary["profile"] is not None:
+            slowest = summary["profile"]["slowest"][:3]
+            profile_info = f"\nInforme de tiempos: {summary['profile']['paths']['json'].name}"
+            if slowest:
+                profile_info += "\nMás lentos: " + ", ".join(f"{d['documento']} ({d['wall_s']:.1f}s)" for d in slowest)
+        dup_info = ""
+        if summary["duplicates"]:
+            dup_info = f"\nCopias idénticas (contadas una vez): {summary['duplicates']}"
+        details = (f"\n{out_path}\n\nBackend usado PDF: {summary['backend']}"
+                   f"{dup_info}{cache_info}{incidents_info}{profile_info}")
+        if summary["cancelled"]:
+            messagebox.showinfo("Cancelado", f"Resultados parciales ({summary['documents']} de {summary['total']} PDFs):{details}")
+        else:
+            messagebox.showinfo("Listo", f"Resultado generado:{details}")
+
+
+def main() -> None:
+    # El listado se lee sin pandas (ver read_words): no hace falta comprobar dependencias al arrancar
+    app = App()
+    app.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# --- Índice invertido posicional del corpus (para cc_pdf.py) ---
+# Para iterar sobre listados de palabras sin volver a leer los PDFs: se recorre el corpus UNA vez y se
+# guarda, por documento, palabra -> posiciones (en el texto ya normalizado) y el separador que va antes
+# de cada palabra. Con eso se calculan, sin tocar los PDFs, los mismos conteos que el modo
+# palabra/frase completa de cc_pdf: flexiones (s/es/ed/ing/er/ers, y -> ies), frases con sus
+# separadores exactos, grupos por raíz (stemming) y el total de palabras.
+# Las raíces de cada palabra del vocabulario también se guardan (por idioma) la primera vez que se piden.
+# Las posiciones se guardan como enteros sin signo (array('I'), little-endian) en una fila por
+# (palabra, documento): una consulta sólo lee las filas de las palabras que necesita y el índice no
+# contiene nada ejecutable (se puede compartir sin riesgo).
+#
+# Uso:
+#   python cc_index.py build -d carpeta_pdfs -i corpus.idx [--recursive] [--keep-accents]
+#   python cc_index.py query -i corpus.idx -w listado.xlsx -o salida.csv
+#
+# El modo subcadenas (--substrings) no se puede resolver desde el índice (las subcadenas cruzan palabras).
+
+import argparse
+import array
+import json
+import sqlite3
+import sys
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cc_cache import TextCache, file_fingerprint
+from cc_isolate import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT, ExtractionFailed, IsolatedExtractor
+from cc_pdf import (TOTAL_KEY, WORD_SPLIT_RE, CountingEngine, WholeWordMatcher, _token_prefix,
+                    load_normalized_text, make_extractor, read_words, write_counts_csv)
+
+INDEX_VERSION = "2"
+
+
+def _pack(values: array.array) -> bytes:
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return zlib.compress(values.tobytes())
+
+
+def _unpack(blob: bytes) -> array.array:
+    values = array.array("I")
+    values.frombytes(zlib.decompress(blob))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def build_segment(norm_text: str) -> dict:
+    """Índice de un documento: posiciones por palabra e id del separador previo a cada palabra."""
+
+    parts = WORD_SPLIT_RE.split(norm_text)  # [sep, palabra, sep, palabra, ..., sep]
+    postings: Dict[str, array.array] = {}
+    sep_index: Dict[str, int] = {}
+    sep_ids = array.array("I")
+    for pos, i in enumerate(range(1, len(parts), 2)):
+        sep_ids.append(sep_index.setdefault(parts[i - 1], len(sep_index)))
+        run = parts[i]
+        positions = postings.get(run)
+        if positions is None:
+            positions = postings[run] = array.array("I")
+        positions.append(pos)
+    return {"postings": postings, "seps": list(sep_index), "sep_ids": sep_ids}
+
+
+class CorpusIndex:
+    """Índice posicional guardado en un SQLite (posiciones por palabra y documento, y separadores por documento)."""
+
+    def __init__(self, path: Path, remove_accents: Optional[bool] = None, backend_name: Optional[str] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "  id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, fingerprint TEXT NOT NULL,"
+            "  total INTEGER NOT NULL, seps TEXT NOT NULL, sep_ids BLOB NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "  token TEXT NOT NULL, doc_id INTEGER NOT NULL, n INTEGER NOT NULL, positions BLOB NOT NULL,"
+            "  PRIMARY KEY (token, doc_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);"
+            "CREATE TABLE IF NOT EXISTS stems ("
+            "  lang TEXT NOT NULL, token TEXT NOT NULL, stem TEXT NOT NULL, PRIMARY KEY (lang, token));"
+        )
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if not meta:
+            if remove_accents is None:
+                raise ValueError(f"El índice no existe o está vacío: {self.path}")
+            meta = {"version": INDEX_VERSION, "remove_accents": str(int(remove_accents)),
+                    "backend": backend_name or ""}
+            self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", list(meta.items()))
+            self._conn.commit()
+        elif meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Versión de índice no soportada: {meta.get('version')}; "
+                             f"bórralo y constrúyelo de nuevo ({self.path})")
+        elif remove_accents is not None and meta["remove_accents"] != str(int(remove_accents)):
+            raise ValueError("El índice se construyó con otra opción de acentos; constrúyelo de nuevo.")
+        self.remove_accents = meta["remove_accents"] == "1"
+        self.backend_name = meta["backend"]
+
+    # ---- construcción ----
+
+    def names(self) -> List[str]:
+        return [name for (name,) in self._conn.execute("SELECT name FROM docs ORDER BY name")]
+
+    def is_current(self, name: str, fingerprint: str) -> bool:
+        row = self._conn.execute("SELECT fingerprint FROM docs WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == fingerprint
+
+    def _delete(self, name: str) -> None:
+        row = self._conn.execute("SELECT id FROM docs WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", row)
+            self._conn.execute("DELETE FROM docs WHERE id = ?", row)
+
+    def add(self, name: str, fingerprint: str, norm_text: str) -> None:
+        total = WholeWordMatcher([]).count(norm_text)[TOTAL_KEY]
+        seg = build_segment(norm_text)
+        self._delete(name)
+        cur = self._conn.execute("INSERT INTO docs (name, fingerprint, total, seps, sep_ids) VALUES (?, ?, ?, ?, ?)",
+                                 (name, fingerprint, total, json.dumps(seg["seps"], ensure_ascii=False),
+                                  _pack(seg["sep_ids"])))
+        doc_id = cur.lastrowid
+        self._conn.executemany("INSERT INTO postings (token, doc_id, n, positions) VALUES (?, ?, ?, ?)",
+                               ((token, doc_id, len(positions), _pack(positions))
+                                for token, positions in seg["postings"].items()))
+        self._conn.commit()
+
+    def prune(self, keep: List[str]) -> int:
+        keep_set = set(keep)
+        gone = [name for name in self.names() if name not in keep_set]
+        for name in gone:
+            self._delete(name)
+        self._conn.commit()
+        return len(gone)
+
+    # ---- consultas ----
+
+    def _stems(self, stemmer, lang: str, tokens: List[str]) -> Dict[str, str]:
+        """Raíz de cada palabra del vocabulario (guardadas en el índice para la siguiente consulta)."""
+
+        known = dict(self._conn.execute("SELECT token, stem FROM stems WHERE lang = ?", (lang,)))
+        new = {t: stemmer.stem(t) for t in tokens if t not in known}
+        if new:
+            self._conn.executemany("INSERT OR REPLACE INTO stems (lang, token, stem) VALUES (?, ?, ?)",
+                                   [(lang, t, st) for t, st in new.items()])
+            self._conn.commit()
+            known.update(new)
+        return known
+
+    def _doc_counts(self, token: str):
+        """(id de documento, ocurrencias) de una palabra en todos los documentos."""
+
+        return self._conn.execute("SELECT doc_id, n FROM postings WHERE token = ?", (token,))
+
+    def count_words(self, original_words: List[str]):
+        """Conteos palabra/frase completa (con stemming) de un listado en todos los documentos.
+
+        Devuelve (motor, conteos por documento, nombres de documento, términos no resolubles desde el índice).
+        Sólo se leen las filas de las palabras del listado (y, con stemming, las de su misma raíz).
+        """
+
+        engine = CountingEngine(original_words, self.remove_accents, whole_word=True)
+        matcher = engine.matcher
+        # Términos que en cc_pdf necesitan regex (no empiezan/terminan en letra o número)
+        unsupported = list(engine.patterns)
+
+        docs = self._conn.execute("SELECT id, name, total FROM docs ORDER BY name").fetchall()
+        counts = {doc_id: [0] * len(matcher.words) for doc_id, _, _ in docs}
+
+        # Palabras sueltas (y sus flexiones): suma de ocurrencias de cada forma
+        for form, idxs in matcher.single_forms.items():
+            for doc_id, n in self._doc_counts(form):
+                for idx in idxs:
+                    counts[doc_id][idx] += n
+
+        # Frases: palabra a palabra por posiciones, con separadores exactos y sin solapes
+        doc_seps: Dict[int, tuple] = {}
+        position_sets: Dict[tuple, set] = {}
+
+        def seps_of(doc_id: int) -> tuple:
+            found = doc_seps.get(doc_id)
+            if found is None:
+                seps, sep_ids = self._conn.execute("SELECT seps, sep_ids FROM docs WHERE id = ?",
+                                                   (doc_id,)).fetchone()
+                found = doc_seps[doc_id] = ({sep: i for i, sep in enumerate(json.loads(seps))}, _unpack(sep_ids))
+            return found
+
+        def positions_of(word: str, doc_id: int) -> set:
+            found = position_sets.get((word, doc_id))
+            if found is None:
+                row = self._conn.execute("SELECT positions FROM postings WHERE token = ? AND doc_id = ?",
+                                         (word, doc_id)).fetchone()
+                found = position_sets[(word, doc_id)] = set(_unpack(row[0])) if row else set()
+            return found
+
+        for idx, first, seps, middle, last_forms in matcher.phrases:
+            for doc_id, blob in self._conn.execute("SELECT doc_id, positions FROM postings WHERE token = ?",
+                                                   (first,)).fetchall():
+                sep_id, sep_ids = seps_of(doc_id)
+                wanted_seps = [sep_id.get(sep) for sep in seps]
+                if None in wanted_seps:
+                    continue
+                last_end = -1
+                k = len(seps)
+                for p in _unpack(blob):
+                    if p <= last_end or p + k >= len(sep_ids):
+                        continue
+                    if any(sep_ids[p + 1 + j] != sid for j, sid in enumerate(wanted_seps)):
+                        continue
+                    if any(p + 1 + j not in positions_of(w, doc_id) for j, w in enumerate(middle)):
+                        continue
+                    if any(p + k in positions_of(form, doc_id) for form in last_forms):
+                        counts[doc_id][idx] += 1
+                        last_end = p + k
+        doc_seps.clear()
+        position_sets.clear()
+
+        # Stemming: misma regla que count_occurrences_with_stemming, pero por tipos de palabra
+        stem_counts: Dict[int, Dict[str, int]] = {}
+        stem_tokens = engine.tokens_with_stem if engine.stemmer is not None else []
+        if stem_tokens:
+            lang = getattr(engine.stemmer, "language", "custom")
+            vocab = [token for (token,) in self._conn.execute("SELECT DISTINCT token FROM postings")]
+            stem_of = self._stems(engine.stemmer, lang, vocab)
+            stem_to_tokens: Dict[str, List[str]] = {}
+            prefixes: Dict[str, str] = {}
+            for token in stem_tokens:
+                stem_to_tokens.setdefault(engine.stemmer.stem(token), []).append(token)
+                prefixes[token] = _token_prefix(token)
+            for run in vocab:
+                tokens = [t for t in stem_to_tokens.get(stem_of.get(run, ""), ())
+                          if not prefixes[t] or run.startswith(prefixes[t])]
+                if not tokens:
+                    continue
+                for doc_id, n in self._doc_counts(run):
+                    per_doc = stem_counts.setdefault(doc_id, {})
+                    for token in tokens:
+                        per_doc[token] = per_doc.get(token, 0) + n
+
+        counts_per_pdf: Dict[str, Dict[str, int]] = {}
+        for doc_id, name, total in docs:
+            results = dict(zip(matcher.words, counts.pop(doc_id)))
+            doc_stems = stem_counts.get(doc_id, {})
+            for token in stem_tokens:
+                results[token] = max(results.get(token, 0), doc_stems.get(token, 0))
+            results[TOTAL_KEY] = total
+            counts_per_pdf[name] = results
+
+        return engine, counts_per_pdf, [name for _, name, _ in docs], unsupported
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def build_index(index_path: Path, pdf_dir: Path, recursive: bool, remove_accents: bool,
+                cache: Optional[TextCache] = None, log=print, preferred: Optional[str] = None,
+                isolate: bool = True, timeout: float = DEFAULT_TIMEOUT,
+                max_memory_mb: int = DEFAULT_MAX_MEMORY_MB) -> CorpusIndex:
+    """Crea o actualiza el índice: sólo se (re)indexan los PDFs nuevos o modificados.
+
+    Se extrae igual que en cc_pdf (make_extractor: mismo orden de backends con plan B, extracción aislada
+    y las mismas entradas de la caché de texto).
+    """
+
+    extractor = make_extractor(pdf_dir, preferred)
+    if extractor is None:
+        raise RuntimeError("No hay librerías para leer PDF (pip install pdfminer.six o pypdf)")
+    backend_name = extractor.name
+    pdf_text_fn = IsolatedExtractor(extractor.backends, timeout, max_memory_mb) if isolate else extractor
+    index = CorpusIndex(index_path, remove_accents, backend_name)
+
+    pdf_paths = sorted(pdf_dir.rglob("*.pdf") if recursive else pdf_dir.glob("*.pdf"))
+    names = []
+    try:
+        for pdf_path in pdf_paths:
+            name = pdf_path.relative_to(pdf_dir).as_posix()
+            fingerprint = file_fingerprint(pdf_path)
+            if index.is_current(name, fingerprint):
+                names.append(name)
+                continue
+            try:
+                norm_text = load_normalized_text(pdf_path, pdf_text_fn, remove_accents, cache, backend_name)
+            except ExtractionFailed as e:
+                # Ni se indexa vacío ni se deja la versión anterior (prune la quita): se reintenta en el siguiente build
+                log(f"omitido (no se pudo extraer el texto): {name}: {e}")
+                continue
+            index.add(name, fingerprint, norm_text)
+            names.append(name)
+            log(f"indexado: {name}")
+    finally:
+        if isinstance(pdf_text_fn, IsolatedExtractor):
+            pdf_text_fn.close()
+    pruned = index.prune(names)
+    if pruned:
+        log(f"eliminados del índice: {pruned}")
+    return index
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Índice invertido de un corpus de PDFs para contar palabras al instante.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Construye/actualiza el índice de una carpeta de PDFs")
+    p_build.add_argument("-d", "--pdf_dir", required=True, type=Path)
+    p_build.add_argument("-i", "--index", required=True, type=Path)
+    p_build.add_argument("--recursive", action="store_true")
+    p_build.add_argument("--keep-accents", action="store_true")
+    p_build.add_argument("--no-cache", action="store_true", help="No usar la caché de texto extraído")
+    p_build.add_argument("--backend", default=None, help="Backend de extracción preferido (pdfminer, pypdf...)")
+    p_build.add_argument("--no-isolate", action="store_true", help="Extrae en el mismo proceso (sin tiempo máximo)")
+    p_build.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Segundos máximos por PDF")
+    p_build.add_argument("--max-memory", type=int, default=DEFAULT_MAX_MEMORY_MB, help="MB máximos al extraer")
+
+    p_query = sub.add_parser("query", help="Cuenta un listado de palabras usando el índice")
+    p_query.add_argument("-i", "--index", required=True, type=Path)
+    p_query.add_argument("-w", "--words", required=True, type=Path)
+    p_query.add_argument("-o", "--output", required=True, type=Path)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        cache = None if args.no_cache else TextCache()
+        index = build_index(args.index, args.pdf_dir, args.recursive, not args.keep_accents, cache,
+                            preferred=args.backend, isolate=not args.no_isolate, timeout=args.timeout,
+                            max_memory_mb=args.max_memory)
+        print(f"Índice listo: {args.index} ({len(index.names())} documentos)")
+        index.close()
+        return 0
+
+    index = CorpusIndex(args.index)
+    original_words = read_words(args.words)
+    engine, counts_per_pdf, names, unsupported = index.count_words(original_words)
+    write_counts_csv(args.output, original_words, engine.original_to_norm, counts_per_pdf, names)
+    index.close()
+    if unsupported:
+        print("AVISO: estos términos sólo se cuentan por raíz desde el índice (usa cc_pdf para el conteo exacto): "
+              + ", ".join(unsupported), file=sys.stderr)
+    print(f"CSV generado: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+# --- Extracción aislada de PDFs (para cc_pdf.py) ---
+# Algunos PDFs mal formados dejan a pdfminer dando vueltas 20 minutos o se comen toda la memoria, y como
+# la extracción se hacía en el mismo proceso, un único archivo bloqueaba todo el lote.
+# Aquí cada extracción se hace en un proceso hijo aparte:
+#   - con un tiempo máximo por archivo (si se pasa, se mata el hijo y se arranca otro),
+#   - con un techo de memoria (RLIMIT_AS en Linux/macOS; en Windows no hay límite),
+#   - que se recicla cada cierto número de documentos (la memoria que pierda pdfminer no se acumula).
+# Si un backend se pasa de tiempo, falla, revienta o da un texto vacío/ilegible, se prueba con el siguiente
+# (en el orden de preferencia de cc_backends).
+# Los archivos que acabaron en otro backend o que no se pudieron leer quedan apuntados en "incidents".
+
+import csv
+import multiprocessing
+import signal
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cc_backends import text_quality, text_score
+
+DEFAULT_TIMEOUT = 120.0        # segundos por archivo y backend
+DEFAULT_MAX_MEMORY_MB = 2048   # techo de memoria del proceso de extracción
+DEFAULT_MAX_TASKS = 50         # documentos antes de reciclar el proceso
+
+
+class ExtractionFailed(Exception):
+    """Ningún backend pudo extraer el texto del archivo (se omite)."""
+
+
+def _limit_memory(max_memory_mb: int) -> None:
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+        limit = int(max_memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception:
+        pass  # plataforma sin resource/RLIMIT_AS: sólo queda el tiempo máximo
+
+
+def _extraction_child(conn, max_memory_mb: int) -> None:
+    """Bucle del proceso hijo: recibe (tipo, backend, ruta) y devuelve el texto o las páginas."""
+
+    from cc_backends import load_pdf_backend  # aquí, para que el límite de memoria no cuente las importaciones
+
+    # Ctrl+C en la terminal llega a todo el grupo de procesos: la cancelación la lleva sólo el padre
+    # (si no, el hijo moriría a mitad de un PDF y ese documento quedaría como omitido)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _limit_memory(max_memory_mb)
+    extractors: Dict[tuple, object] = {}
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        kind, backend, path_str = msg
+        key = (backend, kind == "pages")
+        if key not in extractors:
+            extractors[key] = load_pdf_backend(backend, pages=kind == "pages")
+        fn = extractors[key]
+        try:
+            if fn is None:
+                conn.send(("error", f"backend '{backend}' no instalado"))
+            elif kind == "pages":
+                for page in fn(path_str):
+                    conn.send(("page", page))
+                conn.send(("ok", None))
+            else:
+                conn.send(("ok", fn(path_str) or ""))
+        except MemoryError:
+            conn.send(("memory", f"superó el límite de {max_memory_mb} MB"))
+            return  # el proceso queda tocado: que lo reemplacen
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class IsolatedExtractor:
+    """Extractor (pdf_text_fn) que lee cada PDF en un proceso aparte, con tiempo máximo y techo de memoria.
+
+    backends: nombres en orden de preferencia (el primero es el normal, el resto son el plan B).
+    Con pages=True devuelve un generador de páginas como los de pick_pdf_page_backend.
+    Se puede enviar a otros procesos (sólo viaja la configuración; cada uno arranca su propio hijo).
+    """
+
+    def __init__(self, backends: List[str], timeout: float = DEFAULT_TIMEOUT,
+                 max_memory_mb: int = DEFAULT_MAX_MEMORY_MB, max_tasks: int = DEFAULT_MAX_TASKS,
+                 pages: bool = False, check_quality: bool = True):
+        if not backends:
+            raise ValueError("Hace falta al menos un backend de extracción")
+        self.backends = list(backends)
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_tasks = max_tasks
+        self.pages = pages
+        self.check_quality = check_quality
+        self.last_backend = ""
+        self.incidents: List[Dict[str, str]] = []
+        self._proc = None
+        self._conn = None
+        self._tasks = 0
+
+    def config(self) -> tuple:
+        return (self.backends, self.timeout, self.max_memory_mb, self.max_tasks, self.pages, self.check_quality)
+
+    def __reduce__(self):
+        return (IsolatedExtractor, self.config())
+
+    # ---- proceso hijo ----
+
+    def _start(self) -> None:
+        # spawn: no hereda hilos ni la ventana Tk del proceso principal
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        self._proc = ctx.Process(target=_extraction_child, args=(child_conn, self.max_memory_mb), daemon=True)
+        self._proc.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._tasks = 0
+
+    def _stop(self, kill: bool = False) -> None:
+        if self._proc is None:
+            return
+        try:
+            if kill:
+                self._proc.kill()
+            else:
+                self._conn.send(None)
+            self._proc.join(5)
+            if self._proc.is_alive():
+                self._proc.kill()
+                self._proc.join()
+        except Exception:
+            pass
+        finally:
+            self._conn.close()
+            self._proc = self._conn = None
+
+    def _send(self, msg: tuple) -> None:
+        if self._proc is None or not self._proc.is_alive():
+            self._stop(kill=True)
+            self._start()
+        self._conn.send(msg)
+
+    def _receive(self, budget: List[float]) -> tuple:
+        """Siguiente mensaje del hijo; budget[0] es el tiempo que le queda al archivo (se va descontando)."""
+
+        t0 = time.monotonic()
+        ready = budget[0] > 0 and self._conn.poll(budget[0])
+        budget[0] -= time.monotonic() - t0
+        if not ready:
+            self._stop(kill=True)
+            return "timeout", f"más de {self.timeout:g}s"
+        try:
+            msg = self._conn.recv()
+        except (EOFError, OSError):
+            self._proc.join(1)
+            code = self._proc.exitcode
+            self._stop(kill=True)
+            return "crash", f"el proceso de extracción terminó (código {code}; ¿memoria?)"
+        if msg[0] == "memory":
+            self._stop(kill=True)
+        return msg
+
+    def _task_done(self) -> None:
+        self._tasks += 1
+        if self._tasks >= self.max_tasks:
+            self._stop()  # reciclado: el siguiente documento arranca un hijo limpio
+
+    def _incident(self, path_str: str, status: str, backend: str, errors: List[str]) -> None:
+        self.incidents.append({"documento": path_str, "estado": status, "backend": backend,
+                               "motivo": " | ".join(errors)})
+
+    # ---- extracción ----
+
+    def __call__(self, path_str: str):
+        if self.pages:
+            return self._iter_pages(path_str)
+        errors: List[str] = []
+        best = None  # (puntuación, backend, texto) si ningún backend da un texto aceptable
+        for i, backend in enumerate(self.backends):
+            self._send(("text", backend, path_str))
+            status, payload = self._receive([self.timeout])
+            if status == "ok":
+                self._task_done()
+                problem = text_quality(payload) if self.check_quality else None
+                if problem is None:
+                    if i:
+                        self._incident(path_str, "fallback", backend, errors)
+                    self.last_backend = backend
+                    return payload
+                score = text_score(payload)
+                if best is None or score > best[0]:
+                    best = (score, backend, payload)
+                errors.append(f"{backend}: {problem}")
+                continue
+            if status == "error":
+                self._task_done()
+            errors.append(f"{backend}: {status} ({payload})")
+        if best is not None:
+            self._incident(path_str, "low_quality", best[1], errors)
+            self.last_backend = best[1]
+            return best[2]
+        self._incident(path_str, "skipped", "", errors)
+        raise ExtractionFailed("; ".join(errors))
+
+    def _iter_pages(self, path_str: str):
+        errors: List[str] = []
+        for i, backend in enumerate(self.backends):
+            self._send(("pages", backend, path_str))
+            budget = [self.timeout]
+            emitted = 0
+            finished = False
+            try:
+                while True:
+                    status, payload = self._receive(budget)
+                    if status != "page":
+                        break
+                    if not emitted:
+                        self.last_backend = backend
+                    emitted += 1
+                    yield payload
+                finished = True
+            finally:
+                if not finished:
+                    self._stop(kill=True)  # el consumidor dejó de leer a mitad: el hijo sigue enviando
+            if status == "ok":
+                self._task_done()
+                if i:
+                    self._incident(path_str, "fallback", backend, errors)
+                return
+            if status == "error":
+                self._task_done()
+            errors.append(f"{backend}: {status} ({payload})")
+            if emitted:
+                # Ya se contaron páginas de este backend: no se puede repetir con otro sin contar doble
+                self._incident(path_str, "truncated", backend, errors)
+                return
+        self._incident(path_str, "skipped", "", errors)
+        raise ExtractionFailed("; ".join(errors))
+
+    def take_incidents(self) -> List[Dict[str, str]]:
+        incidents, self.incidents = self.incidents, []
+        return incidents
+
+    def close(self) -> None:
+        self._stop()
+
+
+def incidents_path(out_path: Path) -> Path:
+    """resultado.csv -> resultado_incidencias.csv"""
+
+    return out_path.with_name(out_path.stem + "_incidencias.csv")
+
+
+def write_incidents(out_path: Path, incidents: List[Dict[str, str]]) -> Optional[Path]:
+    """CSV con los archivos que usaron otro backend, se cortaron o se omitieron (None si no hubo ninguno)."""
+
+    if not incidents:
+        return None
+    path = incidents_path(out_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["documento", "estado", "backend", "motivo"])
+        writer.writeheader()
+        writer.writerows(incidents)
+    return path
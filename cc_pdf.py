@@ -1,15 +1,27 @@
 # --- Librerías para Funcionalidades necesarias (lectura de csv, regular expresions, lectura directorios, manejo de tablas,...etc) ---
+import argparse
 import csv
+import json
 import re
+import signal
 import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import unicodedata
-import pandas as pd
 
-# --- Librerías para GUI (Graphic User Interface) ---
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+# La interfaz gráfica (tkinter) está en cc_gui.py: este módulo se puede usar sin pantalla (ver main)
+from cc_backends import PDF_BACKENDS, AutoExtractor, available_pdf_backends, load_pdf_backend
+from cc_cache import TextCache, file_fingerprint, group_identical
+from cc_extract import make_extractor  # noqa: F401 (cc_gui lo importa desde aquí)
+from cc_isolate import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT, ExtractionFailed, IsolatedExtractor, write_incidents
+from cc_profile import DocProfile, RunProfile, WorkerProfiler, add_size, cprofile_requested, stage
+from cc_results import OUTPUT_FORMATS, TOTAL_KEY, CountMatrix, ResultWriter, write_wide_csv
+from cc_store import ResultStore, default_store_path
 
 try:
     from nltk.stem.snowball import SnowballStemmer  # type: ignore
@@ -23,36 +35,117 @@ except Exception:  # pragma: no cover - dependencia opcional
 ## Retorna la forma normalizada form para la cadena Unicode unistr. Los valores válidos para form son “NFC”, “NFKC”, “NFD” y “NFKD”.
 ## Fusilado parte de : https://www.bomberbot.com/python/python-replace-k-with-multiple-values-advanced-techniques-and-best-practices/
 
+#
+## Versión rápida (mismo resultado carácter a carácter que la original):
+##   s = s.casefold()
+##   s = "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+## - Texto ASCII: casefold == lower y NFKD no cambia nada -> sólo lower().
+## - Resto: casefold + NFKD + quitar marcas combinantes se puede hacer carácter a carácter (las únicas
+##   que reordena NFKD son justo las que se quitan), así que se usa str.translate con una tabla
+##   carácter -> resultado que se rellena la primera vez que aparece cada carácter.
+## - Se trabaja por trozos para que los trozos ASCII (la mayoría en un PDF) vayan por la vía rápida.
+
+NORMALIZE_CHUNK = 64 * 1024
+
+
+class _AccentTable(dict):
+    """Tabla para str.translate: código -> carácter en casefold y sin acentos (se rellena al vuelo)."""
+
+    def __missing__(self, code: int) -> str:
+        c = chr(code).casefold()
+        out = "".join(x for x in unicodedata.normalize("NFKD", c) if not unicodedata.combining(x))
+        self[code] = out
+        return out
+
+
+_ACCENT_TABLE = _AccentTable((code, chr(code).lower()) for code in range(128))
+
+
 def normalize_text(s: str, remove_accents: bool = True) -> str:
-    s = s.casefold() # Más robusto que lower (en otros idiomas principalmente...)
-    if remove_accents:
-        s = "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
-    return s
+    if s.isascii():
+        return s.lower() # En ASCII casefold() == lower()
+    if not remove_accents:
+        return s.casefold() # Más robusto que lower (en otros idiomas principalmente...)
+    if len(s) <= NORMALIZE_CHUNK:
+        return s.translate(_ACCENT_TABLE)
+    parts = []
+    for i in range(0, len(s), NORMALIZE_CHUNK):
+        chunk = s[i:i + NORMALIZE_CHUNK]
+        parts.append(chunk.lower() if chunk.isascii() else chunk.translate(_ACCENT_TABLE))
+    return "".join(parts)
+
+# Lectura del listado de palabras (Excel o CSV/TXT): se toma la 1ª columna, sin vacíos ni repetidos.
+# Antes se hacía con pandas (read_csv con sep=None y el motor "python" para adivinar el separador), que
+# tardaba más en importarse que todo lo demás y era lento con listados grandes. Ahora:
+#   - CSV/TXT con el módulo csv, adivinando el separador sólo con las primeras líneas
+#   - .xlsx con openpyxl en modo sólo lectura (fila a fila, sin cargar la hoja entera)
+#   - .xls (formato antiguo) sigue con pandas + xlrd, que sólo se importan en ese caso
+# y los repetidos se quitan según se leen.
+
+WORDS_SNIFF_BYTES = 8 * 1024
+WORDS_DELIMITERS = ",;\t|"
+
+
+def _csv_first_column(word_file: Path) -> Iterator[str]:
+    try:
+        f = word_file.open(newline="", encoding="utf-8-sig")
+        sample = f.read(WORDS_SNIFF_BYTES)
+    except UnicodeDecodeError:
+        f.close()
+        f = word_file.open(newline="", encoding="latin-1")
+        sample = f.read(WORDS_SNIFF_BYTES)
+    with f:
+        f.seek(0)
+        dialect = csv.excel  # una sola columna (o no se pudo adivinar): separador ","
+        if any(d in sample for d in WORDS_DELIMITERS):
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=WORDS_DELIMITERS)
+            except csv.Error:
+                pass
+        for row in csv.reader(f, dialect):
+            if row:
+                yield row[0]
+
+
+def _xlsx_first_column(word_file: Path) -> Iterator[str]:
+    try:
+        from openpyxl import load_workbook
+    except Exception:
+        raise RuntimeError("Para leer .xlsx hace falta 'openpyxl'. Instala con:\n  pip install openpyxl")
+    wb = load_workbook(word_file, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for (value,) in ws.iter_rows(min_col=1, max_col=1, values_only=True):
+            if value is not None:
+                yield str(value)
+    finally:
+        wb.close()
+
+
+def _xls_first_column(word_file: Path) -> Iterator[str]:
+    import pandas as pd  # sólo para el formato antiguo de Excel (con xlrd)
+
+    df = pd.read_excel(word_file, header=None)
+    yield from df.iloc[:, 0].dropna().astype(str)
 
-# Función que lee de un archivo Excel o CSV y usando la librería pandas lo convierte en un dataframe (df). Es un modo usado en muchos aspectos
-# también en métodos de ML para manejo de gran cantidad de datos tabulares.
-# Este método devuelve un listado de palabras (leyendo el input) y confirma que no haya repetidas
 
 def read_words(word_file: Path) -> List[str]:
     ext = word_file.suffix.lower()
-    ## EXCEK O CSV ??
-    if ext in (".xlsx", ".xls"):
-        df = pd.read_excel(word_file, header=None)
-    elif ext == ".csv":
-        try:
-            df = pd.read_csv(word_file, header=None, sep=None, engine="python")
-        except Exception:
-            df = pd.read_csv(word_file, header=None)
+    ## EXCEL O CSV ??
+    if ext == ".xlsx":
+        values = _xlsx_first_column(word_file)
+    elif ext == ".xls":
+        values = _xls_first_column(word_file)
+    elif ext in (".csv", ".txt"):
+        values = _csv_first_column(word_file)
     else:
-        raise ValueError(f"Formato no soportado: {word_file.name} (usa .xlsx, .xls o .csv)")
-    
-    series = df.iloc[:, 0].astype(str).str.strip()
-    words = [w for w in series if w and w.lower() != "nan"] #Palabras en el listado
-    
+        raise ValueError(f"Formato no soportado: {word_file.name} (usa .xlsx, .xls, .csv o .txt)")
+
     #Voy guardando las ya vistas paara no repetirlas. Me quedo con dedup (limpia sin duplicados)
     seen, dedup = set(), []
-    for w in words:
-        if w not in seen:
+    for w in values:
+        w = w.strip()
+        if w and w.lower() != "nan" and w not in seen:
             seen.add(w)
             dedup.append(w)
     return dedup
@@ -61,36 +154,29 @@ def read_words(word_file: Path) -> List[str]:
 # un PDF con una librería. Si no funciona... con la otra.
 
     # Selecciona backend de PDF en runtime:
-    # - Intenta pdfminer.six
-    # - Si falla, intenta pypdf
-    # - Devuelve ('pdfminer', extractor) o ('pypdf', extractor)
+    # - Intenta los backends en orden (por defecto pdfminer.six, pypdf, pypdfium2, PyMuPDF; están
+    #   registrados en cc_backends y order permite cambiar la preferencia, ver preferred_backend_order)
+    # - Devuelve (nombre, extractor), p.ej. ('pdfminer', extractor) o ('pypdf', extractor)
     # - Si ninguno está, devuelve ('none', None)
 
+def pick_pdf_backend(order: Optional[List[str]] = None): #Algunos archivos han dado error... intentamos leer con varias librerías.
 
-def pick_pdf_backend(): #Algunos archivos han dado error... intentamos leer con dos librerías.
+    for name in (order or PDF_BACKENDS):
+        fn = load_pdf_backend(name)
+        if fn is not None:
+            return name, fn
+    return "none", None
 
-    try:
-        from pdfminer.high_level import extract_text as pdf_extract_text
-        return "pdfminer", pdf_extract_text
-    except Exception:
-        pass
-    try:
-        from pypdf import PdfReader
-        def _extract_with_pypdf(path_str: str) -> str:
-            text_parts = []
-            try:
-                reader = PdfReader(path_str)
-                for p in reader.pages:
-                    try:
-                        text_parts.append(p.extract_text() or "")
-                    except Exception:
-                        continue
-            except Exception:
-                return ""
-            return "\n".join(text_parts)
-        return "pypdf", _extract_with_pypdf
-    except Exception:
-        return "none", None
+# Igual que pick_pdf_backend, pero el extractor devuelve el texto página a página (generador) para los PDFs
+# enormes: así nunca está el documento entero en memoria. Juntando las páginas sale el mismo texto que
+# con pick_pdf_backend.
+
+def pick_pdf_page_backend(order: Optional[List[str]] = None):
+    for name in (order or PDF_BACKENDS):
+        fn = load_pdf_backend(name, pages=True)
+        if fn is not None:
+            return name, fn
+    return "none", None
 
 # Crea y devuelve un objeto de expresión regular
 #Mejoras para tener resultados más óptimos y según opción de palabra/frase completa (whole word).
@@ -124,6 +210,303 @@ def compile_pattern(token: str, whole_word: bool) -> re.Pattern:
     return re.compile(pattern, flags=re.UNICODE)
 
 
+# Motor para el modo subcadenas: autómata Aho-Corasick construido una sola vez con todos los tokens.
+# Recorre cada texto UNA vez (en lugar de un finditer por token) y da los mismos conteos que
+# compile_pattern(token, whole_word=False): coincidencias no solapadas de cada token consigo mismo,
+# pero tokens distintos sí pueden solaparse entre ellos (igual que antes, cada regex iba por su cuenta).
+
+class SubstringMatcher:
+    """Cuenta todas las subcadenas de una lista de tokens en una sola pasada (Aho-Corasick)."""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = list(dict.fromkeys(tokens))
+        self._has_empty = "" in self.tokens
+        words = [t for t in self.tokens if t]
+
+        # Trie: _goto[estado] = {caracter: estado_siguiente}; _out[estado] = índice del token que termina ahí
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[int] = [-1]
+        self._lengths = [len(t) for t in words]
+        self._words = words
+        for idx, word in enumerate(words):
+            state = 0
+            for c in word:
+                nxt = self._goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][c] = nxt
+                    self._goto.append({})
+                    self._out.append(-1)
+                state = nxt
+            self._out[state] = idx
+
+        # Enlaces de fallo (BFS) y enlaces de "diccionario" al siguiente estado con salida
+        self._fail = [0] * len(self._goto)
+        self._dict_link = [-1] * len(self._goto)
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]; head += 1
+            for c, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and c not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(c, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                fs = self._fail[nxt]
+                self._dict_link[nxt] = fs if self._out[fs] >= 0 else self._dict_link[fs]
+
+    def count(self, text: str) -> Dict[str, int]:
+        stream = self.stream()
+        stream.feed(text)
+        return stream.finish()
+
+    def stream(self) -> "SubstringStream":
+        return SubstringStream(self)
+
+
+class SubstringStream:
+    """Conteo de SubstringMatcher por trozos (páginas): el estado del autómata pasa de un trozo al siguiente."""
+
+    def __init__(self, matcher: SubstringMatcher):
+        self.matcher = matcher
+        self.state = 0
+        self.pos = 0  # caracteres ya consumidos
+        self.counts = [0] * len(matcher._words)
+        # Fin de la última coincidencia contada por token (para no solapar un token consigo mismo)
+        self.last_end = [0] * len(matcher._words)
+
+    def feed(self, text: str) -> None:
+        m = self.matcher
+        goto, fail, out, dict_link = m._goto, m._fail, m._out, m._dict_link
+        lengths, counts, last_end = m._lengths, self.counts, self.last_end
+
+        state = self.state
+        for pos, c in enumerate(text, start=self.pos + 1):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+
+            s = state if out[state] >= 0 else dict_link[state]
+            while s > 0:
+                idx = out[s]
+                if pos - lengths[idx] >= last_end[idx]:
+                    counts[idx] += 1
+                    last_end[idx] = pos
+                s = dict_link[s]
+
+        self.state = state
+        self.pos += len(text)
+
+    def finish(self) -> Dict[str, int]:
+        results = dict(zip(self.matcher._words, self.counts))
+        if self.matcher._has_empty:
+            # re.compile("").finditer encuentra una coincidencia vacía en cada posición
+            results[""] = self.pos + 1
+        return results
+
+
+# Motor para el modo palabra/frase completa: en vez de una regex por término (que recorre el documento
+# entero cada vez), partimos el texto UNA vez en palabras (\w+) y separadores, y buscamos cada palabra
+# en una tabla hash con todas las formas admitidas (término + s/es/ed/ing/er/ers y el cambio y -> ies).
+# Las frases (varias palabras) se indexan por su primera palabra y se comprueban palabra a palabra,
+# con los separadores exactos, igual que hacía la regex. El total de palabras sale de la misma pasada.
+
+WORD_SPLIT_RE = re.compile(r"(\w+)", flags=re.UNICODE)
+WHOLE_WORD_SUFFIXES = ("s", "es", "ed", "ing", "er", "ers")
+
+
+def _surface_forms(word: str, apply_y_rule: bool) -> List[str]:
+    """Formas de la última palabra de un término que acepta compile_pattern(..., whole_word=True)."""
+
+    bases = [word]
+    if apply_y_rule:
+        bases.append(word[:-1] + "ies")
+    return [base + suffix for base in bases for suffix in ("",) + WHOLE_WORD_SUFFIXES]
+
+
+class WholeWordMatcher:
+    """Cuenta términos completos (con flexiones y frases) con una pasada y búsquedas O(1) por palabra."""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = list(dict.fromkeys(tokens))
+        # Términos que no empiezan y terminan en \w (p.ej. "c++"): sus límites no coinciden con los
+        # de las palabras, así que se dejan para compile_pattern.
+        self.unsupported: List[str] = []
+        self.words: List[str] = []
+        self.single_forms: Dict[str, List[int]] = {}
+        self.phrase_first: Dict[str, List[int]] = {}
+        self.phrases: List[tuple] = []
+
+        for token in self.tokens:
+            parts = WORD_SPLIT_RE.split(token)
+            if len(parts) < 3 or parts[0] or parts[-1]:
+                self.unsupported.append(token)
+                continue
+            idx = len(self.words)
+            self.words.append(token)
+            runs, seps = parts[1::2], parts[2:-1:2]
+            forms = _surface_forms(runs[-1], token.endswith("y"))
+            if len(runs) == 1:
+                for form in dict.fromkeys(forms):
+                    self.single_forms.setdefault(form, []).append(idx)
+            else:
+                self.phrase_first.setdefault(runs[0], []).append(len(self.phrases))
+                # (índice del término, primera palabra, separadores, palabras intermedias, formas de la última)
+                self.phrases.append((idx, runs[0], tuple(seps), tuple(runs[1:-1]), frozenset(forms)))
+
+    def count(self, text: str) -> Dict[str, int]:
+        return self.stream().finish(text)
+
+    def stream(self, collect_types: bool = False) -> "WholeWordStream":
+        return WholeWordStream(self, collect_types)
+
+
+class WholeWordStream:
+    """Conteo de WholeWordMatcher por trozos (páginas).
+
+    Al final de cada trozo se retienen las últimas palabras (la última puede estar cortada y una frase
+    que empiece antes puede necesitar las siguientes); el resto se cuenta y se descarta.
+    """
+
+    def __init__(self, matcher: WholeWordMatcher, collect_types: bool = False):
+        self.matcher = matcher
+        self.counts = [0] * len(matcher.words)
+        # Índice absoluto de la última palabra de la última coincidencia de cada frase (sin solapes)
+        self.last_end = [-1] * len(matcher.phrases)
+        self.total = 0
+        self.prev_space = True  # el inicio del texto cuenta como si viniera de un espacio
+        self.base = 0  # índice absoluto de la primera palabra que queda en carry
+        self.carry = ""
+        # Con stemming también hace falta cuántas veces aparece cada palabra distinta
+        self.types: Optional[Counter] = Counter() if collect_types else None
+        self.keep = max((len(p[2]) + 1 for p in matcher.phrases), default=1)
+
+    def feed(self, text: str) -> None:
+        parts = WORD_SPLIT_RE.split(self.carry + text)  # [sep, palabra, sep, palabra, ..., sep]
+        limit = len(parts) // 2 - self.keep
+        if limit <= 0:
+            self.carry += text
+            return
+        self._process(parts, limit)
+        self.carry = "".join(parts[2 * limit:])
+        self.base += limit
+
+    def finish(self, text: str = "") -> Dict[str, int]:
+        parts = WORD_SPLIT_RE.split(self.carry + text)
+        self._process(parts, len(parts) // 2)
+        self.carry = ""
+
+        sep = parts[-1]
+        if sep:
+            pieces = len(sep.split())
+            if pieces and not self.prev_space and not sep[0].isspace():
+                pieces -= 1
+            self.total += pieces
+
+        results = dict(zip(self.matcher.words, self.counts))
+        results[TOTAL_KEY] = self.total
+        return results
+
+    def _process(self, parts: List[str], limit: int) -> None:
+        """Cuenta las 'limit' primeras palabras de parts (y los separadores previos a cada una)."""
+
+        m = self.matcher
+        single, phrase_first, phrases = m.single_forms, m.phrase_first, m.phrases
+        counts, last_end, types = self.counts, self.last_end, self.types
+        n_parts = len(parts)
+        total, prev_space, base = self.total, self.prev_space, self.base
+
+        for i in range(1, 2 * limit, 2):
+            # Total de palabras (equivalente a len(text.split())) mirando el separador previo
+            sep = parts[i - 1]
+            if sep == " ":
+                prev_space = True
+            elif sep:
+                pieces = len(sep.split())
+                if pieces and not prev_space and not sep[0].isspace():
+                    pieces -= 1  # ese trozo va pegado a la palabra anterior
+                total += pieces
+                prev_space = sep[-1].isspace()
+            if prev_space:
+                total += 1
+            prev_space = False
+
+            run = parts[i]
+            if types is not None:
+                types[run] += 1
+            hits = single.get(run)
+            if hits:
+                for idx in hits:
+                    counts[idx] += 1
+            cands = phrase_first.get(run)
+            if cands:
+                start = base + i // 2
+                for pidx in cands:
+                    if start <= last_end[pidx]:
+                        continue
+                    idx, _, seps, middle, last_forms = phrases[pidx]
+                    end = i + 2 * len(seps)
+                    if end >= n_parts:
+                        continue
+                    ok = all(parts[i + 1 + 2 * j] == s for j, s in enumerate(seps))
+                    ok = ok and all(parts[i + 2 + 2 * j] == w for j, w in enumerate(middle))
+                    if ok and parts[end] in last_forms:
+                        counts[idx] += 1
+                        last_end[pidx] = start + len(seps)
+
+        self.total, self.prev_space = total, prev_space
+
+
+class PatternStream:
+    """finditer por trozos para los patrones de compile_pattern que no cubren los motores anteriores.
+
+    Una coincidencia sólo se da por buena cuando detrás hay texto suficiente para que no pueda cambiar
+    (longitud del token + "ies" + sufijo + el carácter del lookahead); si no, se espera al siguiente trozo.
+    """
+
+    def __init__(self, patterns: Dict[str, re.Pattern]):
+        self.patterns = patterns
+        self.margin = {t: len(t) + 6 for t in patterns}
+        self.resume = {t: 0 for t in patterns}  # posición (en buf) desde la que seguir buscando
+        self.counts = {t: 0 for t in patterns}
+        self.buf = ""
+
+    def feed(self, text: str, final: bool = False) -> None:
+        buf = self.buf + text
+        n = len(buf)
+        for token, pat in self.patterns.items():
+            if not token:
+                # El token vacío (palabra que se queda en nada al normalizar) casa en cualquier
+                # sitio; no tiene sentido esperar: se cuenta trozo a trozo
+                if text:
+                    self.counts[token] += sum(1 for _ in pat.finditer(text))
+                self.resume[token] = n
+                continue
+            pos, margin = self.resume[token], self.margin[token]
+            for match in pat.finditer(buf, pos):
+                if not final and match.start() + margin > n:
+                    pos = max(pos, min(match.start(), n - margin + 1))
+                    break
+                self.counts[token] += 1
+                pos = match.end()
+            else:
+                if not final:
+                    pos = max(pos, n - margin + 1)
+            self.resume[token] = pos
+
+        # Se conserva desde la búsqueda más atrasada (menos 1 carácter para el lookbehind)
+        cut = max(0, min(self.resume.values(), default=n) - 1)
+        self.buf = buf[cut:]
+        for token in self.resume:
+            self.resume[token] -= cut
+
+    def finish(self) -> Dict[str, int]:
+        self.feed("", final=True)
+        return dict(self.counts)
+
+
 def _token_is_single_word(token: str) -> bool:
     """Devuelve True si el token es una sola palabra sin espacios ni separadores."""
 
@@ -138,7 +521,24 @@ def _token_prefix(token: str) -> str:
     return token[:4]
 
 
-def pick_stemmer(words: List[str]) -> Optional["SnowballStemmer"]:
+# El mismo puñado de miles de palabras distintas se repite millones de veces en un corpus y el Snowball
+# en Python puro es lento: cada palabra distinta se stemiza una vez y se recuerda (caché LRU acotada),
+# y la caché vive con el stemmer, así que se comparte entre todos los documentos de la ejecución
+# (en modo paralelo, entre todos los documentos de cada proceso).
+
+STEM_CACHE_SIZE = 200_000
+
+
+class CachedStemmer:
+    """Stemmer con caché LRU acotada; mismo .stem() que el SnowballStemmer que envuelve."""
+
+    def __init__(self, stemmer, language: str, maxsize: int = STEM_CACHE_SIZE):
+        self.stemmer = stemmer
+        self.language = language
+        self.stem = lru_cache(maxsize=maxsize)(stemmer.stem)
+
+
+def pick_stemmer(words: List[str]) -> Optional[CachedStemmer]:
     """Selecciona dinámicamente un stemmer acorde al idioma detectado."""
 
     if not words or SnowballStemmer is None:
@@ -149,7 +549,7 @@ def pick_stemmer(words: List[str]) -> Optional["SnowballStemmer"]:
 
     for lang in preferred:
         try:
-            return SnowballStemmer(lang)
+            return CachedStemmer(SnowballStemmer(lang), lang)
         except Exception:
             continue
     return None
@@ -158,6 +558,16 @@ def pick_stemmer(words: List[str]) -> Optional["SnowballStemmer"]:
 def count_occurrences_with_stemming(text: str, tokens: List[str], stemmer: "SnowballStemmer") -> Dict[str, int]:
     """Cuenta ocurrencias agrupando por raíz (stemming) para tokens simples."""
 
+    if not tokens:
+        return {}
+
+    # Primero se cuentan los tipos de palabra; así cada palabra distinta se stemiza una sola vez
+    return count_stemmed_types(Counter(WORD_RE.findall(text)), tokens, stemmer)
+
+
+def count_stemmed_types(type_counts: Dict[str, int], tokens: List[str], stemmer: "SnowballStemmer") -> Dict[str, int]:
+    """Como count_occurrences_with_stemming, pero a partir de {palabra: nº de apariciones}."""
+
     if not tokens:
         return {}
 
@@ -170,7 +580,7 @@ def count_occurrences_with_stemming(text: str, tokens: List[str], stemmer: "Snow
 
     results = {token: 0 for token in tokens}
 
-    for word in WORD_RE.findall(text):
+    for word, n in type_counts.items():
         if not word:
             continue
         stem = stemmer.stem(word)
@@ -181,7 +591,7 @@ def count_occurrences_with_stemming(text: str, tokens: List[str], stemmer: "Snow
             prefix = prefixes[token]
             if prefix and not word.startswith(prefix):
                 continue
-            results[token] += 1
+            results[token] += n
 
     return results
 
@@ -190,20 +600,36 @@ def count_occurrences_with_stemming(text: str, tokens: List[str], stemmer: "Snow
 def count_occurrences(text: str,
                       patterns: Dict[str, re.Pattern],
                       tokens_with_stem: List[str],
-                      stemmer: Optional["SnowballStemmer"]) -> Dict[str, int]:
-    results: Dict[str, int] = {}
-
+                      stemmer: Optional["SnowballStemmer"],
+                      matcher=None,
+                      prof: Optional[DocProfile] = None) -> Dict[str, int]:
     stem_counts: Dict[str, int] = {}
     if stemmer is not None and tokens_with_stem:
-        stem_counts = count_occurrences_with_stemming(text, tokens_with_stem, stemmer)
+        with stage(prof, "stemming", len(text)):
+            stem_counts = count_occurrences_with_stemming(text, tokens_with_stem, stemmer)
+
+    # Si hay motor (SubstringMatcher o WholeWordMatcher), una sola pasada resuelve todos sus tokens;
+    # los patrones quedan para el resto
+    with stage(prof, "match", len(text)):
+        matched: Dict[str, int] = matcher.count(text) if matcher is not None else {}
+    total = matched.pop(TOTAL_KEY, None)
+
+    with stage(prof if patterns else None, "regex", len(text)):
+        for token, pat in patterns.items():
+            if token in matched:
+                continue
+            # Coincidencias detectadas en el texto (sólo contamos, sin construir la lista)
+            matched[token] = sum(1 for _ in pat.finditer(text))
 
-    for token, pat in patterns.items():
-        # Coincidencias detectadas en el texto
-        matches = list(pat.finditer(text))
+    return merge_counts(matched, stem_counts, tokens_with_stem, total)
 
-        # Cuenta coincidencias (tamaño de la lista)
-        count = len(matches)
 
+def merge_counts(matched: Dict[str, int], stem_counts: Dict[str, int],
+                 tokens_with_stem: List[str], total: Optional[int] = None) -> Dict[str, int]:
+    """Junta conteos exactos y por raíz (se queda con el mayor) y añade el total si lo hay."""
+
+    results: Dict[str, int] = {}
+    for token, count in matched.items():
         if token in stem_counts:
             count = max(count, stem_counts[token])
 
@@ -215,279 +641,746 @@ def count_occurrences(text: str,
         if token not in results and stem_counts:
             results[token] = stem_counts.get(token, 0)
 
+    if total is not None:
+        results[TOTAL_KEY] = total
+
     return results
 
 
+# ----------------- Motor de conteo (sin GUI) -----------------
+# Agrupa todo lo que hay que preparar UNA vez por ejecución (normalización del listado, motor de
+# búsqueda, patrones y stemmer) para poder reutilizarlo en cada PDF, y también en cada proceso
+# cuando se trabaja en paralelo.
+
+class CountingEngine:
+    """Prepara el listado de palabras y cuenta ocurrencias en el texto de un PDF."""
+
+    def __init__(self, original_words: List[str], remove_accents: bool, whole_word: bool,
+                 only_tokens: Optional[List[str]] = None):
+        self.original_words = list(original_words)
+        self.remove_accents = remove_accents
+        self.whole_word = whole_word
+        self.only_tokens = list(only_tokens) if only_tokens is not None else None
+
+        self.original_to_norm = {w: normalize_text(w, remove_accents) for w in self.original_words}
+        # Sin repetidos (dict.fromkeys mantiene el orden del listado)
+        self.norm_tokens = list(dict.fromkeys(self.original_to_norm.values()))
+        if self.only_tokens is not None:
+            # Sólo se cuentan estos (p.ej. términos nuevos en modo incremental); el stemmer se sigue
+            # eligiendo con el listado completo para que los conteos no dependan del subconjunto
+            wanted = set(self.only_tokens)
+            self.norm_tokens = [nw for nw in self.norm_tokens if nw in wanted]
+
+        self.stemmer = pick_stemmer(self.original_words) if whole_word else None
+        self.tokens_with_stem: List[str] = []
+        if self.stemmer is not None:
+            self.tokens_with_stem = [nw for nw in self.norm_tokens if _token_is_single_word(nw)]
+
+        if whole_word:
+            # Palabra completa: tabla hash de formas; sólo los términos raros siguen con regex
+            self.matcher = WholeWordMatcher(self.norm_tokens)
+            self.patterns = {nw: compile_pattern(nw, whole_word) for nw in self.matcher.unsupported}
+        else:
+            # Subcadenas: un único autómata para todos los tokens (una pasada por documento)
+            self.matcher = SubstringMatcher(self.norm_tokens)
+            self.patterns = {}
+
+    def spec(self) -> tuple:
+        """Argumentos para reconstruir este motor en otro proceso."""
+
+        return (self.original_words, self.remove_accents, self.whole_word, self.only_tokens)
+
+    def restricted(self, only_tokens: List[str]) -> "CountingEngine":
+        return CountingEngine(self.original_words, self.remove_accents, self.whole_word, only_tokens)
+
+    def options_key(self, backend_name: str) -> str:
+        """Todo lo que cambia el conteo de un término aparte del propio texto (para el almacén incremental)."""
+
+        stem_lang = getattr(self.stemmer, "language", "custom") if self.stemmer else "none"
+        return f"{backend_name}|whole_word={int(self.whole_word)}|remove_accents={int(self.remove_accents)}|stem={stem_lang}"
+
+    def count_text(self, text: str, prof: Optional[DocProfile] = None) -> Dict[str, int]:
+        with stage(prof, "normalize", len(text)):
+            norm_text = normalize_text(text, self.remove_accents)
+        return self.count_normalized(norm_text, prof)
+
+    def count_normalized(self, norm_text: str, prof: Optional[DocProfile] = None) -> Dict[str, int]:
+        per_token_counts = count_occurrences(
+            norm_text,
+            self.patterns,
+            self.tokens_with_stem,
+            self.stemmer,
+            self.matcher,
+            prof,
+        )
+        if TOTAL_KEY not in per_token_counts:
+            per_token_counts[TOTAL_KEY] = len(norm_text.split())
+        return per_token_counts
+
+    def count_pages(self, pages, prof: Optional[DocProfile] = None) -> Dict[str, int]:
+        """Igual que count_text sobre "".join(pages), pero normalizando y contando página a página.
+
+        En memoria sólo está la página actual más un pequeño arrastre para las coincidencias que cruzan
+        el salto de página.
+        """
+
+        with_stem = self.stemmer is not None and bool(self.tokens_with_stem)
+        if isinstance(self.matcher, WholeWordMatcher):
+            stream = self.matcher.stream(collect_types=with_stem)
+            total_stream = None
+        else:
+            stream = self.matcher.stream()
+            total_stream = WholeWordMatcher([]).stream()  # sólo para el total de palabras
+        pattern_stream = PatternStream(self.patterns)
+
+        pages = iter(pages)
+        while True:
+            # La extracción ocurre al pedir la siguiente página al generador
+            with stage(prof, "extract"):
+                page = next(pages, None)
+            if page is None:
+                break
+            add_size(prof, "extract", len(page))
+            with stage(prof, "normalize", len(page)):
+                chunk = normalize_text(page, self.remove_accents)
+            with stage(prof, "match", len(chunk)):
+                stream.feed(chunk)
+                if total_stream is not None:
+                    total_stream.feed(chunk)
+            with stage(prof if self.patterns else None, "regex", len(chunk)):
+                pattern_stream.feed(chunk)
+
+        with stage(prof, "match"):
+            matched = stream.finish()
+            total = matched.pop(TOTAL_KEY) if total_stream is None else total_stream.finish()[TOTAL_KEY]
+        with stage(prof if self.patterns else None, "regex"):
+            for token, count in pattern_stream.finish().items():
+                matched.setdefault(token, count)
+        stem_counts: Dict[str, int] = {}
+        if with_stem:
+            with stage(prof, "stemming", len(stream.types)):
+                stem_counts = count_stemmed_types(stream.types, self.tokens_with_stem, self.stemmer)
+        return merge_counts(matched, stem_counts, self.tokens_with_stem, total)
+
+
+def load_normalized_text(pdf_path: Path, pdf_text_fn, remove_accents: bool,
+                         cache: Optional[TextCache] = None, backend_name: str = "",
+                         prof: Optional[DocProfile] = None) -> str:
+    """Texto normalizado de un PDF, tomado de la caché si está o extraído (y guardado) si no.
+
+    Si no se puede extraer lanza ExtractionFailed (no se cuenta como un documento vacío).
+    """
+
+    if cache is not None:
+        with stage(prof, "cache"):
+            cached = cache.get(pdf_path, backend_name, remove_accents, record=False)
+            from_raw = not cache.normalized
+            if cached is None and cache.normalized:
+                # Texto crudo que dejó extractpdf (cc_extract) con el mismo extractor: sólo falta normalizar
+                cached = cache.get(pdf_path, backend_name, remove_accents, raw=True, record=False)
+                from_raw = True
+            cache.record(cached is not None)
+        if cached is not None:
+            if prof is not None:
+                prof.cache_hit = True
+            add_size(prof, "cache", len(cached))
+            if not from_raw:
+                return cached
+            with stage(prof, "normalize", len(cached)):
+                norm_text = normalize_text(cached, remove_accents)
+            if cache.normalized:
+                with stage(prof, "cache"):
+                    cache.put(pdf_path, backend_name, remove_accents, norm_text)
+            return norm_text
 
-# ----------------- Interfaz Gráfica Tk -----------------
-
-class App(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Contar palabras en PDFs (by RSG - Sept 2025)")
-        self.geometry("720x440")
-        self.minsize(680, 400)
-
-        # Variables
-        self.var_words = tk.StringVar()
-        self.var_pdfdir = tk.StringVar()
-        self.var_output = tk.StringVar(value=str(Path.cwd() / "resultado_conteos.csv"))
-        self.var_substrings = tk.BooleanVar(value=False)
-        self.var_keep_accents = tk.BooleanVar(value=False)  # False => normaliza
-        self.var_recursive = tk.BooleanVar(value=False)
-
-        # Progreso
-        self.var_progress_text = tk.StringVar(value="Listo.")
-        self.var_progress_count = tk.StringVar(value="")
-        self.progress_value = tk.IntVar(value=0)
-        self.progress_max = 100
-
-        self.create_widgets()
-
-    def create_widgets(self):
-        pad = {'padx': 10, 'pady': 6}
-        frame = ttk.Frame(self); frame.pack(fill="both", expand=True, **pad)
-
-        # Archivo palabras
-        ttk.Label(frame, text="Archivo de palabras (Excel/CSV):").grid(row=0, column=0, sticky="w")
-        ttk.Entry(frame, textvariable=self.var_words).grid(row=1, column=0, columnspan=2, sticky="we", **pad)
-        ttk.Button(frame, text="Examinar...", command=self.select_words_file).grid(row=1, column=2, sticky="we", **pad)
-
-        # Carpeta PDFs
-        ttk.Label(frame, text="Carpeta con PDFs:").grid(row=2, column=0, sticky="w")
-        ttk.Entry(frame, textvariable=self.var_pdfdir).grid(row=3, column=0, columnspan=2, sticky="we", **pad)
-        ttk.Button(frame, text="Examinar...", command=self.select_pdf_dir).grid(row=3, column=2, sticky="we", **pad)
-
-        # Archivo salida
-        ttk.Label(frame, text="Archivo de salida (CSV):").grid(row=4, column=0, sticky="w")
-        ttk.Entry(frame, textvariable=self.var_output).grid(row=5, column=0, columnspan=2, sticky="we", **pad)
-        ttk.Button(frame, text="Cambiar...", command=self.select_output_file).grid(row=5, column=2, sticky="we", **pad)
-
-        # Opciones
-        options = ttk.LabelFrame(frame, text="Opciones")
-        options.grid(row=6, column=0, columnspan=3, sticky="we", **pad)
-        ttk.Checkbutton(options, text="Contar subcadenas (no sólo palabra/frase completa)", variable=self.var_substrings).grid(row=0, column=0, sticky="w", padx=10, pady=4)
-        ttk.Checkbutton(options, text="Mantener acentos (no normalizar)", variable=self.var_keep_accents).grid(row=1, column=0, sticky="w", padx=10, pady=4)
-        ttk.Checkbutton(options, text="Buscar recursivamente en subcarpetas", variable=self.var_recursive).grid(row=2, column=0, sticky="w", padx=10, pady=4)
-
-        # Progreso
-        prog = ttk.LabelFrame(frame, text="Progreso")
-        prog.grid(row=7, column=0, columnspan=3, sticky="we", **pad)
-        self.progress = ttk.Progressbar(prog, orient="horizontal", mode="determinate",
-                                        maximum=self.progress_max, variable=self.progress_value)
-        self.progress.grid(row=0, column=0, columnspan=3, sticky="we", padx=10, pady=6)
-        ttk.Label(prog, textvariable=self.var_progress_text).grid(row=1, column=0, sticky="w", padx=10)
-        ttk.Label(prog, textvariable=self.var_progress_count).grid(row=1, column=2, sticky="e", padx=10)
-
-        # Botones
-        ttk.Button(frame, text="START", command=self.on_run).grid(row=8, column=0, sticky="we", **pad)
-        ttk.Button(frame, text="EXIT", command=self.destroy).grid(row=8, column=2, sticky="we", **pad)
-
-        frame.columnconfigure(0, weight=1)
-        prog.columnconfigure(0, weight=1)
-
-
-## Código de los botones en GUI para selección de archivo/directorio
-
-    def select_words_file(self):
-        path = filedialog.askopenfilename(title="Selecciona Excel o CSV con palabras",
-                                          filetypes=[("Excel", "*.xlsx *.xls"), ("CSV", "*.csv"), ("Todos", "*.*")])
-        if path: self.var_words.set(path)
-
-    def select_pdf_dir(self):
-        path = filedialog.askdirectory(title="Selecciona carpeta con PDFs")
-        if path: self.var_pdfdir.set(path)
-
-    def select_output_file(self):
-        initial = self.var_output.get() or str(Path.cwd() / "resultado_conteos.csv")
-        path = filedialog.asksaveasfilename(title="Guardar CSV de salida",
-                                            defaultextension=".csv",
-                                            initialfile=Path(initial).name,
-                                            initialdir=str(Path(initial).parent),
-                                            filetypes=[("CSV", "*.csv")])
-        if path:
-            if not str(path).lower().endswith(".csv"):
-                path = f"{path}.csv"
-            self.var_output.set(path)
-
-    # Progreso de la barra (añado tb el nombre del archivo que está comprobando)
-    def update_progress(self, current: int, total: int, filename: str):
-        if total <= 0:
-            self.progress_value.set(0)
-            self.var_progress_text.set("Sin PDFs.")
-            self.var_progress_count.set("")
+    try:
+        with stage(prof, "extract"):
+            text = pdf_text_fn(str(pdf_path)) or ""
+    except ExtractionFailed:
+        raise
+    except Exception as e:
+        raise ExtractionFailed(f"{type(e).__name__}: {e}") from e  # ni se cuenta ni se guarda en caché
+    add_size(prof, "extract", len(text))
+
+    with stage(prof, "normalize", len(text)):
+        norm_text = normalize_text(text, remove_accents)
+    if cache is not None:
+        with stage(prof, "cache"):
+            cache.put(pdf_path, backend_name, remove_accents, norm_text if cache.normalized else text)
+    return norm_text
+
+
+def _safe_pages(pdf_pages_fn, pdf_path: Path):
+    emitted = False
+    try:
+        for page in pdf_pages_fn(str(pdf_path)):
+            emitted = True
+            yield page
+    except ExtractionFailed:
+        raise
+    except Exception as e:
+        if not emitted:
+            raise ExtractionFailed(f"{type(e).__name__}: {e}") from e
+        return  # si falla a mitad, se queda con lo contado hasta ahí
+
+
+def count_pdf(pdf_path: Path, pdf_text_fn, engine: CountingEngine,
+              cache: Optional[TextCache] = None, backend_name: str = "",
+              streaming: bool = False, prof: Optional[DocProfile] = None) -> Dict[str, int]:
+    """Extrae el texto de un PDF (o lo toma de la caché) y cuenta las palabras del listado.
+
+    Con streaming=True, pdf_text_fn es un extractor por páginas (pick_pdf_page_backend) y no se usa la
+    caché, que necesitaría el texto completo. Con prof se anotan los tiempos de cada etapa.
+    Si no se pudo leer nada del PDF lanza ExtractionFailed.
+    """
+
+    if prof is None:
+        if streaming:
+            return engine.count_pages(_safe_pages(pdf_text_fn, pdf_path))
+        norm_text = load_normalized_text(pdf_path, pdf_text_fn, engine.remove_accents, cache, backend_name)
+        return engine.count_normalized(norm_text)
+
+    try:
+        prof.file_bytes = pdf_path.stat().st_size
+    except OSError:
+        pass
+    with prof.document():
+        if streaming:
+            counts = engine.count_pages(_safe_pages(pdf_text_fn, pdf_path), prof)
         else:
-            val = int(current * self.progress_max / total)
-            self.progress_value.set(val)
-            self.var_progress_text.set(f"Procesando: {filename}" if filename else "Procesando...")
-            self.var_progress_count.set(f"{current} / {total} PDFs")
-        self.update_idletasks()
-
-# ------------------------ FUNCION PRINCIPAL (la que lanza el botón de START-----------------------------------
-    def on_run(self):
-        words = self.var_words.get().strip()
-        pdfdir = self.var_pdfdir.get().strip()
-        outcsv = self.var_output.get().strip() or str(Path.cwd() / "resultado_conteos.csv")
-
-    #Gestión de errores al darle a RUN (si nos flata algún dato)
-    #       (Faltan cosas por introducir)
-        if not words:
-            messagebox.showwarning("Falta listado de palabras", "Selecciona el archivo (Excel/CSV).")
-            return
-        if not pdfdir:
-            messagebox.showwarning("Falta carpeta de PDFs", "Selecciona la carpeta con los PDFs.")
-            return
-    #       (No hay instaladas librerías...)
-        backend_name, backend_fn = pick_pdf_backend()
-        if backend_name == "none":
-            messagebox.showerror(
-                "No se han detectado librerías para lectura PDF",
-                "Necesitas instalar al menos una usando:\n  pip install pdfminer.six\n  o\n  pip install pypdf"
-            )
-            return
-    # LANZO EL CONTEO DE PALABRAS
-        try:
-            self.run_count(words_path=Path(words),
-                           pdf_dir=Path(pdfdir),
-                           out_csv=Path(outcsv),
-                           backend_name=backend_name,
-                           pdf_text_fn=backend_fn,
-                           substrings=self.var_substrings.get(),
-                           keep_accents=self.var_keep_accents.get(),
-                           recursive=self.var_recursive.get())
-        except Exception as e:
-            # Además del messagebox, imprime el error si abriste desde terminal
-            print("ERROR:", e, file=sys.stderr)
-            messagebox.showerror("Error detectado", str(e))
-
-
-
-# ------------------------ LOGICA PRINCIPAL DE CONTEO-----------------------------------
-    def run_count(self, words_path: Path, pdf_dir: Path, out_csv: Path,
-                  backend_name: str, pdf_text_fn,
-                  substrings: bool, keep_accents: bool, recursive: bool) -> None:
-    
-    #       (No existe el archivo con la lista)
-        if not words_path.exists():
-            messagebox.showerror("Error", f"No existe el archivo de palabras:\n{words_path}")
-            return
-    #       (No existe carpeta de PDFs)
-        if not pdf_dir.exists() or not pdf_dir.is_dir():
-            messagebox.showerror("Error", f"No existe la carpeta de PDFs o no es carpeta:\n{pdf_dir}")
-            return
+            norm_text = load_normalized_text(pdf_path, pdf_text_fn, engine.remove_accents, cache, backend_name, prof)
+            counts = engine.count_normalized(norm_text, prof)
+    # Con elección por documento (AutoExtractor / IsolatedExtractor) se anota el backend que se usó de verdad
+    used = getattr(pdf_text_fn, "last_backend", "")
+    if used and not prof.cache_hit:
+        prof.backend = used
+    return counts
+
+
+# Estado de cada proceso del pool: el motor (patrones, stemmer...) y el backend se crean una sola
+# vez por proceso en el initializer, no una vez por PDF.
+_worker_engine: Optional[CountingEngine] = None
+_worker_text_fn = None
+_worker_backend_name = ""
+_worker_cache: Optional[TextCache] = None
+_worker_streaming = False
+_worker_profiling = False
+_worker_cprofile: Optional[WorkerProfiler] = None
+_worker_pdf_dir: Optional[Path] = None
+
+
+def _init_count_worker(engine_spec: tuple, cache_config: Optional[tuple] = None, streaming: bool = False,
+                       profiling: bool = False, cprofile_path: Optional[str] = None,
+                       extractor=None, backend_name: str = "", pdf_dir: Optional[Path] = None) -> None:
+    global _worker_engine, _worker_text_fn, _worker_backend_name, _worker_cache, _worker_streaming
+    global _worker_profiling, _worker_cprofile, _worker_pdf_dir
+    # Ctrl+C llega a todo el grupo de procesos: sólo el padre cancela (y escribe los eventos); el pool
+    # se encarga de parar los procesos
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _worker_engine = CountingEngine(*engine_spec)
+    _worker_streaming = streaming
+    if extractor is not None:
+        # AutoExtractor / IsolatedExtractor viajan como configuración; con extracción aislada cada proceso
+        # del pool tiene su propio proceso hijo de extracción
+        _worker_backend_name, _worker_text_fn = backend_name, extractor
+    else:
+        # El extractor de pypdf es una función anidada (no se puede enviar entre procesos): se elige aquí
+        _worker_backend_name, _worker_text_fn = pick_pdf_page_backend() if streaming else pick_pdf_backend()
+    # Cada proceso abre su propia conexión a la caché (sqlite no se comparte entre procesos)
+    _worker_cache = TextCache(*cache_config) if cache_config else None
+    _worker_profiling = profiling
+    _worker_cprofile = WorkerProfiler(cprofile_path) if cprofile_path else None
+    _worker_pdf_dir = pdf_dir
+
+
+def _profile_name(pdf_path: Path, pdf_dir: Optional[Path]) -> str:
+    # El mismo nombre que la columna del documento en la salida (ruta relativa a la carpeta)
+    return doc_key(pdf_path, pdf_dir) if pdf_dir is not None else pdf_path.name
 
+
+def _count_pdf_in_worker(pdf_path: Path):
+    hits_before = _worker_cache.hits if _worker_cache is not None else 0
+    prof = DocProfile(_profile_name(pdf_path, _worker_pdf_dir), _worker_backend_name) if _worker_profiling else None
+    with (_worker_cprofile.profiled() if _worker_cprofile is not None else nullcontext()):
         try:
-            original_words = read_words(words_path)
-        except Exception as e:
-            messagebox.showerror("Error leyendo palabras", str(e)); return
+            counts = count_pdf(pdf_path, _worker_text_fn, _worker_engine, _worker_cache, _worker_backend_name,
+                               _worker_streaming, prof)
+        except ExtractionFailed:
+            counts = None
+    hit = _worker_cache is not None and _worker_cache.hits > hits_before
+    incidents = _worker_text_fn.take_incidents() if isinstance(_worker_text_fn, IsolatedExtractor) else []
+    return pdf_path, counts, hit, prof, incidents
+
+
+def iter_pdf_counts(pdf_paths: List[Path], engine: CountingEngine, pdf_text_fn, workers: int = 1,
+                    cache: Optional[TextCache] = None, backend_name: str = "", streaming: bool = False,
+                    profile: Optional[RunProfile] = None, pdf_dir: Optional[Path] = None):
+    """Genera (ruta, conteos) por cada PDF; con workers > 1 usa un pool de procesos.
+
+    En paralelo los resultados llegan en orden de finalización, no en el de pdf_paths.
+    Los PDFs que no se pudieron extraer llegan con conteos None (se omiten de los resultados).
+    Con streaming=True pdf_text_fn debe ser un extractor por páginas y no se usa la caché.
+    Con profile se recogen los tiempos por etapa de cada documento (también desde los procesos), con el
+    nombre relativo a pdf_dir que lleva en la salida.
+    """
+
+    if streaming:
+        cache = None
+    if workers <= 1 or len(pdf_paths) <= 1:
+        for pdf_path in pdf_paths:
+            prof = DocProfile(_profile_name(pdf_path, pdf_dir), backend_name) if profile is not None else None
+            try:
+                counts = count_pdf(pdf_path, pdf_text_fn, engine, cache, backend_name, streaming, prof)
+            except ExtractionFailed:
+                counts = None
+            if profile is not None:
+                profile.add(prof)
+            yield pdf_path, counts
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    extractor = pdf_text_fn if isinstance(pdf_text_fn, (AutoExtractor, IsolatedExtractor)) else None
+    isolated = pdf_text_fn if isinstance(pdf_text_fn, IsolatedExtractor) else None
+    initargs = (engine.spec(), cache.config() if cache is not None else None, streaming,
+                profile is not None, profile.worker_cprofile_path() if profile is not None else None,
+                extractor, backend_name, pdf_dir)
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_count_worker,
+                             initargs=initargs) as pool:
+        futures = [pool.submit(_count_pdf_in_worker, pdf_path) for pdf_path in pdf_paths]
+        try:
+            for fut in as_completed(futures):
+                pdf_path, counts, hit, prof, incidents = fut.result()
+                if isolated is not None:
+                    isolated.incidents.extend(incidents)  # incidencias de extracción de cada proceso
+                if cache is not None:
+                    cache.record(hit)  # estadísticas de la caché de todos los procesos
+                if profile is not None:
+                    profile.add(prof)
+                yield pdf_path, counts
+        finally:
+            for fut in futures:
+                fut.cancel()
 
-        if not original_words:
-            messagebox.showerror("Sin palabras", "Asegura que las palabras estén en la 1ª columna.")
-            return
 
-        remove_accents = not keep_accents
-        whole_word = not substrings
 
-        
-        original_to_norm = {}
-        for w in original_words:
-            norm = normalize_text(w, remove_accents)
-            original_to_norm[w] = norm
-        
-        
-        # Conjunto (set): desordenado y elementos únicos.
-        norm_tokens_set = set()
-        for w in original_words:
-            norm = normalize_text(w, remove_accents)
-            norm_tokens_set.add(norm)   # Añadir (no se repite si ya está)
+def write_counts_csv(out_csv: Path, original_words: List[str], original_to_norm: Dict[str, str],
+                     counts_per_pdf: Dict[str, Dict[str, int]], pdf_names: List[str]) -> None:
+    """CSV ancho: una fila por palabra del listado, una columna por PDF y la fila final de totales."""
 
-        norm_tokens_unique = list(norm_tokens_set) #Paso a lista (ordenado y permite duplicados... aunque no los tendrá)
+    matrix = CountMatrix(list(dict.fromkeys(original_to_norm.values())))
+    for name in pdf_names:
+        matrix.add(name, counts_per_pdf[name])
+    write_wide_csv(out_csv, original_words, original_to_norm, matrix, pdf_names)
 
-        stemmer = pick_stemmer(original_words) if whole_word else None
-        tokens_with_stem = []
-        if stemmer is not None:
-            tokens_with_stem = [nw for nw in norm_tokens_unique if _token_is_single_word(nw)]
 
-        patterns = {nw: compile_pattern(nw, whole_word) for nw in norm_tokens_unique}
+# Modo incremental: sólo se cuenta lo que falta en el almacén (PDFs nuevos/modificados y términos nuevos)
 
-        if recursive:
-            pdf_iter = pdf_dir.rglob("*.pdf")   # Busca recursivamente
+def plan_incremental(pdf_paths: List[Path], engine: CountingEngine, store: ResultStore, backend_name: str):
+    """Devuelve (huella por PDF, {términos que faltan: PDFs}) y poda del almacén los PDFs borrados."""
+
+    options = engine.options_key(backend_name)
+    fingerprints = {p: file_fingerprint(p) for p in pdf_paths}
+    store.sync_documents({str(p.resolve()): fp for p, fp in fingerprints.items()})
+
+    pending: Dict[tuple, List[Path]] = {}
+    for pdf_path in pdf_paths:
+        known = store.known_terms(fingerprints[pdf_path], options)
+        if known is None:
+            missing = tuple(engine.norm_tokens)
         else:
-            pdf_iter = pdf_dir.glob("*.pdf")    # Solo la carpeta raíz
+            missing = tuple(nw for nw in engine.norm_tokens if nw not in known)
+        if missing:
+            pending.setdefault(missing, []).append(pdf_path)
+    return fingerprints, pending
+
+
+def iter_incremental_counts(pending: Dict[tuple, List[Path]], fingerprints: Dict[Path, str],
+                            engine: CountingEngine, pdf_text_fn, store: ResultStore, backend_name: str,
+                            workers: int = 1, cache: Optional[TextCache] = None, streaming: bool = False,
+                            profile: Optional[RunProfile] = None, pdf_dir: Optional[Path] = None):
+    """Cuenta los pendientes de plan_incremental, los guarda en el almacén y genera (ruta, conteos).
+
+    Los que no se pudieron extraer, o se cortaron a mitad (el proceso de extracción reventó o se pasó de
+    tiempo), no se guardan y llegan con conteos None: se reintentan en la siguiente ejecución.
+    """
+
+    options = engine.options_key(backend_name)
+    isolated = pdf_text_fn if isinstance(pdf_text_fn, IsolatedExtractor) else None
+    for missing, paths in pending.items():
+        sub_engine = engine if len(missing) == len(engine.norm_tokens) else engine.restricted(list(missing))
+        for pdf_path, counts in iter_pdf_counts(paths, sub_engine, pdf_text_fn, workers, cache, backend_name,
+                                                streaming, profile, pdf_dir):
+            if counts is None or (isolated is not None and any(
+                    i["documento"] == str(pdf_path) and i["estado"] == "truncated" for i in isolated.incidents)):
+                yield pdf_path, None
+                continue
+            store.save(fingerprints[pdf_path], options, missing, counts, counts.get(TOTAL_KEY, 0))
+            yield pdf_path, counts
 
-        pdf_paths = sorted(pdf_iter)  # Convierte en lista y ordena
 
-        total = len(pdf_paths) # Número total de PDFs (para la barra)
+# ----------------- Ejecución completa de un lote (sin GUI) -----------------
+# Todo lo que hace el botón START, sin tocar la ventana: se puede lanzar en un hilo aparte (la GUI
+# recibe el progreso por una cola) y se puede cancelar entre documento y documento.
 
-        if total == 0:
-            if not messagebox.askyesno("Aviso",
-                "No se encontraron PDFs en la carpeta indicada.\n"
-                "¿Quieres generar el CSV igualmente sólo con la columna 'palabra'?"):
-                return
+class CountError(Exception):
+    """Error en los datos de entrada, con título para mostrarlo al usuario."""
 
-        counts_per_pdf: Dict[str, Dict[str, int]] = {}
+    def __init__(self, title: str, message: str):
+        super().__init__(message)
+        self.title = title
 
-        self.config(cursor="wait"); self.update_idletasks()
 
-        # Búsqueda por cada PDF
-        try:
-            for idx, pdf_path in enumerate(pdf_paths, start=1):
-
-                self.update_progress(idx-1, total, pdf_path.name) # UPdate barra progreso
-              
-                text = ""
-                try:
-                    text = pdf_text_fn(str(pdf_path)) or ""
-                except Exception:
-                    text = ""  # si falla un archivo, continúa
-
-                norm_text = normalize_text(text, remove_accents)
-                per_token_counts = count_occurrences(
-                    norm_text,
-                    patterns,
-                    tokens_with_stem,
-                    stemmer if whole_word else None,
-                )
-                total_words = len(norm_text.split())
-                per_token_counts["__TOTAL_PALABRAS__"] = total_words
-                counts_per_pdf[pdf_path.name] = per_token_counts
-
-                self.update_progress(idx, total, pdf_path.name)
-
-            pdf_names = list(counts_per_pdf.keys())
-            out_csv.parent.mkdir(parents=True, exist_ok=True)
-
-            #Escribo el resultado en el archivo
-            with out_csv.open("w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["palabra"] + pdf_names)
-
-                for w in original_words:
-                    nw = original_to_norm[w]
-                    row = [w] + [counts_per_pdf[p].get(nw, 0) for p in pdf_names]
-                    writer.writerow(row)
-
-                total_row = ["__TOTAL_PALABRAS__"] + [
-                    counts_per_pdf[p].get("__TOTAL_PALABRAS__", 0) for p in pdf_names
-                ]
-                writer.writerow(total_row)
-
-            messagebox.showinfo("Listo", f"CSV generado:\n{out_csv}\n\nBackend usado PDF: {backend_name}")
-        finally:
-            self.config(cursor=""); self.update_progress(total, max(total,1), "")
+def find_pdfs(pdf_dir: Path, recursive: bool) -> List[Path]:
+    if recursive:
+        pdf_iter = pdf_dir.rglob("*.pdf")   # Busca recursivamente
+    else:
+        pdf_iter = pdf_dir.glob("*.pdf")    # Solo la carpeta raíz
+    return sorted(pdf_iter)  # Convierte en lista y ordena
+
 
+def doc_key(pdf_path: Path, pdf_dir: Path) -> str:
+    """Nombre del documento en la salida: ruta relativa a la carpeta (con subcarpetas no chocan los
+    archivos que se llaman igual; sin recursivo es el nombre de siempre)."""
 
+    try:
+        return pdf_path.relative_to(pdf_dir).as_posix()
+    except ValueError:
+        return pdf_path.name
+
+
+def count_batch(words_path: Path, pdf_dir: Path, out_csv: Path,
+                backend_name: str, pdf_text_fn,
+                substrings: bool, keep_accents: bool, recursive: bool = False,
+                workers: int = 1, use_cache: bool = False, incremental: bool = False,
+                streaming: bool = False, output_format: str = "wide",
+                profile_report: bool = False, cprofile: bool = False,
+                isolate: bool = False, timeout: float = DEFAULT_TIMEOUT,
+                max_memory_mb: int = DEFAULT_MAX_MEMORY_MB,
+                dedup: bool = True, shard: Optional[tuple] = None, attempt: Optional[int] = None,
+                pdf_paths: Optional[List[Path]] = None,
+                progress=None, cancel=None) -> dict:
+    """Cuenta las palabras del listado en todos los PDFs y escribe la salida. Devuelve un resumen.
+
+    Con dedup=True los archivos con el mismo contenido (copias en varias subcarpetas) se extraen y
+    cuentan una sola vez y el resultado se copia a cada ruta. En la salida cada PDF va por su ruta
+    relativa a pdf_dir.
+    Con shard=(i, N) sólo se procesan los PDFs del fragmento i de N (ver cc_shard) y out_csv es el archivo
+    parcial que se escribe en lugar de la salida final (se juntan con "python cc_shard.py merge");
+    attempt es el número de intento que se guarda en el parcial (si no, el del parcial anterior + 1).
+
+    progress(hechos, total, nombre) se llama tras cada documento; si cancel.is_set() se para entre
+    documentos y se escriben los resultados parciales (resumen["cancelled"] = True).
+    Los PDFs que no se pudieron extraer no salen en los resultados: quedan como "skipped" en el
+    CSV de incidencias. En modo incremental, si ya tenían conteos guardados (sólo faltaban términos
+    nuevos) salen con ellos y los términos nuevos a 0, apuntados como "stale".
+    Los errores de datos de entrada se lanzan como CountError.
+    """
 
+    #       (No existe el archivo con la lista)
+    if not words_path.exists():
+        raise CountError("Error", f"No existe el archivo de palabras:\n{words_path}")
+    #       (No existe carpeta de PDFs)
+    if not pdf_dir.exists() or not pdf_dir.is_dir():
+        raise CountError("Error", f"No existe la carpeta de PDFs o no es carpeta:\n{pdf_dir}")
+
+    def cancelled() -> bool:
+        return cancel is not None and cancel.is_set()
+
+    def report(done: int, total: int, name: str) -> None:
+        if progress is not None:
+            progress(done, total, name)
+
+    # Tiempos por etapa (y cProfile si se pide: --cprofile en la CLI o la variable de entorno CC_PDF_CPROFILE=1)
+    profile = RunProfile(backend_name, cprofile) if (profile_report or cprofile) else None
+    if profile is not None:
+        profile.start_cprofile(out_csv)
 
-if __name__ == "__main__":
-    # Check mínimo de pandas (tkinter ya está si llegamos aquí)
     try:
-        import pandas  # noqa
-    except Exception:
-        # Ya hay ventana, podemos advertir bien
-        root = tk.Tk(); root.withdraw()
-        messagebox.showerror("Dependencias faltantes", "Falta 'pandas'. Instala con:\n  pip install pandas")
-        sys.exit(1)
+        with stage(profile.run if profile else None, "read_words"):
+            original_words = read_words(words_path)
+    except Exception as e:
+        if profile is not None:
+            profile.stop()
+        raise CountError("Error leyendo palabras", str(e))
+
+    if not original_words:
+        if profile is not None:
+            profile.stop()
+        raise CountError("Sin palabras", "Asegura que las palabras estén en la 1ª columna.")
+
+    with stage(profile.run if profile else None, "build_engine", len(original_words)):
+        engine = CountingEngine(original_words,
+                                remove_accents=not keep_accents,
+                                whole_word=not substrings)
+
+    if pdf_paths is None:
+        pdf_paths = find_pdfs(pdf_dir, recursive)
+    if shard is not None:
+        from cc_shard import select_shard, write_partial  # aquí: cc_shard importa este módulo
+        pdf_paths = select_shard(pdf_paths, pdf_dir, *shard)
+        output_format = "wide"  # no se escribe nada hasta el final (el parcial)
+    total = len(pdf_paths) # Número total de PDFs
+
+    # Copias idénticas: se procesa sólo el representante de cada grupo (lo que sale en la barra)
+    if dedup:
+        copies = group_identical(pdf_paths)
+    else:
+        copies = {p: [p] for p in pdf_paths}
+    unique_paths = list(copies)
+    todo_total = len(unique_paths)
+    keys = {p: doc_key(p, pdf_dir) for p in pdf_paths}
+
+    def add_result(rep_path: Path, per_token_counts: Dict[str, int]) -> None:
+        for path in copies[rep_path]:
+            results.add(keys[path], per_token_counts)
+
+    # PDFs sin texto cuando no hay extracción aislada (la aislada ya los apunta en sus incidencias)
+    failed: List[Dict[str, str]] = []
+    # Modo incremental: PDFs que no se pudieron volver a extraer pero tenían conteos guardados
+    stale: set = set()
+
+    def add_failed(rep_path: Path, status: str = "skipped") -> None:
+        if isolated is None:
+            failed.extend({"documento": str(path), "estado": status, "backend": "",
+                           "motivo": "no se pudo extraer el texto"} for path in copies[rep_path])
+
+    cache = None
+    if use_cache:
+        try:
+            cache = TextCache()
+        except Exception as e:  # sin caché se puede seguir igual (sólo más lento)
+            print("AVISO: no se pudo abrir la caché de texto:", e, file=sys.stderr)
+
+    isolated = None
+    if isolate:
+        # Cada PDF se extrae en un proceso aparte; si se pasa de tiempo, revienta o da un texto vacío o
+        # ilegible, se prueba con el siguiente backend (mismo orden que el extractor elegido)
+        backends = list(getattr(pdf_text_fn, "backends", [backend_name]))
+        backends += [b for b in available_pdf_backends() if b not in backends]
+        isolated = IsolatedExtractor(backends, timeout, max_memory_mb, pages=streaming)
+        pdf_text_fn = isolated
+
+    store = None
+
+    # Los conteos van a una matriz compacta (términos x PDFs) y de ahí al formato de salida elegido
+    results = ResultWriter(out_csv, output_format, original_words, engine.original_to_norm, engine.norm_tokens)
+    finished = False
+    was_cancelled = False
+
+    # Búsqueda por cada PDF (en paralelo si workers > 1; llegan en orden de finalización)
+    try:
+        if incremental:
+            # Sólo se procesa lo que falta; el resto sale del almacén junto al CSV
+            store = ResultStore(default_store_path(out_csv))
+            options = engine.options_key(backend_name)
+            fingerprints, pending = plan_incremental(unique_paths, engine, store, backend_name)
+            todo = sum(len(paths) for paths in pending.values())
+            report(0, todo, "")
+            # Si se cancela, sólo se escriben los PDFs completos (ya estaban o se acabaron ahora)
+            complete = set(unique_paths) - {p for paths in pending.values() for p in paths}
+            counts_iter = iter_incremental_counts(pending, fingerprints, engine, pdf_text_fn, store,
+                                                  backend_name, workers, cache, streaming, profile, pdf_dir)
+            try:
+                for idx, (pdf_path, per_token_counts) in enumerate(counts_iter, start=1):
+                    if per_token_counts is None:
+                        if store.known_terms(fingerprints[pdf_path], options) is not None:
+                            # Sólo faltaban términos nuevos: sale con lo guardado y los nuevos a 0
+                            complete.add(pdf_path)
+                            stale.update(str(p) for p in copies[pdf_path])
+                            add_failed(pdf_path, "stale")
+                        else:
+                            add_failed(pdf_path)
+                    else:
+                        complete.add(pdf_path)
+                    report(idx, todo, pdf_path.name)
+                    if cancelled():
+                        was_cancelled = idx < todo
+                        break
+            finally:
+                counts_iter.close()  # cancela lo que quede en el pool
+            for pdf_path in unique_paths:
+                if pdf_path not in complete:
+                    continue
+                per_token_counts, total_words = store.load(fingerprints[pdf_path], options)
+                per_token_counts[TOTAL_KEY] = total_words
+                add_result(pdf_path, per_token_counts)
+        else:
+            report(0, todo_total, unique_paths[0].name if unique_paths else "")
+            counts_iter = iter_pdf_counts(unique_paths, engine, pdf_text_fn, workers, cache, backend_name,
+                                          streaming, profile, pdf_dir)
+            try:
+                for idx, (pdf_path, per_token_counts) in enumerate(counts_iter, start=1):
+                    if per_token_counts is None:
+                        add_failed(pdf_path)
+                    else:
+                        add_result(pdf_path, per_token_counts)
+                    report(idx, todo_total, pdf_path.name) # UPdate barra progreso
+                    if cancelled():
+                        was_cancelled = idx < todo_total
+                        break
+            finally:
+                counts_iter.close()
+
+        incidents = (isolated.incidents if isolated is not None else []) + failed
+        if stale:
+            incidents = [dict(i, estado="stale", motivo=f"términos nuevos a 0: {i['motivo']}")
+                         if i["documento"] in stale and i["estado"] in ("skipped", "truncated") else i
+                         for i in incidents]
+        # Columnas en el orden (ordenado) de las rutas, no en el de llegada
+        with stage(profile.run if profile else None, "write_output"):
+            if shard is not None:
+                out_path = write_partial(out_csv, engine, results.matrix, [keys[p] for p in pdf_paths],
+                                         shard, backend_name, pdf_dir, complete=not was_cancelled,
+                                         skipped=[i["documento"] for i in incidents if i["estado"] == "skipped"],
+                                         attempt=attempt)
+            else:
+                out_path = results.finish([keys[p] for p in pdf_paths])
+        finished = True
+
+        summary = {"out_path": out_path, "backend": backend_name, "total": total,
+                   "documents": len(results.matrix.doc_names), "duplicates": total - todo_total,
+                   "cancelled": was_cancelled, "shard": f"{shard[0]}/{shard[1]}" if shard else None,
+                   "cache": None, "incidents": None, "profile": None}
+        if cache is not None:
+            summary["cache"] = {"hits": cache.hits, "misses": cache.misses}
+        if incidents:
+            by_status = Counter(i["estado"] for i in incidents)
+            summary["incidents"] = {"path": write_incidents(out_path, incidents),
+                                    "fallback": by_status["fallback"], "truncated": by_status["truncated"],
+                                    "skipped": by_status["skipped"], "low_quality": by_status["low_quality"],
+                                    "stale": by_status["stale"]}
+        if profile is not None:
+            summary["profile"] = {"paths": profile.write(out_path), "slowest": profile.summary()["mas_lentos"]}
+        return summary
+    finally:
+        if not finished:
+            results.abort()
+        if profile is not None:
+            profile.stop()
+        if cache is not None:
+            cache.close()
+        if isolated is not None:
+            isolated.close()
+        if store is not None:
+            store.close()
+
+
+# ----------------- Línea de comandos (sin GUI) -----------------
+# Para servidores sin pantalla y tareas programadas: no importa tkinter. El progreso sale por stdout
+# en JSON (una línea por evento) y el código de salida dice cómo fue:
+
+EXIT_OK = 0
+EXIT_ERROR = 1          # error inesperado
+EXIT_USAGE = 2          # argumentos incorrectos (argparse)
+EXIT_INPUT = 3          # faltan el listado o la carpeta, o el listado está vacío
+EXIT_NO_BACKEND = 4     # no hay ninguna librería de lectura de PDF instalada
+EXIT_INCIDENTS = 5      # terminado, pero hubo PDFs omitidos o sin actualizar (ver *_incidencias.csv)
+EXIT_CANCELLED = 130    # interrumpido (Ctrl+C / SIGTERM): se escribieron los resultados parciales
+
+
+def _emit(event: str, **data) -> None:
+    print(json.dumps({"event": event, **data}, ensure_ascii=False, default=str), flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Cuenta las palabras de un listado (Excel/CSV) en una carpeta de PDFs. "
+                    "Sin argumentos abre la interfaz gráfica.")
+    parser.add_argument("-w", "--words", type=Path, required=True, help="Archivo de palabras (Excel/CSV)")
+    parser.add_argument("-d", "--pdf_dir", type=Path, required=True, help="Carpeta con PDFs")
+    parser.add_argument("-o", "--output", type=Path, default=Path("resultado_conteos.csv"), help="Archivo de salida")
+    parser.add_argument("--recursive", action="store_true", help="Busca PDFs en subcarpetas")
+    parser.add_argument("--no-dedup", action="store_true", help="Cuenta también las copias idénticas por separado")
+    parser.add_argument("--substrings", action="store_true", help="Cuenta subcadenas (no sólo palabra/frase completa)")
+    parser.add_argument("--keep-accents", action="store_true", help="No normaliza acentos")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos en paralelo (1 = secuencial)")
+    parser.add_argument("--no-cache", action="store_true", help="No usa la caché de texto extraído")
+    parser.add_argument("--incremental", action="store_true", help="Sólo PDFs nuevos/modificados y términos nuevos")
+    parser.add_argument("--streaming", action="store_true", help="Lee página a página (PDFs muy grandes)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="wide", help="Formato de salida")
+    parser.add_argument("--backend", default=None, help="Backend de extracción preferido (pdfminer, pypdf...)")
+    parser.add_argument("--no-isolate", action="store_true", help="Extrae en el mismo proceso (sin tiempo máximo)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Segundos máximos por PDF")
+    parser.add_argument("--max-memory", type=int, default=DEFAULT_MAX_MEMORY_MB, help="MB máximos al extraer")
+    parser.add_argument("--profile", action="store_true", help="Informe de tiempos por etapa junto a la salida")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="Además, volcado de cProfile (también con la variable de entorno CC_PDF_CPROFILE=1)")
+    parser.add_argument("--quiet", action="store_true", help="Sin eventos de progreso (sólo el resumen final)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    extractor = make_extractor(args.pdf_dir, args.backend, args.streaming)
+    if extractor is None:
+        _emit("error", title="No se han detectado librerías para lectura PDF",
+              message="Instala al menos una: pip install pdfminer.six  o  pip install pypdf")
+        return EXIT_NO_BACKEND
+
+    # Ctrl+C / SIGTERM: la primera vez se para entre documentos y se escriben los resultados parciales
+    cancel = threading.Event()
+
+    def _on_signal(signum, frame):
+        if cancel.is_set():
+            raise KeyboardInterrupt
+        cancel.set()
+        _emit("cancelling", signal=signum)
+
+    for sig in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+        if sig is not None:
+            signal.signal(sig, _on_signal)
+
+    started = time.monotonic()
+
+    def progress(done: int, total: int, name: str) -> None:
+        if args.quiet:
+            return
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if done and elapsed > 0 else 0.0
+        _emit("progress", done=done, total=total, file=name, docs_per_s=round(rate, 3),
+              eta_s=round((total - done) / rate, 1) if rate else None)
+
+    if not args.quiet:
+        _emit("start", words=str(args.words), pdf_dir=str(args.pdf_dir), output=str(args.output),
+              backend=extractor.name)
+    try:
+        summary = count_batch(args.words, args.pdf_dir, args.output, extractor.name, extractor,
+                              substrings=args.substrings, keep_accents=args.keep_accents,
+                              recursive=args.recursive, dedup=not args.no_dedup,
+                              workers=max(1, args.workers),
+                              use_cache=not args.no_cache, incremental=args.incremental,
+                              streaming=args.streaming, output_format=args.format,
+                              profile_report=args.profile, cprofile=args.cprofile or cprofile_requested(),
+                              isolate=not args.no_isolate, timeout=args.timeout,
+                              max_memory_mb=args.max_memory, progress=progress, cancel=cancel)
+    except CountError as e:
+        _emit("error", title=e.title, message=str(e))
+        return EXIT_INPUT
+    except KeyboardInterrupt:
+        _emit("error", title="Interrumpido", message="Interrumpido sin escribir resultados")
+        return EXIT_CANCELLED
+    except Exception as e:
+        _emit("error", title="Error detectado", message=str(e))
+        return EXIT_ERROR
+
+    if summary["profile"] is not None:
+        summary["profile"]["slowest"] = summary["profile"]["slowest"][:5]
+    _emit("done", **summary)
+    if summary["cancelled"]:
+        return EXIT_CANCELLED
+    if summary["incidents"] is not None and (summary["incidents"]["skipped"] or summary["incidents"]["stale"]):
+        return EXIT_INCIDENTS
+    return EXIT_OK
 
-    app = App()
-    app.mainloop()
+
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        # Sin argumentos: la interfaz gráfica de siempre
+        from cc_gui import main as gui_main
+        gui_main()
+    else:
+        sys.exit(main())
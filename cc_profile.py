@@ -0,0 +1,206 @@
+# --- Instrumentación por etapas del conteo (para cc_pdf.py) ---
+# Cuando un lote va lento hay que saber si el tiempo se va en la extracción (pdfminer/pypdf), en
+# normalize_text, en el motor de búsqueda, en los patrones regex o en el stemming.
+# Por cada documento y etapa se guarda: tiempo de reloj, tiempo de CPU y caracteres/bytes procesados,
+# además del backend usado y si el texto salió de la caché. Al acabar se escribe un informe junto a la
+# salida (resultado_profile.json con resumen + top-N de documentos más lentos, resultado_profile.csv
+# con el detalle) y, opcionalmente, un volcado de cProfile (resultado_profile.prof).
+
+import cProfile
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Etapas por documento (en el orden en que ocurren)
+STAGES = ("cache", "extract", "normalize", "match", "regex", "stemming")
+
+TOP_SLOWEST = 20
+
+# Con CC_PDF_CPROFILE=1 se añade el volcado de cProfile sin tocar la llamada (GUI, CLI y cc_shard run)
+CPROFILE_ENV = "CC_PDF_CPROFILE"
+
+
+def cprofile_requested() -> bool:
+    return os.environ.get(CPROFILE_ENV, "") not in ("", "0")
+
+
+class DocProfile:
+    """Tiempos por etapa de un documento: etapa -> [reloj (s), CPU (s), tamaño procesado]."""
+
+    def __init__(self, name: str, backend: str = ""):
+        self.name = name
+        self.backend = backend
+        self.cache_hit = False
+        self.file_bytes = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, wall: float = 0.0, cpu: float = 0.0, size: int = 0) -> None:
+        rec = self.stages.setdefault(stage, [0.0, 0.0, 0])
+        rec[0] += wall
+        rec[1] += cpu
+        rec[2] += size
+
+    @contextmanager
+    def stage(self, stage: str, size: int = 0):
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall0, time.process_time() - cpu0, size)
+
+    @contextmanager
+    def document(self):
+        """Mide el documento completo (todas sus etapas y lo que queda entre ellas)."""
+
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.wall += time.perf_counter() - wall0
+            self.cpu += time.process_time() - cpu0
+
+    def slowest_stage(self) -> str:
+        return max(self.stages, key=lambda s: self.stages[s][0]) if self.stages else ""
+
+    def to_dict(self) -> dict:
+        return {
+            "documento": self.name,
+            "backend": self.backend,
+            "cache_hit": self.cache_hit,
+            "file_bytes": self.file_bytes,
+            "wall_s": round(self.wall, 6),
+            "cpu_s": round(self.cpu, 6),
+            "etapas": {s: {"wall_s": round(w, 6), "cpu_s": round(c, 6), "size": int(n)}
+                       for s, (w, c, n) in self.stages.items()},
+        }
+
+
+# Atajos para no llenar el código de "if prof is not None"
+def stage(prof: Optional[DocProfile], name: str, size: int = 0):
+    return prof.stage(name, size) if prof is not None else nullcontext()
+
+
+def add_size(prof: Optional[DocProfile], name: str, size: int) -> None:
+    if prof is not None:
+        prof.add(name, size=size)
+
+
+def report_paths(out_path: Path) -> Dict[str, Path]:
+    """resultado.csv -> resultado_profile.json / .csv / .prof"""
+
+    base = out_path.with_name(out_path.stem + "_profile")
+    return {"json": base.with_suffix(".json"), "csv": base.with_suffix(".csv"), "prof": base.with_suffix(".prof")}
+
+
+class RunProfile:
+    """Recoge los DocProfile de una ejecución (también los que llegan de otros procesos) y escribe el informe.
+
+    Con cprofile=True además se perfila el proceso principal con cProfile (en paralelo, cada proceso del
+    pool vuelca el suyo en <informe>.prof.<pid>, ver worker_cprofile_path).
+    """
+
+    def __init__(self, backend: str = "", cprofile: bool = False, top_n: int = TOP_SLOWEST):
+        self.backend = backend
+        self.top_n = top_n
+        self.docs: List[DocProfile] = []
+        self.run = DocProfile("__ejecucion__", backend)  # etapas globales (leer listado, escribir salida...)
+        self.cprofile = cprofile
+        self._profiler: Optional[cProfile.Profile] = None
+        self._cprofile_base: Optional[Path] = None
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+
+    def start_cprofile(self, out_path: Path) -> None:
+        if self.cprofile and self._profiler is None:
+            self._cprofile_base = report_paths(out_path)["prof"]
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def worker_cprofile_path(self) -> Optional[str]:
+        return str(self._cprofile_base) if self._cprofile_base is not None else None
+
+    def add(self, doc: Optional[DocProfile]) -> None:
+        if doc is not None:
+            self.docs.append(doc)
+
+    def stage_totals(self) -> Dict[str, dict]:
+        totals: Dict[str, List[float]] = {}
+        for doc in self.docs:
+            for s, (w, c, n) in doc.stages.items():
+                rec = totals.setdefault(s, [0.0, 0.0, 0])
+                rec[0] += w; rec[1] += c; rec[2] += n
+        order = [s for s in STAGES if s in totals] + [s for s in totals if s not in STAGES]
+        return {s: {"wall_s": round(totals[s][0], 6), "cpu_s": round(totals[s][1], 6), "size": int(totals[s][2])}
+                for s in order}
+
+    def summary(self) -> dict:
+        wall = time.perf_counter() - self._wall0
+        slowest = sorted(self.docs, key=lambda d: d.wall, reverse=True)[:self.top_n]
+        return {
+            "backend": self.backend,
+            "documentos": len(self.docs),
+            "wall_s": round(wall, 6),
+            "cpu_s_proceso_principal": round(time.process_time() - self._cpu0, 6),
+            "docs_por_s": round(len(self.docs) / wall, 3) if wall else 0.0,
+            "cache_hits": sum(1 for d in self.docs if d.cache_hit),
+            "etapas_ejecucion": self.run.to_dict()["etapas"],
+            "etapas_documentos": self.stage_totals(),
+            "mas_lentos": [{"documento": d.name, "wall_s": round(d.wall, 6), "cpu_s": round(d.cpu, 6),
+                            "backend": d.backend, "etapa_mas_lenta": d.slowest_stage()} for d in slowest],
+        }
+
+    def write(self, out_path: Path) -> Dict[str, Path]:
+        """Escribe el informe JSON (resumen + detalle) y el CSV (documento x etapa). Devuelve las rutas."""
+
+        paths = report_paths(out_path)
+        paths["json"].parent.mkdir(parents=True, exist_ok=True)
+        report = self.summary()
+        report["detalle"] = [d.to_dict() for d in self.docs]
+        paths["json"].write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+        with paths["csv"].open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["documento", "backend", "cache_hit", "etapa", "wall_s", "cpu_s", "size"])
+            for d in self.docs:
+                for s, (w, c, n) in d.stages.items():
+                    writer.writerow([d.name, d.backend, int(d.cache_hit), s, f"{w:.6f}", f"{c:.6f}", int(n)])
+                writer.writerow([d.name, d.backend, int(d.cache_hit), "total", f"{d.wall:.6f}", f"{d.cpu:.6f}",
+                                 d.file_bytes])
+
+        written = {"json": paths["json"], "csv": paths["csv"]}
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(str(paths["prof"]))
+            self._profiler = None
+            written["prof"] = paths["prof"]
+        return written
+
+    def stop(self) -> None:
+        """Detiene cProfile sin escribir nada (si la ejecución falla)."""
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+
+
+class WorkerProfiler:
+    """cProfile de un proceso del pool: acumula y vuelca tras cada documento (el pool no avisa al cerrar)."""
+
+    def __init__(self, base_path: str):
+        self.path = f"{base_path}.{os.getpid()}"
+        self._profiler = cProfile.Profile()
+
+    @contextmanager
+    def profiled(self):
+        self._profiler.enable()
+        try:
+            yield
+        finally:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.path)
@@ -0,0 +1,208 @@
+# --- Resultados de conteo: matriz compacta y escritores de salida (para cc_pdf.py) ---
+# En vez de un dict de dicts con claves de texto por cada PDF, los conteos se guardan en una matriz de
+# enteros (términos x documentos): una columna array('I') por documento, con los nombres de términos y
+# documentos en listas aparte (índices). Desde ahí se exporta en varios formatos:
+#   - "wide":    el CSV de siempre (una fila por palabra, una columna por PDF) -> inmanejable con 20k PDFs
+#   - "long":    CSV disperso (documento, palabra, conteo) que se va escribiendo según acaba cada PDF
+#   - "parquet" / "feather": el mismo formato largo en columnas (necesita pyarrow)
+
+import array
+import csv
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+TOTAL_KEY = "__TOTAL_PALABRAS__"
+
+OUTPUT_FORMATS = ("wide", "long", "parquet", "feather")
+
+
+class CountMatrix:
+    """Conteos (términos normalizados x documentos) en columnas compactas de enteros sin signo.
+
+    Cada documento es una columna densa array('I') con todos los términos, así que la memoria crece como
+    términos x documentos x 4 bytes (50 000 términos x 20 000 PDFs son unos 4 GB). Para corpus muy
+    grandes conviene --format long: cada documento se escribe según llega y de su columna sólo queda el
+    nombre y el total (ver release).
+    """
+
+    def __init__(self, terms: List[str]):
+        self.terms = list(terms)
+        self.term_index = {t: i for i, t in enumerate(self.terms)}
+        self.doc_names: List[str] = []
+        self.doc_index: Dict[str, int] = {}
+        self.columns: List[array.array] = []
+        self.totals = array.array("Q")
+
+    def add(self, doc_name: str, counts: Dict[str, int]) -> int:
+        """Añade (o reemplaza) la columna de un documento a partir de {término: conteo}. Devuelve su índice."""
+
+        column = array.array("I", (counts.get(t, 0) for t in self.terms))
+        total = counts.get(TOTAL_KEY, 0)
+        col = self.doc_index.get(doc_name)
+        if col is None:
+            col = len(self.doc_names)
+            self.doc_index[doc_name] = col
+            self.doc_names.append(doc_name)
+            self.columns.append(column)
+            self.totals.append(total)
+        else:
+            self.columns[col] = column
+            self.totals[col] = total
+        return col
+
+    def release(self, doc_name: str) -> None:
+        """Libera la columna de un documento ya escrito (se conservan su nombre y su total)."""
+
+        self.columns[self.doc_index[doc_name]] = array.array("I")
+
+    def get(self, term: str, doc_name: str) -> int:
+        return self.columns[self.doc_index[doc_name]][self.term_index[term]]
+
+    def total(self, doc_name: str) -> int:
+        return self.totals[self.doc_index[doc_name]]
+
+    def nonzero(self, doc_name: str) -> Iterator[Tuple[str, int]]:
+        """(término, conteo) distintos de cero de un documento."""
+
+        terms = self.terms
+        for i, value in enumerate(self.columns[self.doc_index[doc_name]]):
+            if value:
+                yield terms[i], value
+
+
+# ----------------- Escritores -----------------
+
+def write_wide_csv(out_csv: Path, original_words: List[str], original_to_norm: Dict[str, str],
+                   matrix: CountMatrix, doc_names: List[str]) -> None:
+    """CSV ancho: una fila por palabra del listado, una columna por PDF y la fila final de totales."""
+
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    cols = [matrix.columns[matrix.doc_index[d]] for d in doc_names]
+
+    #Escribo el resultado en el archivo
+    with out_csv.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["palabra"] + doc_names)
+
+        for w in original_words:
+            i = matrix.term_index.get(original_to_norm[w])
+            row = [w] + ([c[i] for c in cols] if i is not None else [0] * len(cols))
+            writer.writerow(row)
+
+        writer.writerow([TOTAL_KEY] + [matrix.total(d) for d in doc_names])
+
+
+def _long_rows(original_words: List[str], original_to_norm: Dict[str, str],
+               matrix: CountMatrix, doc_name: str) -> Iterator[Tuple[str, str, int]]:
+    column = matrix.columns[matrix.doc_index[doc_name]]
+    for w in original_words:
+        i = matrix.term_index.get(original_to_norm[w])
+        if i is not None and column[i]:
+            yield doc_name, w, column[i]
+    yield doc_name, TOTAL_KEY, matrix.total(doc_name)
+
+
+class LongCsvWriter:
+    """CSV largo y disperso (documento, palabra, conteo): escribe cada PDF en cuanto termina.
+
+    Sólo se escriben los conteos distintos de cero más la fila de total de cada documento. Las filas
+    van en orden de llegada (en paralelo, el de finalización).
+    """
+
+    def __init__(self, out_csv: Path, original_words: List[str], original_to_norm: Dict[str, str]):
+        self.out_csv = out_csv
+        self.original_words = original_words
+        self.original_to_norm = original_to_norm
+        out_csv.parent.mkdir(parents=True, exist_ok=True)
+        self._f = out_csv.open("w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._f)
+        self._writer.writerow(["documento", "palabra", "conteo"])
+
+    def write_document(self, matrix: CountMatrix, doc_name: str) -> None:
+        self._writer.writerows(_long_rows(self.original_words, self.original_to_norm, matrix, doc_name))
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def write_columnar(out_path: Path, original_words: List[str], original_to_norm: Dict[str, str],
+                   matrix: CountMatrix, doc_names: List[str], fmt: str = "parquet") -> None:
+    """Formato largo (documento, palabra, conteo) en Parquet o Feather (columnar, con pyarrow)."""
+
+    try:
+        import pyarrow as pa
+    except Exception:
+        raise RuntimeError("Para Parquet/Feather hace falta 'pyarrow'. Instala con:\n  pip install pyarrow")
+
+    docs, words, counts = [], [], []
+    for d in doc_names:
+        for doc_name, w, value in _long_rows(original_words, original_to_norm, matrix, d):
+            docs.append(doc_name); words.append(w); counts.append(value)
+
+    table = pa.table({
+        "documento": pa.array(docs, type=pa.string()).dictionary_encode(),
+        "palabra": pa.array(words, type=pa.string()).dictionary_encode(),
+        "conteo": pa.array(counts, type=pa.uint64()),
+    })
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, str(out_path))
+    elif fmt == "feather":
+        import pyarrow.feather as feather
+        feather.write_feather(table, str(out_path))
+    else:
+        raise ValueError(f"Formato columnar no soportado: {fmt}")
+
+
+def output_path_for(out_path: Path, fmt: str) -> Path:
+    """Ruta de salida para el formato elegido: se respeta la que da el usuario (p.ej. out.tsv sigue siendo
+    out.tsv). Sólo se pone la extensión si no tiene, o si es .csv con un formato que no es CSV."""
+
+    suffix = {"parquet": ".parquet", "feather": ".feather"}.get(fmt, ".csv")
+    if not out_path.suffix or (out_path.suffix.lower() == ".csv" and suffix != ".csv"):
+        return out_path.with_suffix(suffix)
+    return out_path
+
+
+class ResultWriter:
+    """Recoge los conteos en la matriz y los exporta en el formato elegido.
+
+    El CSV largo se escribe según llegan los documentos; el resto, al cerrar (finish).
+    """
+
+    def __init__(self, out_path: Path, fmt: str, original_words: List[str],
+                 original_to_norm: Dict[str, str], terms: List[str]):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Formato de salida no soportado: {fmt} (usa {', '.join(OUTPUT_FORMATS)})")
+        self.fmt = fmt
+        self.out_path = output_path_for(out_path, fmt)
+        self.original_words = original_words
+        self.original_to_norm = original_to_norm
+        self.matrix = CountMatrix(terms)
+        self._long: Optional[LongCsvWriter] = None
+        if fmt == "long":
+            self._long = LongCsvWriter(self.out_path, original_words, original_to_norm)
+
+    def add(self, doc_name: str, counts: Dict[str, int]) -> None:
+        self.matrix.add(doc_name, counts)
+        if self._long is not None:
+            self._long.write_document(self.matrix, doc_name)
+            self.matrix.release(doc_name)  # ya está en disco
+
+    def finish(self, doc_order: Optional[List[str]] = None) -> Path:
+        """Cierra/escribe la salida; doc_order fija el orden de columnas/filas (si no, el de llegada)."""
+
+        doc_names = [d for d in (doc_order or self.matrix.doc_names) if d in self.matrix.doc_index]
+        if self._long is not None:
+            self._long.close()
+        elif self.fmt == "wide":
+            write_wide_csv(self.out_path, self.original_words, self.original_to_norm, self.matrix, doc_names)
+        else:
+            write_columnar(self.out_path, self.original_words, self.original_to_norm, self.matrix,
+                           doc_names, self.fmt)
+        return self.out_path
+
+    def abort(self) -> None:
+        if self._long is not None:
+            self._long.close()
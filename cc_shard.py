@@ -0,0 +1,376 @@
+# --- Ejecución por fragmentos (shards) y unión de resultados parciales (para cc_pdf.py) ---
+# Un archivo de 200k PDFs no cabe en una máquina. La lista de PDFs se reparte de forma determinista en
+# N fragmentos (por hash de la ruta relativa: el mismo PDF cae siempre en el mismo fragmento, se lance
+# donde se lance) y cada fragmento se procesa por separado, en cualquier máquina:
+#   python cc_shard.py run -w palabras.xlsx -d /datos/pdfs --recursive --shard 3/16 --out-dir parciales
+# Cada uno escribe un parcial compacto (JSON comprimido: conteos distintos de cero por documento, total de
+# palabras y metadatos: listado, opciones, backend, máquina...). Al final se juntan:
+#   python cc_shard.py merge parciales -o resultado.csv
+# merge comprueba que todos los parciales son del mismo listado y opciones, que están todos los
+# fragmentos (si no, dice cuáles relanzar) y, si un fragmento se relanzó, elige el parcial completo antes
+# que el que quedó a medias, entre completos el de mayor número de intento (run --attempt, o el del parcial
+# anterior en la misma ruta + 1) y sólo al final el más reciente (la hora de cada máquina puede ir
+# desfasada). Dos parciales completos del mismo fragmento e intento con resultados distintos son un error
+# (hay que borrar el que sobra o relanzar con --attempt).
+# Para probar en local, "local" lanza los fragmentos como procesos aparte (uno por "máquina") y los junta.
+
+import argparse
+import gzip
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cc_isolate import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT
+from cc_pdf import (EXIT_ERROR, EXIT_INPUT, EXIT_OK, OUTPUT_FORMATS, TOTAL_KEY, CountError, CountingEngine,
+                    count_batch, doc_key, make_extractor, normalize_text, _emit)
+from cc_profile import cprofile_requested
+from cc_results import CountMatrix, ResultWriter
+
+PARTIAL_FORMAT = "cc_pdf-partial"
+PARTIAL_VERSION = 1
+PARTIAL_SUFFIX = ".ccpart.gz"
+
+
+class MergeError(Exception):
+    """Los parciales no se pueden juntar (listado/opciones distintos o faltan fragmentos)."""
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Fragmento de un documento (por su ruta relativa): igual en cualquier máquina y ejecución."""
+
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def select_shard(pdf_paths: List[Path], pdf_dir: Path, index: int, shards: int) -> List[Path]:
+    if not 0 <= index < shards:
+        raise ValueError(f"Fragmento fuera de rango: {index}/{shards}")
+    return [p for p in pdf_paths if shard_of(doc_key(p, pdf_dir), shards) == index]
+
+
+def partial_path(out_dir: Path, index: int, shards: int) -> Path:
+    return out_dir / f"part-{index:04d}-of-{shards:04d}{PARTIAL_SUFFIX}"
+
+
+def words_digest(original_words: List[str]) -> str:
+    return hashlib.sha256("\n".join(original_words).encode("utf-8")).hexdigest()
+
+
+def engine_options(engine: CountingEngine) -> dict:
+    """Opciones que cambian los conteos (deben coincidir en todos los parciales)."""
+
+    stem_lang = getattr(engine.stemmer, "language", "custom") if engine.stemmer else "none"
+    return {"whole_word": engine.whole_word, "remove_accents": engine.remove_accents, "stem": stem_lang}
+
+
+def next_attempt(path: Path) -> int:
+    """Número de intento para un parcial: el del que ya hay en esa ruta + 1 (0 si no hay o no se lee)."""
+
+    if not path.exists():
+        return 0
+    try:
+        return read_partial(path).get("attempt", 0) + 1
+    except (OSError, EOFError, ValueError, MergeError):
+        return 0
+
+
+def write_partial(path: Path, engine: CountingEngine, matrix: CountMatrix, doc_order: List[str],
+                  shard: tuple, backend_name: str, pdf_dir: Path, complete: bool = True,
+                  skipped: Optional[List[str]] = None, attempt: Optional[int] = None) -> Path:
+    """Escribe el parcial de un fragmento: por documento, [índice de término, conteo] distintos de cero."""
+
+    if attempt is None:
+        attempt = next_attempt(path)
+    documents = {}
+    for name in doc_order:
+        col = matrix.doc_index.get(name)
+        if col is None:
+            continue
+        documents[name] = {"total": matrix.totals[col],
+                           "counts": [[i, c] for i, c in enumerate(matrix.columns[col]) if c]}
+    data = {
+        "format": PARTIAL_FORMAT, "version": PARTIAL_VERSION,
+        "shard": shard[0], "shards": shard[1], "complete": complete, "attempt": attempt,
+        "created": time.time(), "host": platform.node(),
+        "pdf_dir": str(pdf_dir), "backend": backend_name,
+        "options": engine_options(engine),
+        "words_sha256": words_digest(engine.original_words), "words": engine.original_words,
+        "terms": matrix.terms,
+        "skipped": skipped or [],
+        "documents": documents,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    tmp.replace(path)  # un parcial a medio escribir no se confunde con uno terminado
+    return path
+
+
+def read_partial(path: Path) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("format") != PARTIAL_FORMAT or data.get("version") != PARTIAL_VERSION:
+        raise MergeError(f"{path.name}: no es un parcial de cc_pdf (versión {PARTIAL_VERSION})")
+    return data
+
+
+def find_partials(inputs: List[Path]) -> List[Path]:
+    paths: List[Path] = []
+    for p in inputs:
+        paths.extend(sorted(p.glob("*" + PARTIAL_SUFFIX)) if p.is_dir() else [p])
+    return paths
+
+
+def _result_of(data: dict) -> tuple:
+    return data["words_sha256"], data["options"], data["documents"], data["skipped"]
+
+
+def shard_status(partial_paths: List[Path]) -> dict:
+    """Qué fragmentos están completos, cuáles faltan o quedaron a medias (para relanzarlos).
+
+    Si un fragmento aparece varias veces (se relanzó) cuenta el completo antes que el que quedó a medias,
+    luego el de mayor número de intento y luego el más reciente. Si los dos mejores son completos, del
+    mismo intento y con distinto resultado se lanza MergeError.
+    """
+
+    candidates: Dict[int, List[dict]] = {}
+    shards = None
+    for path in partial_paths:
+        data = read_partial(path)
+        if shards is None:
+            shards = data["shards"]
+        elif data["shards"] != shards:
+            raise MergeError(f"{path.name}: es de {data['shards']} fragmentos, el resto de {shards}")
+        data["_path"] = path
+        data.setdefault("attempt", 0)
+        candidates.setdefault(data["shard"], []).append(data)
+
+    latest: Dict[int, dict] = {}
+    for shard, found in candidates.items():
+        found.sort(key=lambda d: (d["complete"], d["attempt"], d["created"]), reverse=True)
+        best = latest[shard] = found[0]
+        for other in found[1:]:
+            if not other["complete"] or other["attempt"] != best["attempt"]:
+                break
+            if _result_of(other) != _result_of(best):
+                raise MergeError(f"{best['_path']} y {other['_path']}: el fragmento {shard} está completo dos "
+                                 f"veces con el mismo intento ({best['attempt']}) y resultados distintos; borra "
+                                 f"el que sobra o relánzalo con --attempt")
+    shards = shards or 0
+    return {
+        "shards": shards,
+        "latest": latest,
+        "complete": sorted(i for i, d in latest.items() if d["complete"]),
+        "incomplete": sorted(i for i, d in latest.items() if not d["complete"]),
+        "missing": sorted(set(range(shards)) - set(latest)),
+    }
+
+
+def merge_partials(partial_paths: List[Path], out_path: Path, output_format: str = "wide",
+                   allow_missing: bool = False) -> dict:
+    """Junta los parciales en la salida final (mismo formato que cc_pdf). Devuelve un resumen."""
+
+    if not partial_paths:
+        raise MergeError("No hay parciales que juntar")
+    status = shard_status(partial_paths)
+    pending = status["missing"] + status["incomplete"]
+    if pending and not allow_missing:
+        raise MergeError(f"Faltan o están a medias los fragmentos {', '.join(map(str, sorted(pending)))} "
+                         f"de {status['shards']}: relánzalos con 'run --shard I/{status['shards']}'")
+
+    parts = [status["latest"][i] for i in status["complete"]]
+    if not parts:
+        raise MergeError("Ningún fragmento está completo")
+    first = parts[0]
+    for data in parts[1:]:
+        if data["words_sha256"] != first["words_sha256"]:
+            raise MergeError(f"{data['_path'].name}: se hizo con otro listado de palabras")
+        if data["options"] != first["options"]:
+            raise MergeError(f"{data['_path'].name}: opciones distintas ({data['options']} != {first['options']})")
+
+    words = first["words"]
+    remove_accents = first["options"]["remove_accents"]
+    original_to_norm = {w: normalize_text(w, remove_accents) for w in words}
+    terms = first["terms"]
+    results = ResultWriter(out_path, output_format, words, original_to_norm, terms)
+    doc_names: List[str] = []
+    collisions = 0
+    try:
+        for data in parts:
+            for name, doc in data["documents"].items():
+                counts = {terms[i]: c for i, c in doc["counts"]}
+                counts[TOTAL_KEY] = doc["total"]
+                if name in results.matrix.doc_index:
+                    collisions += 1
+                else:
+                    doc_names.append(name)
+                results.add(name, counts)
+        out = results.finish(sorted(doc_names))
+    except Exception:
+        results.abort()
+        raise
+
+    return {"out_path": out, "shards": status["shards"], "merged": [d["shard"] for d in parts],
+            "missing": pending, "documents": len(doc_names), "collisions": collisions,
+            "backends": sorted({d["backend"] for d in parts}), "hosts": sorted({d["host"] for d in parts}),
+            "skipped": sum(len(d["skipped"]) for d in parts)}
+
+
+# ----------------- Línea de comandos -----------------
+
+def _parse_shard(value: str) -> tuple:
+    try:
+        index, shards = (int(x) for x in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("usa I/N, p.ej. 3/16")
+    if shards < 1 or not 0 <= index < shards:
+        raise argparse.ArgumentTypeError(f"fragmento fuera de rango: {value}")
+    return index, shards
+
+
+def _add_count_options(p: argparse.ArgumentParser) -> None:
+    p.add_argument("-w", "--words", type=Path, required=True, help="Archivo de palabras (Excel/CSV)")
+    p.add_argument("-d", "--pdf_dir", type=Path, required=True, help="Carpeta con PDFs")
+    p.add_argument("--out-dir", type=Path, default=Path("parciales"), help="Carpeta de los parciales")
+    p.add_argument("--recursive", action="store_true", help="Busca PDFs en subcarpetas")
+    p.add_argument("--substrings", action="store_true", help="Cuenta subcadenas (no sólo palabra/frase completa)")
+    p.add_argument("--keep-accents", action="store_true", help="No normaliza acentos")
+    p.add_argument("--workers", type=int, default=1, help="Procesos en paralelo dentro del fragmento")
+    p.add_argument("--no-cache", action="store_true", help="No usa la caché de texto extraído")
+    p.add_argument("--backend", default=None, help="Backend de extracción preferido")
+    p.add_argument("--no-isolate", action="store_true", help="Extrae en el mismo proceso (sin tiempo máximo)")
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Segundos máximos por PDF")
+    p.add_argument("--max-memory", type=int, default=DEFAULT_MAX_MEMORY_MB, help="MB máximos al extraer")
+
+
+def _count_argv(args) -> List[str]:
+    """Las mismas opciones de conteo, para lanzar "run" en otro proceso."""
+
+    argv = ["-w", str(args.words), "-d", str(args.pdf_dir), "--out-dir", str(args.out_dir),
+            "--workers", str(args.workers), "--timeout", str(args.timeout), "--max-memory", str(args.max_memory)]
+    for flag in ("recursive", "substrings", "keep_accents", "no_cache", "no_isolate"):
+        if getattr(args, flag):
+            argv.append("--" + flag.replace("_", "-"))
+    if args.backend:
+        argv += ["--backend", args.backend]
+    return argv
+
+
+def run_shard(args) -> int:
+    index, shards = args.shard
+    extractor = make_extractor(args.pdf_dir, args.backend)
+    if extractor is None:
+        _emit("error", title="No se han detectado librerías para lectura PDF",
+              message="Instala al menos una: pip install pdfminer.six  o  pip install pypdf")
+        return EXIT_ERROR
+    try:
+        summary = count_batch(args.words, args.pdf_dir, partial_path(args.out_dir, index, shards),
+                              extractor.name, extractor, substrings=args.substrings,
+                              keep_accents=args.keep_accents, recursive=args.recursive,
+                              workers=max(1, args.workers), use_cache=not args.no_cache,
+                              isolate=not args.no_isolate, timeout=args.timeout,
+                              max_memory_mb=args.max_memory, shard=(index, shards), attempt=args.attempt,
+                              cprofile=cprofile_requested())
+    except CountError as e:
+        _emit("error", title=e.title, message=str(e))
+        return EXIT_INPUT
+    _emit("done", **summary)
+    return EXIT_OK
+
+
+def run_local(args) -> int:
+    """Lanza los N fragmentos como procesos aparte (de a --processes), reintenta los fallidos y junta."""
+
+    base = [sys.executable, str(Path(__file__).resolve()), "run"] + _count_argv(args)
+    todo = list(range(args.shards))
+    for attempt in range(args.retries + 1):
+        running: List[tuple] = []
+        failed: List[int] = []
+        for index in todo:
+            while len(running) >= max(1, args.processes):
+                i, proc = running.pop(0)
+                if proc.wait() != EXIT_OK:
+                    failed.append(i)
+            cmd = base + ["--shard", f"{index}/{args.shards}", "--attempt", str(attempt)]
+            running.append((index, subprocess.Popen(cmd, stdout=subprocess.DEVNULL)))
+            _emit("shard_started", shard=index, shards=args.shards, attempt=attempt)
+        for i, proc in running:
+            if proc.wait() != EXIT_OK:
+                failed.append(i)
+        try:
+            done = set(shard_status(find_partials([args.out_dir]))["complete"])
+        except MergeError as e:  # parciales de otra ejecución en la misma carpeta
+            _emit("error", title="Parciales incompatibles", message=str(e))
+            return EXIT_INPUT
+        todo = sorted(set(failed) | (set(range(args.shards)) - done))
+        if not todo:
+            break
+        _emit("shard_failed", shards=todo, attempt=attempt)
+
+    try:
+        summary = merge_partials(find_partials([args.out_dir]), args.output, args.format)
+    except MergeError as e:
+        _emit("error", title="No se pudo juntar", message=str(e))
+        return EXIT_ERROR
+    _emit("done", **summary)
+    return EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Conteo por fragmentos (varias máquinas) y unión de parciales.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="Procesa un fragmento y escribe su parcial")
+    _add_count_options(p_run)
+    p_run.add_argument("--shard", type=_parse_shard, required=True, help="Fragmento I/N (I desde 0)")
+    p_run.add_argument("--attempt", type=int, default=None,
+                       help="Número de intento (por defecto el del parcial que ya haya en --out-dir + 1)")
+
+    p_merge = sub.add_parser("merge", help="Junta los parciales en la salida final")
+    p_merge.add_argument("partials", type=Path, nargs="+", help="Parciales o carpetas con parciales")
+    p_merge.add_argument("-o", "--output", type=Path, default=Path("resultado_conteos.csv"), help="Archivo de salida")
+    p_merge.add_argument("--format", choices=OUTPUT_FORMATS, default="wide", help="Formato de salida")
+    p_merge.add_argument("--allow-missing", action="store_true", help="Junta aunque falten fragmentos")
+
+    p_status = sub.add_parser("status", help="Fragmentos completos, a medias y sin hacer")
+    p_status.add_argument("partials", type=Path, nargs="+", help="Parciales o carpetas con parciales")
+
+    p_local = sub.add_parser("local", help="Prueba en local: cada fragmento en un proceso aparte y merge")
+    _add_count_options(p_local)
+    p_local.add_argument("--shards", type=int, required=True, help="Número de fragmentos")
+    p_local.add_argument("--processes", type=int, default=2, help="Fragmentos a la vez")
+    p_local.add_argument("--retries", type=int, default=1, help="Reintentos de los fragmentos fallidos")
+    p_local.add_argument("-o", "--output", type=Path, default=Path("resultado_conteos.csv"), help="Archivo de salida")
+    p_local.add_argument("--format", choices=OUTPUT_FORMATS, default="wide", help="Formato de salida")
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "run":
+        return run_shard(args)
+    if args.cmd == "local":
+        if args.shards < 1:
+            parser.error("--shards debe ser >= 1")
+        return run_local(args)
+    try:
+        partials = find_partials(args.partials)
+        if args.cmd == "status":
+            status = shard_status(partials)
+            _emit("status", shards=status["shards"], complete=status["complete"],
+                  incomplete=status["incomplete"], missing=status["missing"])
+            return EXIT_OK if not (status["missing"] or status["incomplete"]) else EXIT_INPUT
+        summary = merge_partials(partials, args.output, args.format, args.allow_missing)
+    except MergeError as e:
+        _emit("error", title="No se pudo juntar", message=str(e))
+        return EXIT_INPUT
+    _emit("done", **summary)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
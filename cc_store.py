@@ -0,0 +1,126 @@
+# --- Almacén incremental de resultados (para cc_pdf.py) ---
+# Guarda en un SQLite los conteos ya calculados por (huella del documento, opciones, término normalizado).
+# Así, al volver a ejecutar sobre la misma carpeta:
+#   - sólo se extraen y cuentan los PDFs nuevos o modificados (su huella cambia),
+#   - los términos nuevos del listado se cuentan sólo donde faltan,
+#   - los PDFs borrados se eliminan del almacén,
+#   - y el CSV se regenera desde aquí en segundos.
+# Sólo se guardan los conteos distintos de cero; para saber qué términos ya se contaron en un documento
+# se guardan los "lotes" de términos (termsets) una única vez y cada documento apunta a sus lotes.
+
+import hashlib
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def default_store_path(out_csv: Path) -> Path:
+    """El almacén vive junto al CSV de salida: resultado.csv -> resultado_store.sqlite"""
+
+    return out_csv.with_name(out_csv.stem + "_store.sqlite")
+
+
+class ResultStore:
+    """Conteos persistentes por documento para ejecuciones incrementales."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "  path TEXT PRIMARY KEY, fingerprint TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS termsets ("
+            "  id INTEGER PRIMARY KEY, digest TEXT UNIQUE NOT NULL, terms BLOB NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS results ("
+            "  fingerprint TEXT NOT NULL, options TEXT NOT NULL, total INTEGER NOT NULL,"
+            "  termsets TEXT NOT NULL, PRIMARY KEY (fingerprint, options));"
+            "CREATE TABLE IF NOT EXISTS counts ("
+            "  fingerprint TEXT NOT NULL, options TEXT NOT NULL, term TEXT NOT NULL, count INTEGER NOT NULL,"
+            "  PRIMARY KEY (fingerprint, options, term));"
+        )
+        self._conn.commit()
+        self._termset_cache: Dict[int, Set[str]] = {}
+
+    # ---- lotes de términos ----
+
+    def _termset_id(self, terms: List[str]) -> int:
+        blob = "\n".join(sorted(terms)).encode("utf-8")
+        digest = hashlib.sha1(blob).hexdigest()
+        row = self._conn.execute("SELECT id FROM termsets WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            return row[0]
+        cur = self._conn.execute("INSERT INTO termsets (digest, terms) VALUES (?, ?)",
+                                 (digest, zlib.compress(blob)))
+        return cur.lastrowid
+
+    def _termset(self, set_id: int) -> Set[str]:
+        terms = self._termset_cache.get(set_id)
+        if terms is None:
+            row = self._conn.execute("SELECT terms FROM termsets WHERE id = ?", (set_id,)).fetchone()
+            text = zlib.decompress(row[0]).decode("utf-8") if row else ""
+            terms = set(text.split("\n")) if text else set()
+            self._termset_cache[set_id] = terms
+        return terms
+
+    # ---- documentos ----
+
+    def sync_documents(self, current: Dict[str, str]) -> int:
+        """Actualiza ruta -> huella y borra los documentos que ya no existen. Devuelve cuántos se podaron."""
+
+        self._conn.executemany("INSERT OR REPLACE INTO documents (path, fingerprint) VALUES (?, ?)",
+                               list(current.items()))
+        gone = [p for (p,) in self._conn.execute("SELECT path FROM documents")
+                if p not in current and not Path(p).exists()]
+        self._conn.executemany("DELETE FROM documents WHERE path = ?", [(p,) for p in gone])
+        # Resultados de huellas que ya no usa ningún documento (borrados o modificados)
+        self._conn.execute("DELETE FROM results WHERE fingerprint NOT IN (SELECT fingerprint FROM documents)")
+        self._conn.execute("DELETE FROM counts WHERE fingerprint NOT IN (SELECT fingerprint FROM documents)")
+        self._conn.commit()
+        return len(gone)
+
+    # ---- conteos ----
+
+    def known_terms(self, fingerprint: str, options: str) -> Optional[Set[str]]:
+        """Términos ya contados para ese documento y opciones (None si nunca se procesó)."""
+
+        row = self._conn.execute("SELECT termsets FROM results WHERE fingerprint = ? AND options = ?",
+                                 (fingerprint, options)).fetchone()
+        if row is None:
+            return None
+        known: Set[str] = set()
+        for set_id in row[0].split(","):
+            if set_id:
+                known |= self._termset(int(set_id))
+        return known
+
+    def save(self, fingerprint: str, options: str, terms: Iterable[str],
+             counts: Dict[str, int], total: int) -> None:
+        terms = list(terms)
+        set_id = str(self._termset_id(terms))
+        row = self._conn.execute("SELECT termsets FROM results WHERE fingerprint = ? AND options = ?",
+                                 (fingerprint, options)).fetchone()
+        set_ids = row[0].split(",") if row else []
+        if set_id not in set_ids:
+            set_ids.append(set_id)
+        self._conn.execute("INSERT OR REPLACE INTO results (fingerprint, options, total, termsets) VALUES (?, ?, ?, ?)",
+                           (fingerprint, options, total, ",".join(set_ids)))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO counts (fingerprint, options, term, count) VALUES (?, ?, ?, ?)",
+            [(fingerprint, options, t, counts[t]) for t in terms if counts.get(t)]
+        )
+        self._conn.commit()
+
+    def load(self, fingerprint: str, options: str):
+        """Devuelve (conteos distintos de cero, total de palabras) de un documento."""
+
+        row = self._conn.execute("SELECT total FROM results WHERE fingerprint = ? AND options = ?",
+                                 (fingerprint, options)).fetchone()
+        counts = dict(self._conn.execute("SELECT term, count FROM counts WHERE fingerprint = ? AND options = ?",
+                                         (fingerprint, options)))
+        return counts, (row[0] if row else 0)
+
+    def close(self) -> None:
+        self._conn.close()
@@ -3,24 +3,84 @@
 # ============================================
 
 import os
+import csv
 import glob
-import itertools
+import threading
 import tkinter as tk
+from pathlib import Path
 from tkinter import filedialog, messagebox
 
-import PyPDF2
-import nltk
-import spacy
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer
+# Las librerías pesadas (spaCy, NLTK, pandas, scikit-learn) se importan cuando hacen falta, no al
+# arrancar: así la ventana sale al momento y no se toca la red (antes se llamaba a nltk.download en
+# cada arranque y fallaba en equipos sin conexión).
 
-# Descargar stopwords de NLTK la primera vez
-nltk.download('stopwords')
-from nltk.corpus import stopwords
+SPACY_MODEL = "en_core_web_sm"
 
-# Cargar modelo de spaCy
-nlp = spacy.load("en_core_web_sm")
-stop_words = set(stopwords.words('english'))
+# Sólo se usan lemas e is_alpha: el parser y el NER no hacen falta (el lematizador necesita tagger y
+# attribute_ruler, que sí se cargan)
+SPACY_EXCLUDE = ["parser", "ner"]
+
+PIPE_BATCH_SIZE = 16        # textos por lote en nlp.pipe
+MAX_CHUNK_CHARS = 100_000   # los textos más largos se trocean (spaCy limita nlp.max_length a 1M)
+MAX_NLP_PROCESSES = 4       # procesos de nlp.pipe como mucho (cada uno carga su copia del modelo)
+
+# Filtros de vocabulario del TF-IDF (los mismos que usaba TfidfVectorizer)
+TFIDF_MAX_DF = 0.85
+TFIDF_MIN_DF = 2
+
+# Coocurrencias: palabras más frecuentes que entran en la matriz y ventana (0 = todo el documento)
+COOC_TOP_N = 50
+COOC_WINDOW = 0
+COOC_DENSE_MAX = 2000       # por encima, sólo se escribe la lista de aristas (la matriz densa no cabe)
+COOC_FLUSH_PAIRS = 5_000_000
+
+# Copia local de las stopwords inglesas de NLTK (se usa si no están instalados los datos de NLTK)
+STOPWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stopwords_english.txt")
+
+_nlp = None
+_nlp_lock = threading.Lock()
+_stop_words = None
+
+
+def get_nlp():
+    """Modelo de spaCy: se carga una sola vez por sesión y se reutiliza en cada ejecución."""
+
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            try:
+                _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+            except OSError:
+                raise RuntimeError(f"Falta el modelo de spaCy '{SPACY_MODEL}'. Instala con:\n"
+                                   f"  python -m spacy download {SPACY_MODEL}\n"
+                                   "  (sin conexión: pip install en_core_web_sm-<versión>.whl)")
+        return _nlp
+
+
+def warm_up_nlp():
+    """Carga el modelo en segundo plano mientras el usuario elige la carpeta (sin tocar la ventana)."""
+
+    def _load():
+        try:
+            get_nlp()
+        except Exception:
+            pass  # el error se mostrará al ejecutar
+    threading.Thread(target=_load, daemon=True).start()
+
+
+def get_stop_words():
+    """Stopwords inglesas sin red: datos de NLTK si están instalados; si no, la copia local."""
+
+    global _stop_words
+    if _stop_words is None:
+        try:
+            from nltk.corpus import stopwords
+            _stop_words = set(stopwords.words('english'))
+        except Exception:  # NLTK sin instalar o sin los datos descargados (LookupError)
+            with open(STOPWORDS_FILE, encoding="utf-8") as f:
+                _stop_words = {w.strip() for w in f if w.strip()}
+    return _stop_words
 
 # ======================================================
 #          CARPETAS DE RESULTADOS
@@ -34,6 +94,7 @@ SUBFOLDERS = {
     "tfidf": os.path.join(BASE_RESULTS, "TFIDF"),
     "ngrams": os.path.join(BASE_RESULTS, "NGRAMS"),
     "cooc": os.path.join(BASE_RESULTS, "COOCCURRENCES"),
+    "counts": os.path.join(BASE_RESULTS, "CONTEOS"),
 }
 
 for sf in SUBFOLDERS.values():
@@ -45,59 +106,234 @@ for sf in SUBFOLDERS.values():
 # ======================================================
 
 def load_pdfs(folder_path):
+    """Texto de cada PDF con la capa de extracción común de cc_pdf (cc_extract): mismos backends,
+    extracción aislada y caché compartida, así que lo que ya leyó uno de los dos programas no se vuelve a
+    parsear."""
+
+    from cc_extract import PdfTextSource
+
     texts = []
     pdf_names = []
-    pdf_files = glob.glob(os.path.join(folder_path, "*.pdf"))
+    pdf_files = sorted(glob.glob(os.path.join(folder_path, "*.pdf")))
 
     log(f"Se han encontrado {len(pdf_files)} PDF.")
     if len(pdf_files) == 0:
         return [], []
 
-    for file in pdf_files:
-        try:
-            with open(file, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                pages_text = []
-                for page in reader.pages:
-                    t = page.extract_text()
-                    if t:
-                        pages_text.append(t)
-                texts.append("\n".join(pages_text))
+    try:
+        source = PdfTextSource(Path(folder_path))
+    except RuntimeError as e:
+        log(f"  ❌ {e}")
+        return [], []
+
+    try:
+        for file in pdf_files:
+            try:
+                texts.append(source.text(Path(file)))
                 pdf_names.append(os.path.basename(file))
-                log(f"  ✔ Leído: {os.path.basename(file)}")
+                log(f"  ✔ Leído: {os.path.basename(file)} ({source.last_backend or 'caché'})")
 
-        except Exception as e:
-            log(f"  ❌ Error leyendo {file}: {e}")
+            except Exception as e:
+                log(f"  ❌ Error leyendo {file}: {e}")
+
+            for incident in source.take_incidents():
+                if incident["estado"] != "skipped":
+                    log(f"  ⚠ {os.path.basename(file)}: {incident['estado']} ({incident['motivo']})")
+    finally:
+        source.close()
 
     return texts, pdf_names
 
 
-def preprocess(text):
-    doc = nlp(text.lower())
-    tokens = [
+def count_keywords(words_file, texts, pdf_names, remove_accents=True, whole_word=True):
+    """Modo combinado: cuenta las palabras del listado (motor de cc_pdf) en los textos ya extraídos.
+
+    remove_accents y whole_word son las mismas opciones que en cc_pdf (acentos y subcadenas).
+    """
+
+    from cc_pdf import CountingEngine, read_words
+    from cc_results import ResultWriter
+
+    words = read_words(Path(words_file))
+    if not words:
+        raise ValueError("Asegura que las palabras estén en la 1ª columna.")
+    engine = CountingEngine(words, remove_accents=remove_accents, whole_word=whole_word)
+    results = ResultWriter(Path(SUBFOLDERS["counts"]) / "resultado_conteos.csv", "wide", words,
+                           engine.original_to_norm, engine.norm_tokens)
+    for name, text in zip(pdf_names, texts):
+        results.add(name, engine.count_text(text))
+    return results.finish(pdf_names)
+
+
+def split_text(text, max_chars=MAX_CHUNK_CHARS):
+    """Trocea un texto largo en trozos de como mucho max_chars, cortando en saltos de línea o espacios."""
+
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        cut = text.rfind("\n", start, end)
+        if cut <= start:
+            cut = text.rfind(" ", start, end)
+        if cut <= start:
+            cut = end  # sin espacios en max_chars caracteres: corte duro
+        yield text[start:cut]
+        start = cut
+    yield text[start:]
+
+
+def _lemmas(doc, stop_words):
+    return [
         token.lemma_
         for token in doc
         if token.is_alpha
         and token.lemma_ not in stop_words
         and len(token.lemma_) > 2
     ]
-    return " ".join(tokens)
 
 
-def get_cooccurrence_matrix(texts, tf_df, top_n=50):
+def preprocess_corpus(texts, n_process=None, batch_size=PIPE_BATCH_SIZE):
+    """Lemas filtrados de cada texto, con nlp.pipe por lotes y en varios procesos.
+
+    Los textos largos se trocean (split_text) y sus tokens se vuelven a juntar en orden.
+    n_process=None elige según los núcleos y el tamaño del corpus.
+    """
+
+    nlp = get_nlp()
+    stop_words = get_stop_words()
+
+    pieces, owners = [], []
+    for i, text in enumerate(texts):
+        for piece in split_text(text.lower()):
+            pieces.append(piece)
+            owners.append(i)
+
+    if n_process is None:
+        n_process = min(MAX_NLP_PROCESSES, os.cpu_count() or 1, max(1, len(pieces) // (batch_size * 2)))
+
+    tokens = [[] for _ in texts]
+    for i, doc in zip(owners, nlp.pipe(pieces, batch_size=batch_size, n_process=n_process)):
+        tokens[i].extend(_lemmas(doc, stop_words))
+    return [" ".join(t) for t in tokens]
+
+
+def preprocess(text):
+    return preprocess_corpus([text], n_process=1)[0]
+
+
+def filter_by_df(X, names, max_df=TFIDF_MAX_DF, min_df=TFIDF_MIN_DF):
+    """Quita de la matriz de conteos (CSR) los términos con frecuencia documental fuera de [min_df, max_df].
+
+    max_df/min_df como en scikit-learn: float = proporción de documentos, int = número de documentos.
+    """
+
+    import numpy as np
+
+    n_docs = X.shape[0]
+    max_count = max_df if isinstance(max_df, int) else max_df * n_docs
+    min_count = min_df if isinstance(min_df, int) else min_df * n_docs
+    df = np.bincount(X.indices, minlength=X.shape[1])
+    keep = np.flatnonzero((df >= min_count) & (df <= max_count))
+    return X[:, keep], names[keep]
+
+
+def write_sparse_row(path, header, names, X, idx):
+    """CSV de un documento con los valores distintos de cero de la fila idx (CSR), de mayor a menor."""
+
+    import numpy as np
+
+    start, end = X.indptr[idx], X.indptr[idx + 1]
+    cols, vals = X.indices[start:end], X.data[start:end]
+    order = np.argsort(-vals, kind="stable")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows((names[cols[i]], vals[i].item()) for i in order if vals[i] > 0)
+
+
+def cooccurrence_counts(texts, words, window=COOC_WINDOW):
+    """Matriz dispersa (palabras x palabras, simétrica, diagonal a cero) de coocurrencias entre words.
+
+    window=0: número de documentos en los que aparecen las dos palabras (producto X.T @ X de la matriz
+    binaria documentos x palabras). window>=2: número de veces que aparecen a menos de window tokens
+    de distancia, en una pasada por los ids de los tokens de cada documento.
+    """
+
+    import numpy as np
+    from scipy import sparse
+
+    index = {w: i for i, w in enumerate(words)}
+    n = len(words)
+
+    if not window:
+        indptr, indices = [0], []
+        for text in texts:
+            indices.extend({index[t] for t in text.split() if t in index})
+            indptr.append(len(indices))
+        X = sparse.csr_matrix((np.ones(len(indices), dtype=np.int64), indices, indptr), shape=(len(texts), n))
+        C = (X.T @ X).tocsr()
+    else:
+        C = sparse.csr_matrix((n, n), dtype=np.int64)
+        rows, cols, pending = [], [], 0
+        for text in texts:
+            ids = np.fromiter((index.get(t, -1) for t in text.split()), dtype=np.int64)
+            for d in range(1, min(window, len(ids))):
+                a, b = ids[:-d], ids[d:]
+                ok = (a >= 0) & (b >= 0)
+                rows.append(a[ok]); cols.append(b[ok])
+                pending += int(ok.sum())
+            if pending >= COOC_FLUSH_PAIRS:
+                C = C + _pairs_matrix(rows, cols, n)
+                rows, cols, pending = [], [], 0
+        C = C + _pairs_matrix(rows, cols, n)
+        C = (C + C.T).tocsr()
+
+    C.setdiag(0)
+    C.eliminate_zeros()
+    return C
+
+
+def _pairs_matrix(rows, cols, n):
+    import numpy as np
+    from scipy import sparse
+
+    r = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    c = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int64)
+    return sparse.coo_matrix((np.ones(len(r), dtype=np.int64), (r, c)), shape=(n, n)).tocsr()
+
+
+def get_cooccurrence_matrix(texts, tf_df, top_n=COOC_TOP_N, window=COOC_WINDOW):
+    """Coocurrencias entre las top_n palabras con más TF. Devuelve (palabras, matriz dispersa)."""
+
     top_words = tf_df["word"].head(top_n).tolist()
-    matrix = pd.DataFrame(0, index=top_words, columns=top_words)
+    return top_words, cooccurrence_counts(texts, top_words, window)
+
+
+def write_cooccurrence(words, C, folder, dense_max=COOC_DENSE_MAX):
+    """Lista de aristas (source, target, weight; cada par una vez, de mayor a menor) y matriz densa en CSV.
+
+    La matriz densa sólo se escribe si hay como mucho dense_max palabras. Devuelve las rutas escritas.
+    """
 
-    for text in texts:
-        tokens = text.split()
-        unique_tokens = set(tokens)
-        filtered = [t for t in unique_tokens if t in top_words]
+    import numpy as np
+    from scipy import sparse
 
-        for w1, w2 in itertools.combinations(filtered, 2):
-            matrix.loc[w1, w2] += 1
-            matrix.loc[w2, w1] += 1
+    written = []
+    upper = sparse.triu(C, k=1).tocoo()
+    order = np.argsort(-upper.data, kind="stable")
+    edges = os.path.join(folder, "cooccurrence_edges.csv")
+    with open(edges, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["source", "target", "weight"])
+        writer.writerows((words[upper.row[i]], words[upper.col[i]], upper.data[i].item()) for i in order)
+    written.append(edges)
 
-    return matrix
+    if len(words) <= dense_max:
+        import pandas as pd
+
+        salida = os.path.join(folder, "cooccurrence_matrix.csv")
+        pd.DataFrame(C.toarray(), index=words, columns=words).to_csv(salida)
+        written.append(salida)
+    return written
 
 
 # ======================================================
@@ -115,11 +351,24 @@ def select_folder():
         folder_path_var.set(folder)
 
 
+def select_words_file():
+    path = filedialog.askopenfilename(filetypes=[("Excel/CSV/TXT", "*.xlsx *.xls *.csv *.txt"), ("Todos", "*.*")])
+    if path:
+        words_path_var.set(path)
+
+
 def run_processing():
     folder = folder_path_var.get()
     if not folder or not os.path.isdir(folder):
         messagebox.showerror("Error", "Debes seleccionar una carpeta válida.")
         return
+    words_file = words_path_var.get() if var_counts.get() else ""
+    if var_counts.get() and not os.path.isfile(words_file):
+        messagebox.showerror("Error", "Para el conteo de palabras selecciona el listado (Excel/CSV).")
+        return
+
+    import pandas as pd
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
 
     log("\n==============================")
     log("   INICIANDO PROCESAMIENTO")
@@ -132,63 +381,76 @@ def run_processing():
         messagebox.showerror("Error", "No se encontraron PDFs.")
         return
 
+    # 1b. Conteo de palabras del listado con el mismo texto (cada PDF se extrae una sola vez)
+    if words_file:
+        log("\n🔢 Contando palabras del listado...")
+        try:
+            salida = count_keywords(words_file, raw_corpus, pdf_names,
+                                    remove_accents=not var_keep_accents.get(),
+                                    whole_word=not var_substrings.get())
+            log(f"  ✔ Guardado: {salida}")
+        except Exception as e:
+            log(f"  ❌ Error en el conteo: {e}")
+
     # 2. Preprocesar
     log("\n🔧 Preprocesando textos...")
-    clean_corpus = [preprocess(t) for t in raw_corpus]
-
-    # 3. TF
-    if var_tf.get():
-        log("\n📊 Calculando TF por documento...")
+    try:
+        get_nlp()  # si se está cargando en segundo plano, espera a que termine
+    except Exception as e:
+        messagebox.showerror("Error", str(e))
+        return
+    clean_corpus = preprocess_corpus(raw_corpus)
 
+    # Matriz de conteos (dispersa, documentos x palabras): sirve para TF y TF-IDF
+    if var_tf.get() or var_tfidf.get():
         vectorizer_tf = CountVectorizer()
         X_tf = vectorizer_tf.fit_transform(clean_corpus)
         palabras = vectorizer_tf.get_feature_names_out()
 
+    # 3. TF
+    if var_tf.get():
+        log("\n📊 Calculando TF por documento...")
+
         # GLOBAL
-        tf_global = X_tf.toarray().sum(axis=0)
+        tf_global = X_tf.sum(axis=0).A1
         tf_global_df = pd.DataFrame({"word": palabras, "tf": tf_global})
         tf_global_df = tf_global_df.sort_values("tf", ascending=False)
         tf_global_df.to_csv(os.path.join(BASE_RESULTS, "tf_global.csv"), index=False)
         log("  ✔ Guardado: RESULTS/tf_global.csv")
 
-        # POR DOCUMENTO
+        # POR DOCUMENTO (sólo los valores distintos de cero de cada fila)
         for idx, pdf in enumerate(pdf_names):
-            tf_individual = X_tf[idx].toarray().flatten()
-            df_doc = pd.DataFrame({"word": palabras, "tf": tf_individual})
-            df_doc = df_doc[df_doc["tf"] > 0].sort_values("tf", ascending=False)
-
             salida = os.path.join(SUBFOLDERS["tf"], pdf.replace(".pdf", "_tf.csv"))
-            df_doc.to_csv(salida, index=False)
+            write_sparse_row(salida, ["word", "tf"], palabras, X_tf, idx)
             log(f"  ✔ TF guardado por documento: {salida}")
 
         tf_df = tf_global_df
     else:
         tf_df = None
 
-    # 4. TF-IDF
+    # 4. TF-IDF (a partir de la matriz de conteos, sin volver a vectorizar el corpus)
     if var_tfidf.get():
         log("\n📈 Calculando TF-IDF por documento...")
 
-        vectorizer_tfidf = TfidfVectorizer(max_df=0.85, min_df=2)
-        X_tfidf = vectorizer_tfidf.fit_transform(clean_corpus)
-        palabras = vectorizer_tfidf.get_feature_names_out()
-
-        # GLOBAL
-        tfidf_global = X_tfidf.sum(axis=0).A1
-        tfidf_df = pd.DataFrame({"word": palabras, "tfidf": tfidf_global})
-        tfidf_df = tfidf_df.sort_values("tfidf", ascending=False)
-        tfidf_df.to_csv(os.path.join(BASE_RESULTS, "tfidf_global.csv"), index=False)
-        log("  ✔ Guardado: RESULTS/tfidf_global.csv")
+        X_counts, palabras_tfidf = filter_by_df(X_tf, palabras)
+        if X_counts.shape[1] == 0:
+            log(f"  ⚠ Ninguna palabra aparece en al menos {TFIDF_MIN_DF} documentos y en menos del "
+                f"{TFIDF_MAX_DF:.0%}: se omite el TF-IDF")
+        else:
+            X_tfidf = TfidfTransformer().fit_transform(X_counts).tocsr()
 
-        # POR DOCUMENTO
-        for idx, pdf in enumerate(pdf_names):
-            fila = X_tfidf[idx].toarray().flatten()
-            df_doc = pd.DataFrame({"word": palabras, "tfidf": fila})
-            df_doc = df_doc[df_doc["tfidf"] > 0].sort_values("tfidf", ascending=False)
+            # GLOBAL
+            tfidf_global = X_tfidf.sum(axis=0).A1
+            tfidf_df = pd.DataFrame({"word": palabras_tfidf, "tfidf": tfidf_global})
+            tfidf_df = tfidf_df.sort_values("tfidf", ascending=False)
+            tfidf_df.to_csv(os.path.join(BASE_RESULTS, "tfidf_global.csv"), index=False)
+            log("  ✔ Guardado: RESULTS/tfidf_global.csv")
 
-            salida = os.path.join(SUBFOLDERS["tfidf"], pdf.replace(".pdf", "_tfidf.csv"))
-            df_doc.to_csv(salida, index=False)
-            log(f"  ✔ TF-IDF guardado por documento: {salida}")
+            # POR DOCUMENTO
+            for idx, pdf in enumerate(pdf_names):
+                salida = os.path.join(SUBFOLDERS["tfidf"], pdf.replace(".pdf", "_tfidf.csv"))
+                write_sparse_row(salida, ["word", "tfidf"], palabras_tfidf, X_tfidf, idx)
+                log(f"  ✔ TF-IDF guardado por documento: {salida}")
 
     # 5. N-grams
     if var_ngrams.get():
@@ -199,7 +461,7 @@ def run_processing():
         ngrams = vectorizer_ng.get_feature_names_out()
 
         # GLOBAL
-        ng_global = X_ng.toarray().sum(axis=0)
+        ng_global = X_ng.sum(axis=0).A1
         ng_df = pd.DataFrame({"ngram": ngrams, "freq": ng_global})
         ng_df = ng_df.sort_values("freq", ascending=False)
         ng_df.to_csv(os.path.join(BASE_RESULTS, "ngrams_global.csv"), index=False)
@@ -207,12 +469,8 @@ def run_processing():
 
         # POR DOCUMENTO
         for idx, pdf in enumerate(pdf_names):
-            fila = X_ng[idx].toarray().flatten()
-            df_doc = pd.DataFrame({"ngram": ngrams, "freq": fila})
-            df_doc = df_doc[df_doc["freq"] > 0].sort_values("freq", ascending=False)
-
             salida = os.path.join(SUBFOLDERS["ngrams"], pdf.replace(".pdf", "_ngrams.csv"))
-            df_doc.to_csv(salida, index=False)
+            write_sparse_row(salida, ["ngram", "freq"], ngrams, X_ng, idx)
             log(f"  ✔ N-grams guardado por documento: {salida}")
 
     # 6. Coocurrencias
@@ -220,11 +478,18 @@ def run_processing():
         if tf_df is None:
             messagebox.showwarning("Aviso", "Para coocurrencias es necesario activar TF.\nOmitiendo.")
         else:
-            log("\n🔗 Calculando coocurrencias globales...")
-            cooc = get_cooccurrence_matrix(clean_corpus, tf_df, top_n=50)
-            salida = os.path.join(SUBFOLDERS["cooc"], "cooccurrence_matrix.csv")
-            cooc.to_csv(salida)
-            log(f"  ✔ Guardado: {salida}")
+            try:
+                top_n, window = var_cooc_top.get(), var_cooc_window.get()
+            except tk.TclError:
+                top_n, window = COOC_TOP_N, COOC_WINDOW
+                log(f"  ⚠ Top/ventana no válidos: se usan {COOC_TOP_N} y {COOC_WINDOW}")
+            ambito = f"ventana de {window} tokens" if window else "documento"
+            log(f"\n🔗 Calculando coocurrencias globales (top {top_n}, {ambito})...")
+            words, cooc = get_cooccurrence_matrix(clean_corpus, tf_df, top_n=top_n, window=window)
+            for salida in write_cooccurrence(words, cooc, SUBFOLDERS["cooc"]):
+                log(f"  ✔ Guardado: {salida}")
+            if len(words) > COOC_DENSE_MAX:
+                log(f"  ⚠ Más de {COOC_DENSE_MAX} palabras: sólo se guarda la lista de aristas")
 
     log("\n🎉 PROCESO COMPLETADO\n")
     messagebox.showinfo("Finalizado", "El procesamiento ha terminado correctamente.")
@@ -233,39 +498,67 @@ def run_processing():
 
 #     INTERFAZ TKINTER
 
-
-root = tk.Tk()
-root.title("Extractor de Palabras Clave desde PDF")
-root.geometry("700x550")
-
-# Carpeta
-frame_top = tk.Frame(root)
-frame_top.pack(pady=10)
-
-tk.Label(frame_top, text="Carpeta de PDFs:").grid(row=0, column=0, padx=5)
-folder_path_var = tk.StringVar()
-tk.Entry(frame_top, textvariable=folder_path_var, width=50).grid(row=0, column=1)
-tk.Button(frame_top, text="Seleccionar", command=select_folder).grid(row=0, column=2, padx=5)
-
-# Opciones
-frame_opts = tk.LabelFrame(root, text="Opciones a ejecutar", padx=10, pady=10)
-frame_opts.pack(pady=10)
-
-var_tf = tk.BooleanVar(value=True)
-var_tfidf = tk.BooleanVar(value=True)
-var_ngrams = tk.BooleanVar(value=True)
-var_cooc = tk.BooleanVar(value=True)
-
-tk.Checkbutton(frame_opts, text="Frecuencias (TF)", variable=var_tf).pack(anchor="w")
-tk.Checkbutton(frame_opts, text="TF-IDF", variable=var_tfidf).pack(anchor="w")
-tk.Checkbutton(frame_opts, text="N-grams", variable=var_ngrams).pack(anchor="w")
-tk.Checkbutton(frame_opts, text="Coocurrencias", variable=var_cooc).pack(anchor="w")
-
-# Botón ejecutar
-tk.Button(root, text="Ejecutar", command=run_processing, bg="#4CAF50", fg="white", height=2).pack(pady=10)
-
-# Log
-text_log = tk.Text(root, height=15, width=90)
-text_log.pack(pady=10)
-
-root.mainloop()
+# Con guarda: los procesos de nlp.pipe (y los de extracción) importan este módulo al arrancar
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Extractor de Palabras Clave desde PDF")
+    root.geometry("700x650")
+
+    # Carpeta
+    frame_top = tk.Frame(root)
+    frame_top.pack(pady=10)
+
+    tk.Label(frame_top, text="Carpeta de PDFs:").grid(row=0, column=0, padx=5)
+    folder_path_var = tk.StringVar()
+    tk.Entry(frame_top, textvariable=folder_path_var, width=50).grid(row=0, column=1)
+    tk.Button(frame_top, text="Seleccionar", command=select_folder).grid(row=0, column=2, padx=5)
+
+    # Opciones
+    frame_opts = tk.LabelFrame(root, text="Opciones a ejecutar", padx=10, pady=10)
+    frame_opts.pack(pady=10)
+
+    var_tf = tk.BooleanVar(value=True)
+    var_tfidf = tk.BooleanVar(value=True)
+    var_ngrams = tk.BooleanVar(value=True)
+    var_cooc = tk.BooleanVar(value=True)
+
+    tk.Checkbutton(frame_opts, text="Frecuencias (TF)", variable=var_tf).pack(anchor="w")
+    tk.Checkbutton(frame_opts, text="TF-IDF", variable=var_tfidf).pack(anchor="w")
+    tk.Checkbutton(frame_opts, text="N-grams", variable=var_ngrams).pack(anchor="w")
+    tk.Checkbutton(frame_opts, text="Coocurrencias", variable=var_cooc).pack(anchor="w")
+
+    var_cooc_top = tk.IntVar(value=COOC_TOP_N)
+    var_cooc_window = tk.IntVar(value=COOC_WINDOW)
+    frame_cooc = tk.Frame(frame_opts)
+    frame_cooc.pack(anchor="w", padx=20)
+    tk.Label(frame_cooc, text="Top palabras:").pack(side="left")
+    tk.Spinbox(frame_cooc, from_=2, to=20000, increment=50, width=7, textvariable=var_cooc_top).pack(side="left")
+    tk.Label(frame_cooc, text="  Ventana (0 = documento):").pack(side="left")
+    tk.Spinbox(frame_cooc, from_=0, to=100, width=5, textvariable=var_cooc_window).pack(side="left")
+
+    var_counts = tk.BooleanVar(value=False)
+    words_path_var = tk.StringVar()
+    tk.Checkbutton(frame_opts, text="Conteo de palabras del listado (misma extracción)",
+                   variable=var_counts).pack(anchor="w")
+    frame_words = tk.Frame(frame_opts)
+    frame_words.pack(anchor="w", padx=20)
+    tk.Entry(frame_words, textvariable=words_path_var, width=40).pack(side="left")
+    tk.Button(frame_words, text="Listado...", command=select_words_file).pack(side="left", padx=5)
+    var_substrings = tk.BooleanVar(value=False)
+    var_keep_accents = tk.BooleanVar(value=False)
+    tk.Checkbutton(frame_opts, text="Contar subcadenas (no sólo palabra/frase completa)",
+                   variable=var_substrings).pack(anchor="w", padx=20)
+    tk.Checkbutton(frame_opts, text="Mantener acentos (no normalizar)",
+                   variable=var_keep_accents).pack(anchor="w", padx=20)
+
+    # Botón ejecutar
+    tk.Button(root, text="Ejecutar", command=run_processing, bg="#4CAF50", fg="white", height=2).pack(pady=10)
+
+    # Log
+    text_log = tk.Text(root, height=15, width=90)
+    text_log.pack(pady=10)
+
+    # El modelo de spaCy se va cargando en segundo plano con la ventana ya visible
+    root.after(200, warm_up_nlp)
+
+    root.mainloop()
@@ -0,0 +1,55 @@
+import csv
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cc_pdf import count_batch  # noqa: E402
+
+
+def _read_wide(path: Path) -> dict:
+    with path.open(newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    docs = rows[0][1:]
+    return {doc: {row[0]: int(row[i + 1]) for row in rows[1:]} for i, doc in enumerate(docs)}
+
+
+def test_stored_document_kept_when_reextraction_fails(tmp_path):
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    (pdf_dir / "a.pdf").write_text("hola mundo hola", encoding="utf-8")
+    (pdf_dir / "b.pdf").write_text("mundo adios", encoding="utf-8")
+    words = tmp_path / "palabras.csv"
+    out = tmp_path / "conteos.csv"
+    failing = set()
+
+    def extract(path_str: str) -> str:
+        if Path(path_str).name in failing:
+            raise ValueError("roto")
+        return Path(path_str).read_text(encoding="utf-8")
+
+    def run() -> dict:
+        return count_batch(words, pdf_dir, out, "fake", extract, substrings=False, keep_accents=False,
+                           incremental=True)
+
+    words.write_text("hola\nmundo\n", encoding="utf-8")
+    run()
+    assert _read_wide(out)["a.pdf"]["hola"] == 2
+
+    # Segunda ejecución: término nuevo y a.pdf ya no se puede extraer
+    words.write_text("hola\nmundo\nadios\n", encoding="utf-8")
+    failing.add("a.pdf")
+    summary = run()
+
+    counts = _read_wide(out)
+    assert counts["a.pdf"]["hola"] == 2      # lo guardado se mantiene
+    assert counts["a.pdf"]["mundo"] == 1
+    assert counts["a.pdf"]["adios"] == 0     # el término nuevo queda a 0
+    assert counts["b.pdf"]["adios"] == 1
+    assert summary["incidents"]["stale"] == 1
+    assert summary["incidents"]["skipped"] == 0
+
+    # Cuando se puede volver a extraer, se completa
+    failing.clear()
+    assert run()["incidents"] is None
+    assert _read_wide(out)["a.pdf"]["adios"] == 0